@@ -1,9 +1,12 @@
 import asyncio
 
+import aiohttp
 from env_canada import ECHistorical
+from env_canada.ec_exc import UnknownStationId
 from env_canada.ec_historical import get_historical_stations
 
 import numpy as np
+import os
 from pathlib import Path
 import pandas as pd
 from datetime import datetime, timedelta
@@ -13,6 +16,9 @@ from geopy.distance import geodesic
 
 import logging
 
+from harmoniq.core.meteo_fetch import WeatherFetcher
+from harmoniq.core.meteo_providers import WeatherProvider, get_provider
+from harmoniq.core.meteo_stations import StationInventory, station_inventory
 from harmoniq.db.schemas import PositionBase, weather_schema
 
 logging.basicConfig(
@@ -43,6 +49,15 @@ CACHE = Path(__file__).parent / "cache"
 if not CACHE.exists():
     CACHE.mkdir(parents=True, exist_ok=True)
 
+try:
+    import pyarrow.parquet  # noqa: F401
+    PARQUET_ENGINE = "pyarrow"
+except ImportError:
+    PARQUET_ENGINE = "fastparquet"
+
+# Coordinates keep float64; the measurements fit in float32
+_FLOAT64_COLUMNS = ("latitude", "longitude")
+
 class WeatherHelper:
     def __init__(
         self,
@@ -52,8 +67,14 @@ class WeatherHelper:
         end_time: Optional[datetime] = None,
         data_type: EnergyType = EnergyType.NONE,
         granularity: Granularity = Granularity.DAILY,
+        fetcher: Optional[WeatherFetcher] = None,
+        columns: Optional[List[str]] = None,
+        stations: Optional[StationInventory] = None,
+        provider: Optional[WeatherProvider] = None,
     ):
         self.position = position
+        # Columns returned by load (all if None); the cache keeps every column
+        self.columns = columns
         self.elevation: Optional[float] = None
         self.interpolate = interpolate
         self.data_type = data_type
@@ -75,6 +96,12 @@ class WeatherHelper:
             self.end_time -= self._timeshift
 
         self._granularity = granularity
+        # Downloads station-months concurrently through one HTTP session
+        self.fetcher = fetcher or WeatherFetcher()
+        # Local station inventory (nearest stations without a network round trip)
+        self.stations = stations or station_inventory
+        # Source of the data (ECCC, local files or synthetic, by configuration)
+        self.provider = provider or get_provider()
         self._nearby_stations: Optional[pd.DataFrame] = None
         self._data: Optional[pd.DataFrame] = None
 
@@ -104,24 +131,68 @@ class WeatherHelper:
         end_str = self.end_time.strftime("%Y-%m-%d")
         return f"{lat}_{lon}_{start_str}_{end_str}_{self.granularity}_{energy_type}"
 
+    def _cache_file(self, suffix: str = "parquet") -> Path:
+        return CACHE / f"{self._cache_key}.{suffix}"
+
     def test_cache(self) -> bool:
-        """Test if the cache file exists and is not empty"""
-        cache_file = CACHE / f"{self._cache_key}.csv"
+        """Test if the cache file exists, migrating an older CSV cache file"""
+        cache_file = self._cache_file()
+        legacy_file = self._cache_file("csv")
+        if not cache_file.exists() and legacy_file.exists():
+            logger.info(f"Migrating cache file {legacy_file} to Parquet")
+            self.save_cache(pd.read_csv(legacy_file, index_col=0, parse_dates=True))
+            legacy_file.unlink(missing_ok=True)
+
         if cache_file.exists():
             logger.info(f"Cache file {cache_file} exists")
             return True
         return False
-    
-    def load_cache(self) -> pd.DataFrame:
-        """Load the cache file"""
-        cache_file = CACHE / f"{self._cache_key}.csv"
-        return pd.read_csv(cache_file, index_col=0, parse_dates=True)
+
+    def load_cache(
+        self,
+        columns: Optional[List[str]] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> pd.DataFrame:
+        """Load the cache file, optionally only some columns and a time range"""
+        filters = []
+        if start is not None:
+            filters.append(("tempsdate", ">=", pd.Timestamp(start)))
+        if end is not None:
+            filters.append(("tempsdate", "<=", pd.Timestamp(end)))
+        data = pd.read_parquet(
+            self._cache_file(),
+            engine=PARQUET_ENGINE,
+            columns=columns,
+            filters=filters or None,
+        )
+        # Depending on the engine, filters only skip whole row groups
+        if filters:
+            data = data.loc[start:end]
+        return data
 
     def save_cache(self, data: pd.DataFrame) -> None:
-        cache_file = CACHE / f"{self._cache_key}.csv"
-        data.to_csv(cache_file, index=True)
+        """Write the cache file atomically (readers never see a partial file)"""
+        cache_file = self._cache_file()
+        tmp_file = cache_file.with_name(f".{cache_file.name}.{os.getpid()}.tmp")
+        try:
+            self._typed(data).to_parquet(tmp_file, engine=PARQUET_ENGINE)
+            os.replace(tmp_file, cache_file)
+        finally:
+            tmp_file.unlink(missing_ok=True)
         logger.info(f"Saved cache file {cache_file}")
 
+    @staticmethod
+    def _typed(data: pd.DataFrame) -> pd.DataFrame:
+        """Weather data with the weather_schema float types"""
+        dtypes = {
+            column: "float64" if column in _FLOAT64_COLUMNS else "float32"
+            for column in data.columns
+        }
+        data = data.apply(pd.to_numeric, errors="coerce").astype(dtypes)
+        data.index = pd.DatetimeIndex(data.index, name="tempsdate")
+        return data
+
     def set_back_time(self, data: pd.DataFrame) -> pd.DataFrame:
         logger.info(f"Setting back time for {self.position} from {self.start_time} to {self.end_time}")
         if self._timeshift is not None:
@@ -134,64 +205,98 @@ class WeatherHelper:
         if self._data is not None:
             return self.set_back_time(self._data)
 
-        if self.test_cache():
+        cacheable = self.provider.cacheable
+        if cacheable and self.test_cache():
             logger.info(f"Loading data from cache")
-            self._data = self.load_cache()
+            self._data = self.load_cache(columns=self.columns)
             self._data = self.set_back_time(self._data)
             return self._data
 
-        self._nearby_stations = await self._get_nearest_station()
+        self._data = self._typed(await self.provider.load(self))
 
-        valid_data = 0
-        data_list = []
-        for station in self._nearby_stations.itertuples():
-            logger.info(f"Getting data from {station.Index}")
-            range = (
-                station.hlyRange
-                if self._granularity == Granularity.HOURLY
-                else station.dlyRange
-            )
-
-            if range == "|":
-                logger.info(
-                    f"No {'hourly' if self._granularity == Granularity.HOURLY else 'daily'} data available"
-                )
-                continue
+        if not self.interpolate:
+            self._data = self._select(self._data)
+            return self._data
 
-            sub_data = await self._get_historical_data_range(int(station.id))
+        # Trim data out of range
+        self._data = self._data.loc[
+            (self._data.index >= self.start_time) & (self._data.index <= self.end_time)
+        ]
 
-            sub_data = self._to_schema(sub_data)
+        if cacheable:
+            self.save_cache(self._data)
 
-            if not self._validate_type(sub_data, self.data_type):
-                logger.info(f"Data not of right type")
-                continue
+        self._data = self.set_back_time(self._select(self._data))
 
-            if not self.interpolate:
-                self._data = sub_data
-                return self._data
+        return self._data
 
-            valid_data += 1
-            logger.info(f"Found valid data from {station.Index}")
-            data_list.append(sub_data)
+    async def _load_from_stations(self) -> pd.DataFrame:
+        """Data of the nearest ECCC stations (interpolated if self.interpolate)"""
+        self._nearby_stations = await self._get_nearest_station()
 
-            if valid_data >= 3:
-                break
+        candidates = [
+            station
+            for station in self._nearby_stations.itertuples()
+            if self._has_range(station)
+        ]
+        needed = 3 if self.interpolate else 1
 
-        self._data = self._interpolate_data(data_list)
+        data_list = []
+        async with self.fetcher as fetcher:
+            position = 0
+            while len(data_list) < needed and position < len(candidates):
+                # Validate the nearest remaining stations in parallel, only as
+                # many as are still needed
+                batch = candidates[position : position + needed - len(data_list)]
+                position += len(batch)
+                results = await asyncio.gather(
+                    *(self._fetch_station(fetcher, station) for station in batch)
+                )
+                data_list.extend(data for data in results if data is not None)
 
-        if self._data is None:
+        if not data_list:
             raise ValueError("No valid data found")
 
-        # Trim data out of range
-        self._data = self._data.loc[
-            (self._data.index >= self.start_time) & (self._data.index <= self.end_time)
-        ]
+        if not self.interpolate:
+            return data_list[0]
 
-        self.save_cache(self._data)
+        return self._interpolate_data(data_list)
 
-        self._data = self.set_back_time(self._data)
-        
-        return self._data
+    def _select(self, data: pd.DataFrame) -> pd.DataFrame:
+        return data if self.columns is None else data[self.columns]
+
+    def _has_range(self, station) -> bool:
+        range = (
+            station.hlyRange
+            if self._granularity == Granularity.HOURLY
+            else station.dlyRange
+        )
+        if range == "|":
+            logger.info(
+                f"No {self.granularity} data available for {station.Index}"
+            )
+            return False
+        return True
+
+    async def _fetch_station(
+        self, fetcher: WeatherFetcher, station
+    ) -> Optional[pd.DataFrame]:
+        """Download and validate the data of a candidate station (None if unusable)"""
+        logger.info(f"Getting data from {station.Index}")
+        try:
+            sub_data = await self._get_historical_data_range(station.id, fetcher)
+        except (UnknownStationId, aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.info(f"No data from {station.Index}: {e}")
+            return None
+
+        sub_data = self._to_schema(sub_data)
+
+        if not self._validate_type(sub_data, self.data_type):
+            logger.info(f"Data not of right type")
+            return None
+
+        logger.info(f"Found valid data from {station.Index}")
+        return sub_data
 
     @staticmethod
     def _validate_type(data: pd.DataFrame, energy_type: EnergyType) -> List[str]:
@@ -250,16 +355,27 @@ class WeatherHelper:
         start_year = self.start_time.year
         end_year = self.end_time.year or datetime.now().year
 
-        stations = pd.DataFrame(
-            
-            await get_historical_stations(
+        try:
+            await self.stations.load()
+            stations = self.stations.nearest(
+                [coordinates],
+                self._granularity,
+                start_year=start_year,
+                end_year=end_year,
+                radius=radius,
+                limit=limit,
+            )[0]
+        except (aiohttp.ClientError, asyncio.TimeoutError, OSError, KeyError) as e:
+            logger.info(f"Station inventory unavailable ({e}), searching online")
+            stations = pd.DataFrame(
+                await get_historical_stations(
                     coordinates,
                     start_year=start_year,
                     end_year=end_year,
                     radius=radius,
                     limit=limit,
                 )
-        ).T
+            ).T
 
         self._nearby_stations = stations
         return stations
@@ -351,28 +467,14 @@ class WeatherHelper:
 
     async def _get_historical_data_range(
         self,
-        station_id: int,
+        station_id: str,
+        fetcher: WeatherFetcher,
     ) -> pd.DataFrame:
-        if self._granularity == Granularity.HOURLY:
-            date_range = pd.date_range(
-                start=self.start_time, end=self.end_time, freq="MS"
-            )
-        elif self._granularity == Granularity.DAILY:
-            date_range = pd.date_range(
-                start=self.start_time, end=self.end_time, freq="YS"
-            )
-        else:
+        if self._granularity not in (Granularity.HOURLY, Granularity.DAILY):
             raise ValueError("Invalid granularity")
 
-        data = pd.DataFrame()
-        for date in date_range:
-            data_instance = await self._get_historical_data(
-                station_id, self._granularity, year=date.year, month=date.month
-            )
-
-            data = pd.concat([data, data_instance])
-
-        return data
+        periods = fetcher.periods(self.start_time, self.end_time, self._granularity)
+        return await fetcher.fetch_range(station_id, self._granularity, periods)
 
     async def _get_historical_data_hourly(
         self,
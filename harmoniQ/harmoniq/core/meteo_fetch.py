@@ -0,0 +1,225 @@
+"""
+Concurrent download of historical weather data from Environment Canada.
+
+A `WeatherFetcher` downloads station-months (hourly) or station-years (daily)
+through a single shared HTTP session. The number of requests in flight is
+bounded by an `asyncio.Semaphore`; transient failures (connection errors,
+timeouts, HTTP 429 and 5xx) are retried with exponential backoff.
+
+Downloaded periods are kept in a raw cache keyed by station, granularity, year
+and month (`cache/stations/<granularity>/<station>/<year>-<month>.csv`). A
+query for any position or date range is assembled from cached periods and only
+the missing ones are downloaded, so neighbouring infrastructure and overlapping
+scenarios share their downloads. The current (incomplete) period is never
+cached. Stations without data are remembered with an empty file. Cache files
+are written atomically, so another worker never reads a partial period.
+
+The base URL can be overridden to point at a local stand-in server (tests).
+
+Example:
+    >>> async with WeatherFetcher(max_concurrency=8) as fetcher:
+    ...     data = await fetcher.fetch_range(station_id, Granularity.HOURLY, periods)
+"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime
+from io import StringIO
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+import aiohttp
+import pandas as pd
+from env_canada import ec_exc
+from env_canada.constants import USER_AGENT
+from env_canada.ec_historical import WEATHER_URL
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5  # seconds, doubled after each failed attempt
+DEFAULT_TIMEOUT = aiohttp.ClientTimeout(total=30)
+
+# HTTP statuses worth retrying; other errors are returned to the caller
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+RAW_CACHE = Path(__file__).parent / "cache" / "stations"
+
+Period = Tuple[int, int]  # (year, month)
+
+
+class WeatherFetcher:
+    """
+    Bounded, retrying downloader for Environment Canada bulk data.
+
+    Attributes:
+        base_url (str): Bulk data URL (ECCC by default)
+        max_concurrency (int): Maximum number of requests in flight
+        retries (int): Number of retries after a transient failure
+        backoff (float): Delay before the first retry, in seconds
+        cache_dir (Optional[Path]): Raw station-month cache (disabled if None)
+        hits (int): Periods read from the cache
+        misses (int): Periods downloaded
+    """
+
+    def __init__(
+        self,
+        base_url: str = WEATHER_URL.format("e"),
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        retries: int = DEFAULT_RETRIES,
+        backoff: float = DEFAULT_BACKOFF,
+        timeout: aiohttp.ClientTimeout = DEFAULT_TIMEOUT,
+        cache_dir: Optional[Path] = RAW_CACHE,
+    ):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.base_url = base_url
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.hits = 0
+        self.misses = 0
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self) -> "WeatherFetcher":
+        self._session = aiohttp.ClientSession(
+            headers={"User-Agent": USER_AGENT}, timeout=self.timeout
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self._session.close()
+        self._session = None
+        self._semaphore = None
+
+    @staticmethod
+    def periods(start, end, granularity) -> List[Period]:
+        """
+        Periods to download to cover [start, end].
+
+        Hourly data is served one month at a time, daily data one year at a time.
+        """
+        freq = "MS" if granularity.name == "HOURLY" else "YS"
+        # Start of the first period, so that a range starting mid-month is covered
+        first = pd.Timestamp(start).to_period("M" if freq == "MS" else "Y").start_time
+        return [(d.year, d.month) for d in pd.date_range(first, end, freq=freq)]
+
+    async def _get(self, params: dict) -> str:
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    async with self._session.get(self.base_url, params=params) as response:
+                        if response.status in RETRY_STATUSES:
+                            raise aiohttp.ClientResponseError(
+                                response.request_info, response.history,
+                                status=response.status, message=response.reason or "",
+                            )
+                        response.raise_for_status()
+                        return await response.text()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                retryable = not isinstance(e, aiohttp.ClientResponseError) or e.status in RETRY_STATUSES
+                if not retryable or attempt >= self.retries:
+                    raise
+                delay = self.backoff * 2 ** attempt
+                attempt += 1
+                logger.info(f"Retrying {params['climate_id']} {params['Year']}-{params['Month']} in {delay:.1f}s ({e})")
+                await asyncio.sleep(delay)
+
+    async def fetch(self, station_id: str, granularity, year: int, month: int = 1) -> pd.DataFrame:
+        """
+        Download one station-month (hourly) or station-year (daily), or read it
+        from the raw cache.
+
+        Raises:
+            ec_exc.UnknownStationId: If the service has no data for the station
+            aiohttp.ClientError: If the request still fails after the retries
+        """
+        cache_file = self._cache_file(station_id, granularity, year, month)
+        if cache_file is not None and cache_file.exists():
+            self.hits += 1
+            text = cache_file.read_text(encoding="utf-8")
+        else:
+            text = await self._download(station_id, granularity, year, month)
+            self.misses += 1
+            if cache_file is not None and self._complete(granularity, year, month):
+                self._save(cache_file, text)
+
+        data = pd.read_csv(StringIO(text)) if text.strip() else pd.DataFrame()
+        if data.empty:
+            raise ec_exc.UnknownStationId(f"No historical data for station {station_id}")
+        return data
+
+    @staticmethod
+    def _save(cache_file: Path, text: str) -> None:
+        """Write a cache file atomically (readers never see a partial file)"""
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_name(f".{cache_file.name}.{os.getpid()}.tmp")
+        try:
+            tmp_file.write_text(text, encoding="utf-8")
+            os.replace(tmp_file, cache_file)
+        finally:
+            tmp_file.unlink(missing_ok=True)
+
+    def _cache_file(self, station_id: str, granularity, year: int, month: int) -> Optional[Path]:
+        if self.cache_dir is None:
+            return None
+        name = f"{year}.csv" if granularity.name == "DAILY" else f"{year}-{month:02d}.csv"
+        return self.cache_dir / granularity.name.lower() / str(station_id) / name
+
+    @staticmethod
+    def _complete(granularity, year: int, month: int) -> bool:
+        """True if the period is over (its data will not change anymore)"""
+        now = datetime.now()
+        if granularity.name == "DAILY":
+            return year < now.year
+        return (year, month) < (now.year, now.month)
+
+    async def _download(self, station_id: str, granularity, year: int, month: int) -> str:
+        if self._session is None:
+            raise RuntimeError("WeatherFetcher must be used as an async context manager")
+        params = {
+            "climate_id": station_id,
+            "Year": year,
+            "Month": month,
+            "Day": 1,
+            "format": "csv",
+            "timeframe": granularity.value,
+            "submit": "Download+Data",
+        }
+        text = await self._get(params)
+        # A station the service doesn't have gets a file of just the headers
+        if len(text.strip().splitlines()) <= 1:
+            return ""
+        return text
+
+    async def fetch_range(self, station_id: str, granularity, periods: Iterable[Period]) -> pd.DataFrame:
+        """
+        Download every period of a station concurrently and concatenate once.
+
+        On the first failure the other downloads are cancelled and awaited
+        before the error is raised, so none outlives the shared session.
+
+        Returns:
+            pd.DataFrame: Raw rows of all periods, in chronological order
+        """
+        tasks = [
+            asyncio.ensure_future(self.fetch(station_id, granularity, year, month))
+            for year, month in periods
+        ]
+        try:
+            frames = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
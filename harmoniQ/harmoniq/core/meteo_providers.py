@@ -0,0 +1,311 @@
+"""
+Weather data providers used by `WeatherHelper`.
+
+A provider returns the weather of a `WeatherHelper` query (position, time range,
+granularity, energy type) as a frame in the `weather_schema` format, indexed by
+`tempsdate`. `WeatherHelper` keeps the rest: the Parquet cache, the column
+selection and the shift of future years.
+
+- `ECCCProvider` (default): Environment Canada historical stations
+- `LocalProvider`: Parquet files in a local directory, no network
+  (`<directory>/<hourly|daily>/*.parquet`, one location per file, e.g. copies
+  of the WeatherHelper cache files)
+- `SyntheticProvider`: seeded synthetic series with seasonal and diurnal cycles,
+  for air-gapped nodes and deterministic benchmarks
+
+The provider is chosen by configuration:
+
+    HARMONIQ_WEATHER_PROVIDER=eccc|local|synthetic
+    HARMONIQ_WEATHER_DIR=<directory>   (local provider)
+    HARMONIQ_WEATHER_SEED=<int>        (synthetic provider, 0 by default)
+
+Results derived from the weather (production profiles, built networks) are
+cached under keys that include `provider_identity()`, so that switching
+provider, seed or directory never reuses data computed from another source.
+
+Example:
+    >>> helper = WeatherHelper(position, True, debut, fin, provider=SyntheticProvider(seed=1))
+    >>> data = await helper.load()
+"""
+
+import hashlib
+import logging
+import os
+from pathlib import Path
+from typing import Optional, Protocol, runtime_checkable
+
+import numpy as np
+import pandas as pd
+from geopy.distance import geodesic
+from scipy.signal import lfilter
+
+from harmoniq.db.schemas import weather_schema
+
+logger = logging.getLogger(__name__)
+
+PROVIDER_ENV = "HARMONIQ_WEATHER_PROVIDER"
+DIRECTORY_ENV = "HARMONIQ_WEATHER_DIR"
+SEED_ENV = "HARMONIQ_WEATHER_SEED"
+
+try:
+    import pyarrow.parquet  # noqa: F401
+    PARQUET_ENGINE = "pyarrow"
+except ImportError:
+    PARQUET_ENGINE = "fastparquet"
+
+
+@runtime_checkable
+class WeatherProvider(Protocol):
+    """
+    Source of weather data.
+
+    Attributes:
+        name (str): Provider name (configuration value)
+        cacheable (bool): If True, WeatherHelper keeps the data in its cache
+        identity (dict): Name and settings that determine the data, for cache keys
+    """
+
+    name: str
+    cacheable: bool
+
+    @property
+    def identity(self) -> dict:
+        ...
+
+    async def load(self, helper) -> pd.DataFrame:
+        """
+        Weather of a WeatherHelper query.
+
+        Args:
+            helper: Query (position, start_time, end_time, granularity, data_type)
+
+        Returns:
+            pd.DataFrame: weather_schema columns indexed by tempsdate, covering
+                at least [helper.start_time, helper.end_time]
+
+        Raises:
+            ValueError: If no valid data is available
+        """
+        ...
+
+
+class ECCCProvider:
+    """Environment Canada historical stations (nearest stations, interpolated)"""
+
+    name = "eccc"
+    cacheable = True
+
+    @property
+    def identity(self) -> dict:
+        return {"name": self.name}
+
+    async def load(self, helper) -> pd.DataFrame:
+        return await helper._load_from_stations()
+
+
+class LocalProvider:
+    """
+    Parquet files in a local directory.
+
+    Each file holds the weather of one location (latitude and longitude columns)
+    for one granularity; the nearest file within max_distance is used.
+    """
+
+    name = "local"
+    cacheable = False
+
+    def __init__(self, directory, max_distance: float = 200):
+        """
+        Args:
+            directory: Directory with one subdirectory per granularity (hourly, daily)
+            max_distance: Maximum distance in km between the query and the file location
+        """
+        self.directory = Path(directory)
+        self.max_distance = max_distance
+        self._locations = {}
+
+    @property
+    def identity(self) -> dict:
+        """Name, directory and the name, size and date of every weather file"""
+        files = [
+            (str(path.relative_to(self.directory)), stat.st_size, stat.st_mtime_ns)
+            for path in sorted(self.directory.glob("*/*.parquet"))
+            for stat in [path.stat()]
+        ]
+        return {
+            "name": self.name,
+            "directory": str(self.directory.resolve()),
+            "max_distance": self.max_distance,
+            "files": files,
+        }
+
+    def _files(self, granularity: str) -> pd.DataFrame:
+        """Location of each file of a granularity (read once)"""
+        if granularity not in self._locations:
+            rows = []
+            for path in sorted((self.directory / granularity).glob("*.parquet")):
+                coordinates = pd.read_parquet(path, engine=PARQUET_ENGINE, columns=["latitude", "longitude"])
+                if not coordinates.empty:
+                    rows.append({"path": path, **coordinates.iloc[0].to_dict()})
+            self._locations[granularity] = pd.DataFrame(rows, columns=["path", "latitude", "longitude"])
+        return self._locations[granularity]
+
+    async def load(self, helper) -> pd.DataFrame:
+        files = self._files(helper.granularity)
+        if files.empty:
+            raise ValueError(f"No {helper.granularity} weather files in {self.directory}")
+
+        position = (helper.position.latitude, helper.position.longitude)
+        distances = [geodesic(position, (f.latitude, f.longitude)).km for f in files.itertuples()]
+        nearest = int(np.argmin(distances))
+        if distances[nearest] > self.max_distance:
+            raise ValueError(f"No weather file within {self.max_distance} km of {helper.position}")
+
+        path = files.path.iloc[nearest]
+        logger.info(f"Loading weather from {path} ({distances[nearest]:.1f} km)")
+        data = pd.read_parquet(path, engine=PARQUET_ENGINE)
+        data.index = pd.DatetimeIndex(data.index, name="tempsdate")
+        data = data.sort_index().loc[helper.start_time:helper.end_time]
+        if data.empty:
+            raise ValueError(f"No weather data in {path} from {helper.start_time} to {helper.end_time}")
+        return data
+
+
+class SyntheticProvider:
+    """
+    Seeded synthetic weather with seasonal and diurnal cycles.
+
+    The same seed, position and time range always give the same series.
+    Temperature follows the latitude, the season (minimum in late January) and
+    the hour (maximum mid-afternoon) with autocorrelated noise; wind speed is
+    Weibull distributed, stronger in winter and in the afternoon, around a
+    westerly prevailing direction; precipitation is intermittent.
+    """
+
+    name = "synthetic"
+    cacheable = False
+
+    def __init__(self, seed: int = 0):
+        self.seed = seed
+
+    @property
+    def identity(self) -> dict:
+        return {"name": self.name, "seed": self.seed}
+
+    def _rng(self, helper) -> np.random.Generator:
+        key = f"{self.seed}_{helper.position.latitude:.4f}_{helper.position.longitude:.4f}"
+        return np.random.default_rng(int(hashlib.sha256(key.encode()).hexdigest()[:16], 16))
+
+    @staticmethod
+    def _ar1(rng: np.random.Generator, n: int, phi: float, sigma: float) -> np.ndarray:
+        """Autocorrelated noise (AR(1)) with a stationary standard deviation of sigma"""
+        noise = rng.normal(0, sigma * np.sqrt(1 - phi**2), n)
+        initial = [phi * rng.normal(0, sigma)]
+        return lfilter([1.0], [1.0, -phi], noise, zi=initial)[0]
+
+    async def load(self, helper) -> pd.DataFrame:
+        start = pd.Timestamp(helper.start_time).floor("D")
+        end = pd.Timestamp(helper.end_time).ceil("D")
+        index = pd.date_range(start, end, freq="h", name="tempsdate")
+        n = len(index)
+        rng = self._rng(helper)
+
+        latitude = helper.position.latitude
+        day = index.dayofyear.to_numpy()
+        hour = index.hour.to_numpy()
+        season = np.cos(2 * np.pi * (day - 20) / 365.25)  # 1 in late January
+        diurnal = np.cos(2 * np.pi * (hour - 15) / 24)  # 1 at 15h
+
+        temperature = (
+            28 - 0.5 * latitude - 14 * season + 4 * diurnal + self._ar1(rng, n, 0.97, 3)
+        )
+        humidity = np.clip(75 - 12 * diurnal + self._ar1(rng, n, 0.9, 8), 20, 100)
+        # Magnus formula
+        gamma = np.log(humidity / 100) + 17.62 * temperature / (243.12 + temperature)
+        dew_point = 243.12 * gamma / (17.62 - gamma)
+        pressure = 100.5 + self._ar1(rng, n, 0.99, 0.8)
+
+        weibull = rng.weibull(2.0, n) * 0.6 + 0.4 * np.abs(self._ar1(rng, n, 0.95, 1.2))
+        wind_speed = 16 * (1 + 0.2 * season) * (1 + 0.15 * diurnal) * weibull
+        wind_direction = np.mod(27 + self._ar1(rng, n, 0.95, 6), 36)
+
+        wet = self._ar1(rng, n, 0.9, 1) > 1.2
+        precipitation = np.where(wet, rng.exponential(1.0, n), 0.0)
+
+        hourly = pd.DataFrame(
+            {
+                "temperature_C": temperature,
+                "precipitation_mm": precipitation,
+                "direction_vent": wind_direction,
+                "vitesse_vent_kmh": wind_speed,
+                "humidite": humidity,
+                "pression": pressure,
+                "point_de_rosee": dew_point,
+            },
+            index=index,
+        )
+        if helper.granularity == "hourly":
+            data = hourly.assign(
+                max_temperature_C=np.nan,
+                min_tempature_C=np.nan,
+                pluie_mm=np.nan,
+                neige_cm=np.nan,
+                neige_accumulee_cm=np.nan,
+            )
+        else:
+            daily = hourly.resample("D")
+            gust = hourly["vitesse_vent_kmh"].groupby(hourly.index.floor("D")).idxmax()
+            precipitation = daily["precipitation_mm"].sum()
+            temperature = daily["temperature_C"].mean()
+            rain = precipitation.where(temperature > 0, 0.0)
+            snow = precipitation - rain  # 1 mm of water ~ 1 cm of snow
+            data = pd.DataFrame(
+                {
+                    "temperature_C": temperature,
+                    "max_temperature_C": daily["temperature_C"].max(),
+                    "min_tempature_C": daily["temperature_C"].min(),
+                    "pluie_mm": rain,
+                    "neige_cm": snow,
+                    "precipitation_mm": precipitation,
+                    "neige_accumulee_cm": np.nan,
+                    "direction_vent": hourly["direction_vent"].loc[gust.to_numpy()].to_numpy(),
+                    "vitesse_vent_kmh": daily["vitesse_vent_kmh"].max(),
+                    "humidite": np.nan,
+                    "pression": np.nan,
+                    "point_de_rosee": np.nan,
+                }
+            )
+            data.index.name = "tempsdate"
+
+        data = data.assign(latitude=latitude, longitude=helper.position.longitude)
+        return data[list(weather_schema.columns)]
+
+
+def get_provider(name: Optional[str] = None) -> WeatherProvider:
+    """
+    Provider selected by name or by configuration (HARMONIQ_WEATHER_PROVIDER).
+
+    Raises:
+        ValueError: If the name is unknown or the local directory is missing
+    """
+    name = (name or os.environ.get(PROVIDER_ENV, "eccc")).lower()
+    if name == "eccc":
+        return ECCCProvider()
+    if name == "local":
+        directory = os.environ.get(DIRECTORY_ENV)
+        if not directory:
+            raise ValueError(f"{DIRECTORY_ENV} must be set for the local weather provider")
+        return LocalProvider(directory)
+    if name == "synthetic":
+        return SyntheticProvider(seed=int(os.environ.get(SEED_ENV, "0")))
+    raise ValueError(f"Unknown weather provider: {name}")
+
+
+def provider_identity(provider: Optional[WeatherProvider] = None) -> dict:
+    """
+    Identity of a provider (the configured one if None), for cache keys.
+
+    Raises:
+        ValueError: If the configured provider is invalid (see get_provider)
+    """
+    return (provider or get_provider()).identity
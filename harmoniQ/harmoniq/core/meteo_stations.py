@@ -0,0 +1,237 @@
+"""
+Local inventory of the Environment Canada historical weather stations.
+
+The inventory (climate id, name, province, coordinates, hourly and daily data
+ranges) is downloaded once from the MSC GeoMet `climate-stations` collection
+and kept in `cache/stations_inventory.parquet`. It is refreshed when older than
+`max_age` or on demand with `refresh()`.
+
+Nearest-station lookups are local: the stations with data for the requested
+granularity and years are indexed in a KD-tree (on unit vectors, so that the
+chord distance orders stations like the great-circle distance) and a batch of
+coordinates is queried at once, with no network round trip.
+
+Example:
+    >>> inventory = StationInventory()
+    >>> await inventory.load()
+    >>> stations = inventory.nearest([(49.05, -66.75), (46.8, -71.2)], Granularity.HOURLY)
+"""
+
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import aiohttp
+import numpy as np
+import pandas as pd
+from env_canada.constants import USER_AGENT
+from scipy.spatial import cKDTree
+
+logger = logging.getLogger(__name__)
+
+INVENTORY_URL = "https://api.weather.gc.ca/collections/climate-stations/items"
+INVENTORY_FILE = Path(__file__).parent / "cache" / "stations_inventory.parquet"
+DEFAULT_MAX_AGE = 30 * 24 * 3600  # seconds
+PAGE_SIZE = 10000
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Same columns as env_canada.ec_historical.get_historical_stations
+COLUMNS = ["prov", "proximity", "id", "hlyRange", "dlyRange"]
+
+try:
+    import pyarrow.parquet  # noqa: F401
+    PARQUET_ENGINE = "pyarrow"
+except ImportError:
+    PARQUET_ENGINE = "fastparquet"
+
+
+def _unit_vectors(latitudes, longitudes) -> np.ndarray:
+    lat = np.radians(np.asarray(latitudes, dtype=float))
+    lon = np.radians(np.asarray(longitudes, dtype=float))
+    return np.column_stack(
+        (np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat))
+    )
+
+
+def _range(first, last) -> str:
+    """Data range in the env_canada format ('YYYY-MM-DD|YYYY-MM-DD', '|' if none)"""
+    if not first or not last:
+        return "|"
+    return f"{str(first)[:10]}|{str(last)[:10]}"
+
+
+def _years(ranges: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """First and last year of each data range (0 if none)"""
+    parts = ranges.str.split("|", expand=True)
+    first = pd.to_numeric(parts[0].str[:4], errors="coerce").fillna(0).astype(int)
+    last = pd.to_numeric(parts[1].str[:4], errors="coerce").fillna(0).astype(int)
+    return first.to_numpy(), last.to_numpy()
+
+
+class StationInventory:
+    """
+    Persisted station inventory with KD-tree nearest-station lookups.
+
+    Attributes:
+        path (Path): Inventory file
+        url (str): GeoJSON collection of the climate stations
+        max_age (float): Age in seconds after which load() refreshes the file
+    """
+
+    def __init__(
+        self,
+        path: Path = INVENTORY_FILE,
+        url: str = INVENTORY_URL,
+        max_age: float = DEFAULT_MAX_AGE,
+    ):
+        self.path = Path(path)
+        self.url = url
+        self.max_age = max_age
+        self._stations: Optional[pd.DataFrame] = None
+        # KD-trees by (granularity, start year, end year)
+        self._trees: Dict[tuple, Tuple[cKDTree, pd.DataFrame]] = {}
+
+    @property
+    def stations(self) -> pd.DataFrame:
+        if self._stations is None:
+            raise ValueError("Station inventory not loaded")
+        return self._stations
+
+    @property
+    def stale(self) -> bool:
+        if not self.path.exists():
+            return True
+        return time.time() - self.path.stat().st_mtime > self.max_age
+
+    async def load(self, refresh: bool = False) -> pd.DataFrame:
+        """Load the inventory, downloading it if missing, stale or if refresh is True"""
+        if refresh or self.stale:
+            await self.refresh()
+        elif self._stations is None:
+            self._set(pd.read_parquet(self.path, engine=PARQUET_ENGINE))
+        return self.stations
+
+    async def refresh(self) -> pd.DataFrame:
+        """Download the inventory and save it atomically"""
+        logger.info(f"Downloading station inventory from {self.url}")
+        rows = []
+        async with aiohttp.ClientSession(
+            headers={"User-Agent": USER_AGENT}, raise_for_status=True
+        ) as session:
+            offset = 0
+            while True:
+                params = {"f": "json", "limit": PAGE_SIZE, "offset": offset}
+                async with session.get(self.url, params=params) as response:
+                    features = (await response.json(content_type=None))["features"]
+                rows.extend(self._row(feature) for feature in features)
+                if len(features) < PAGE_SIZE:
+                    break
+                offset += PAGE_SIZE
+
+        stations = pd.DataFrame(rows).dropna(subset=["id", "latitude", "longitude"])
+        stations = stations.drop_duplicates("id").reset_index(drop=True)
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        try:
+            stations.to_parquet(tmp_file, engine=PARQUET_ENGINE)
+            os.replace(tmp_file, self.path)
+        finally:
+            tmp_file.unlink(missing_ok=True)
+        logger.info(f"Saved {len(stations)} stations to {self.path}")
+
+        self._set(stations)
+        return stations
+
+    @staticmethod
+    def _row(feature: dict) -> dict:
+        properties = feature.get("properties", {})
+        coordinates = (feature.get("geometry") or {}).get("coordinates") or [None, None]
+        return {
+            "id": properties.get("CLIMATE_IDENTIFIER"),
+            "name": properties.get("STATION_NAME"),
+            "prov": properties.get("PROV_STATE_TERR_CODE"),
+            "longitude": coordinates[0],
+            "latitude": coordinates[1],
+            "hlyRange": _range(properties.get("HLY_FIRST_DATE"), properties.get("HLY_LAST_DATE")),
+            "dlyRange": _range(properties.get("DLY_FIRST_DATE"), properties.get("DLY_LAST_DATE")),
+        }
+
+    def _set(self, stations: pd.DataFrame) -> None:
+        self._stations = stations
+        self._trees = {}
+
+    def _tree(self, granularity, start_year: Optional[int], end_year: Optional[int]):
+        """KD-tree of the stations with data for the granularity and the years"""
+        key = (granularity.name, start_year, end_year)
+        if key not in self._trees:
+            stations = self.stations
+            ranges = stations["hlyRange"] if granularity.name == "HOURLY" else stations["dlyRange"]
+            first, last = _years(ranges)
+            valid = ranges.ne("|").to_numpy(copy=True)
+            if start_year is not None:
+                valid &= last >= start_year
+            if end_year is not None:
+                valid &= first <= end_year
+            candidates = stations[valid].reset_index(drop=True)
+            tree = cKDTree(_unit_vectors(candidates["latitude"], candidates["longitude"]))
+            self._trees[key] = (tree, candidates)
+        return self._trees[key]
+
+    def nearest(
+        self,
+        coordinates: Sequence[Tuple[float, float]],
+        granularity,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        radius: float = 200,
+        limit: int = 100,
+    ) -> List[pd.DataFrame]:
+        """
+        Nearest stations with data, for a batch of coordinates.
+
+        Args:
+            coordinates: (latitude, longitude) pairs
+            granularity: Granularity of the data (hourly or daily range)
+            start_year: First year the station must cover (optional)
+            end_year: Last year the station must cover (optional)
+            radius: Search radius in km
+            limit: Maximum number of stations per coordinate
+
+        Returns:
+            List[pd.DataFrame]: For each coordinate, the stations indexed by name
+                and sorted by distance (km, column proximity), in the format of
+                get_historical_stations
+        """
+        tree, candidates = self._tree(granularity, start_year, end_year)
+        coordinates = np.asarray(coordinates, dtype=float).reshape(-1, 2)
+        k = min(limit, len(candidates))
+        if k == 0:
+            return [pd.DataFrame(columns=COLUMNS) for _ in coordinates]
+
+        # Chord length on the unit sphere for the search radius
+        chord = 2 * np.sin(min(radius / EARTH_RADIUS_KM, np.pi) / 2)
+        distances, indices = tree.query(
+            _unit_vectors(coordinates[:, 0], coordinates[:, 1]),
+            k=k,
+            distance_upper_bound=chord,
+        )
+        distances = np.atleast_2d(distances.reshape(len(coordinates), k))
+        indices = np.atleast_2d(indices.reshape(len(coordinates), k))
+        proximity = 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(distances / 2, 0, 1))
+
+        results = []
+        for row_distances, row_indices, row_proximity in zip(distances, indices, proximity):
+            found = np.isfinite(row_distances)
+            stations = candidates.iloc[row_indices[found]].set_index("name")
+            stations.index.name = None
+            stations = stations.assign(proximity=row_proximity[found].round(2))
+            results.append(stations[COLUMNS])
+        return results
+
+
+# Inventory shared by the WeatherHelper instances of the process
+station_inventory = StationInventory()
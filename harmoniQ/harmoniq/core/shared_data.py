@@ -0,0 +1,414 @@
+"""
+Module de partage des données statiques entre processus (mémoire partagée).
+
+Les workers uvicorn et les pools de processus lisent les mêmes données en
+lecture seule : demande répartie, profils de production, débits et apports
+des barrages. Plutôt que d'en garder une copie par processus, une donnée est
+publiée une seule fois dans un segment `multiprocessing.shared_memory` dont le
+nom est dérivé de sa clé. Les autres processus s'y attachent sans copie : la
+mémoire utilisée dépend de la taille des données, pas du nombre de processus.
+
+Un segment contient un en-tête (tableaux, types, formes et métadonnées en JSON)
+suivi des tableaux NumPy. L'en-tête est validé en dernier : un segment en cours
+d'écriture par un autre processus est ignoré.
+
+Les tableaux attachés sont en lecture seule. Les segments ouverts par un
+processus sont bornés en octets (HARMONIQ_SHARED_DATA_MAX_BYTES) : au-delà du
+budget, les moins récemment utilisés dont plus aucune vue n'est utilisée
+(suivies par des références faibles) sont fermés puis, s'il les a publiés,
+supprimés. Les segments restants sont supprimés à la sortie du processus
+(atexit); les processus déjà attachés gardent leur vue. Un processus tué sans
+pouvoir s'arrêter laisse ses segments dans /dev/shm jusqu'au redémarrage.
+
+Example:
+    >>> from harmoniq.core.shared_data import shared_data
+    >>> demande = shared_data.frame(("demand", cle), lambda: calculer_demande())
+    >>> profil = shared_data.attach_array(("profiles", cle))
+"""
+
+import atexit
+import hashlib
+import json
+import logging
+import os
+import struct
+import weakref
+from collections import OrderedDict
+from multiprocessing import resource_tracker, shared_memory
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger("SharedData")
+
+# Préfixe des segments (les noms POSIX sont limités à ~30 caractères sur macOS)
+SEGMENT_PREFIX = "hq_"
+
+MAGIC = b"HQSHM001"
+# Signature (8 octets) puis longueur de l'en-tête (8 octets)
+PREAMBLE = struct.Struct("<8sQ")
+ALIGNMENT = 64
+
+# Budget par défaut des segments ouverts par un processus
+DEFAULT_MAX_BYTES = 1024 ** 3
+
+
+def segment_name(key) -> str:
+    """
+    Nom du segment de mémoire partagée d'une clé.
+
+    Args:
+        key: Clé de la donnée (valeurs sérialisables en JSON)
+
+    Returns:
+        str: Nom du segment
+    """
+    payload = json.dumps(key, sort_keys=True, default=str)
+    return SEGMENT_PREFIX + hashlib.sha256(payload.encode()).hexdigest()[:24]
+
+
+def _aligner(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _ouvrir_segment(name: str, create: bool = False, size: int = 0) -> shared_memory.SharedMemory:
+    """
+    Ouvre ou crée un segment sans le suivi du resource_tracker.
+
+    Le resource_tracker supprimerait le segment à la sortie du premier processus
+    qui l'a ouvert, même s'il n'en est pas l'auteur; la suppression est faite
+    par SharedDataPlane.release dans le processus qui l'a publié.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, create=create, size=size, track=False)
+    except TypeError:
+        # Python < 3.13 : pas d'option track
+        shm = shared_memory.SharedMemory(name=name, create=create, size=size)
+        if os.name != "nt":
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+def _supprimer_segment(shm: shared_memory.SharedMemory):
+    """Supprime le nom d'un segment ouvert par _ouvrir_segment."""
+    if os.name == "nt":
+        # Windows libère le segment à la fermeture de la dernière vue
+        return
+    if not getattr(shm, "_track", True):
+        shm.unlink()
+        return
+    # Python < 3.13 : unlink() retire le segment du resource_tracker, qui doit
+    # donc le connaître
+    resource_tracker.register(shm._name, "shared_memory")
+    shm.unlink()
+
+
+class SharedDataPlane:
+    """
+    Registre des données publiées en mémoire partagée par le processus courant.
+
+    Attributes:
+        enabled (bool): Si False, rien n'est publié ni attaché
+            (HARMONIQ_SHARED_DATA=0 pour désactiver)
+        max_bytes (int): Taille maximale des segments ouverts par ce processus
+        evictions (int): Nombre de segments libérés pour respecter le budget
+    """
+
+    def __init__(self, enabled: Optional[bool] = None, max_bytes: Optional[int] = None):
+        """
+        Args:
+            enabled: Active le partage (HARMONIQ_SHARED_DATA, activé par défaut, si None)
+            max_bytes: Budget en octets (HARMONIQ_SHARED_DATA_MAX_BYTES ou
+                DEFAULT_MAX_BYTES si None)
+        """
+        if enabled is None:
+            enabled = os.environ.get("HARMONIQ_SHARED_DATA", "1") != "0"
+        if max_bytes is None:
+            max_bytes = int(os.environ.get("HARMONIQ_SHARED_DATA_MAX_BYTES", DEFAULT_MAX_BYTES))
+        self.enabled = enabled
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        # Segments ouverts par ce processus, du moins au plus récemment utilisé
+        # (gardés ouverts tant que les vues existent)
+        self._segments: Dict[str, shared_memory.SharedMemory] = OrderedDict()
+        # Vues retournées par segment : un segment n'est fermé que sans vue vivante
+        # (les tableaux dérivés d'une vue la gardent en vie par leur attribut base)
+        self._live: Dict[str, weakref.WeakValueDictionary] = {}
+        # Segments créés par ce processus, supprimés par release()
+        self._owned = set()
+        atexit.register(self.release)
+
+    @property
+    def published(self) -> list:
+        """Noms des segments publiés par ce processus."""
+        return sorted(self._owned)
+
+    def publish_arrays(self, key, arrays: Dict[str, np.ndarray], meta: Optional[dict] = None) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Publie des tableaux en mémoire partagée.
+
+        Args:
+            key: Clé de la donnée
+            arrays: Tableaux NumPy à publier (types numériques ou dates)
+            meta: Métadonnées sérialisables en JSON
+
+        Returns:
+            Optional[Dict[str, np.ndarray]]: Vues en lecture seule sur le segment,
+                ou None si la publication a échoué
+        """
+        if not self.enabled:
+            return None
+        name = segment_name(key)
+        if name in self._segments:
+            attached = self.attach_arrays(key)
+            return attached[0] if attached else None
+
+        layout = []
+        arrays = {k: np.ascontiguousarray(v) for k, v in arrays.items()}
+        for k, array in arrays.items():
+            if array.dtype.hasobject:
+                raise ValueError(f"Le tableau {k} contient des objets Python et ne peut pas être partagé")
+            layout.append({"name": k, "dtype": array.dtype.str, "shape": list(array.shape)})
+        header = {"arrays": layout, "meta": meta or {}}
+
+        # L'en-tête contient les positions, qui dépendent de sa propre longueur
+        offset = 0
+        for _ in range(2):
+            offset = _aligner(PREAMBLE.size + len(json.dumps(header).encode()))
+            for entry, array in zip(layout, arrays.values()):
+                entry["offset"] = offset
+                offset = _aligner(offset + array.nbytes)
+        encoded = json.dumps(header).encode()
+
+        try:
+            shm = _ouvrir_segment(name, create=True, size=max(offset, 1))
+        except FileExistsError:
+            # Publié entre-temps par un autre processus
+            attached = self.attach_arrays(key)
+            return attached[0] if attached else None
+        except OSError as e:
+            logger.warning(f"Impossible de publier {name} en mémoire partagée: {e}")
+            return None
+
+        for entry, array in zip(layout, arrays.values()):
+            view = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf, offset=entry["offset"])
+            view[...] = array
+            del view
+        shm.buf[PREAMBLE.size:PREAMBLE.size + len(encoded)] = encoded
+        # Signature écrite en dernier : le segment devient lisible
+        shm.buf[:PREAMBLE.size] = PREAMBLE.pack(MAGIC, len(encoded))
+
+        self._segments[name] = shm
+        self._owned.add(name)
+        self._evict(keep=name)
+        return self._views(name, shm, header)
+
+    def attach_arrays(self, key) -> Optional[Tuple[Dict[str, np.ndarray], dict]]:
+        """
+        S'attache aux tableaux publiés sous une clé.
+
+        Args:
+            key: Clé de la donnée
+
+        Returns:
+            Optional[Tuple[Dict[str, np.ndarray], dict]]: Vues en lecture seule et
+                métadonnées, ou None si la donnée n'est pas (encore) publiée
+        """
+        if not self.enabled:
+            return None
+        name = segment_name(key)
+        shm = self._segments.get(name)
+        if shm is None:
+            try:
+                shm = _ouvrir_segment(name)
+            except (FileNotFoundError, OSError):
+                return None
+
+        magic, length = PREAMBLE.unpack(bytes(shm.buf[:PREAMBLE.size]))
+        if magic != MAGIC:
+            if name not in self._segments:
+                shm.close()
+            return None
+        header = json.loads(bytes(shm.buf[PREAMBLE.size:PREAMBLE.size + length]))
+        self._segments[name] = shm
+        self._segments.move_to_end(name)
+        self._evict(keep=name)
+        return self._views(name, shm, header), header["meta"]
+
+    def _views(self, name: str, shm: shared_memory.SharedMemory, header: dict) -> Dict[str, np.ndarray]:
+        views = {}
+        live = self._live.setdefault(name, weakref.WeakValueDictionary())
+        for entry in header["arrays"]:
+            view = np.ndarray(tuple(entry["shape"]), dtype=np.dtype(entry["dtype"]),
+                              buffer=shm.buf, offset=entry["offset"])
+            view.flags.writeable = False
+            live[id(view)] = view
+            views[entry["name"]] = view
+        return views
+
+    def attach_array(self, key) -> Optional[np.ndarray]:
+        """Tableau unique publié par publish_array (None s'il est absent)."""
+        attached = self.attach_arrays(key)
+        return attached[0]["values"] if attached else None
+
+    def publish_array(self, key, array: np.ndarray) -> np.ndarray:
+        """
+        Publie un tableau unique.
+
+        Returns:
+            np.ndarray: Vue partagée en lecture seule, ou le tableau d'origine si
+                la publication a échoué
+        """
+        try:
+            views = self.publish_arrays(key, {"values": np.asarray(array)})
+        except (TypeError, ValueError) as e:
+            logger.debug(f"Tableau non partageable: {e}")
+            return array
+        return views["values"] if views else array
+
+    def publish_frame(self, key, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Publie un DataFrame numérique (valeurs homogènes, index numérique ou de dates).
+
+        Les attributs privés du DataFrame (p. ex. `_energy_not_power`) sont conservés.
+
+        Args:
+            key: Clé de la donnée
+            df: DataFrame à publier
+
+        Returns:
+            pd.DataFrame: DataFrame adossé à la mémoire partagée, ou df si la
+                publication a échoué
+        """
+        if not self.enabled:
+            return df
+        attributes = {k: v for k, v in vars(df).items()
+                      if k.startswith('_') and not k.startswith('__') and isinstance(v, (bool, int, float, str))
+                      and k not in ('_flags',)}
+        try:
+            values = df.to_numpy(dtype='float64')
+            index = np.asarray(df.index)
+            meta = {
+                "columns": [str(c) if not isinstance(c, (int, float)) else c for c in df.columns],
+                "columns_name": df.columns.name,
+                "index_name": df.index.name,
+                "attributes": attributes,
+            }
+            views = self.publish_arrays(key, {"values": values, "index": index}, meta)
+        except (TypeError, ValueError) as e:
+            logger.debug(f"DataFrame non partageable: {e}")
+            return df
+        if views is None:
+            return df
+        attached = self.attach_frame(key)
+        return df if attached is None else attached
+
+    def attach_frame(self, key) -> Optional[pd.DataFrame]:
+        """
+        DataFrame publié par publish_frame, sans copie des valeurs.
+
+        Returns:
+            Optional[pd.DataFrame]: DataFrame en lecture seule, ou None s'il est absent
+        """
+        attached = self.attach_arrays(key)
+        if attached is None:
+            return None
+        views, meta = attached
+        index = pd.Index(views["index"], name=meta.get("index_name"), copy=False)
+        columns = pd.Index(meta.get("columns", []), name=meta.get("columns_name"))
+        df = pd.DataFrame(views["values"], index=index, columns=columns, copy=False)
+        for attr, value in meta.get("attributes", {}).items():
+            object.__setattr__(df, attr, value)
+        return df
+
+    def frame(self, key, loader: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        """
+        DataFrame partagé : attaché s'il est publié, sinon chargé puis publié.
+
+        Args:
+            key: Clé de la donnée
+            loader: Fonction qui charge la donnée
+
+        Returns:
+            pd.DataFrame: DataFrame (en lecture seule s'il est partagé)
+        """
+        df = self.attach_frame(key)
+        if df is None:
+            df = self.publish_frame(key, loader())
+        return df
+
+    @property
+    def nbytes(self) -> int:
+        """Taille des segments ouverts par ce processus."""
+        return sum(shm.size for shm in self._segments.values())
+
+    def _evict(self, keep: Optional[str] = None):
+        """
+        Libère les segments les moins récemment utilisés au-delà du budget.
+
+        Args:
+            keep: Segment à conserver même s'il dépasse seul le budget
+        """
+        total = self.nbytes
+        for name in list(self._segments):
+            if total <= self.max_bytes:
+                break
+            if name == keep:
+                continue
+            size = self._segments[name].size
+            if self._free(name):
+                self.evictions += 1
+                total -= size
+                logger.debug(f"Segment {name} libéré ({size} octets)")
+
+    def _in_use(self, name: str) -> bool:
+        """True si une vue retournée sur le segment (ou un tableau qui en dérive) existe encore."""
+        return len(self._live.get(name, ())) > 0
+
+    def _unlink(self, name: str):
+        """Supprime le nom d'un segment publié par ce processus."""
+        if name not in self._owned:
+            return
+        # Le nom disparaît; les processus attachés gardent leur vue
+        try:
+            _supprimer_segment(self._segments[name])
+        except FileNotFoundError:
+            pass
+        self._owned.discard(name)
+
+    def _free(self, name: str) -> bool:
+        """
+        Ferme un segment sans vue vivante, puis le supprime s'il a été publié
+        par ce processus.
+
+        Fermer un segment démappe sa mémoire sous les tableaux NumPy qui
+        l'utilisent : un segment dont une vue existe encore reste ouvert.
+
+        Returns:
+            bool: True si le segment a été fermé (False si des vues l'utilisent encore)
+        """
+        if self._in_use(name):
+            return False
+        shm = self._segments[name]
+        try:
+            shm.close()
+        except BufferError:
+            return False
+        self._unlink(name)
+        del self._segments[name]
+        self._live.pop(name, None)
+        return True
+
+    def release(self):
+        """
+        Supprime les segments publiés par ce processus et ferme ceux qui ne sont
+        plus utilisés (les vues encore vivantes restent valides).
+        """
+        for name in list(self._segments):
+            if not self._free(name):
+                self._unlink(name)
+
+
+# Registre du processus courant
+shared_data = SharedDataPlane()
@@ -9,6 +9,9 @@ import logging
 
 logger = logging.getLogger("EolienneParc")
 
+# Colonnes météo utilisées par get_parc_power
+COLONNES_METEO = ["temperature_C", "vitesse_vent_kmh", "direction_vent"]
+
 
 class InfraParcEolienne(Infrastructure):
     def __init__(self, donnees: EolienneParcBase):
@@ -33,6 +36,7 @@ class InfraParcEolienne(Infrastructure):
             interpolate=True,
             granularity=granularite,
             data_type=wind_energy,
+            columns=COLONNES_METEO,
         )
 
         return helper.load()
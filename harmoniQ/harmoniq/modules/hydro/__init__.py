@@ -10,6 +10,7 @@ from harmoniq.modules.hydro.calcule import (
     get_facteur_de_charge,
     get_energy,
     reservoir_infill,
+    lire_serie,
 )
 import pandas as pd
 import numpy as np
@@ -45,8 +46,7 @@ class InfraHydro(Infrastructure):
         pas_temps = self.scenario.pas_de_temps
     
         if self.donnees.nom == "Beauharnois_Francis":
-            debit = pd.read_csv(filepath_or_buffer=DEBIT_DIR / "Beauharnois.csv")
-            debit["dateTime"] = pd.to_datetime(debit["dateTime"])
+            debit = lire_serie(DEBIT_DIR / "Beauharnois.csv", "dateTime")
             debit = debit[
                 (debit["dateTime"] >= start_date) & (debit["dateTime"] <= end_date)
                 ]
@@ -62,8 +62,7 @@ class InfraHydro(Infrastructure):
                 debit = debit.set_index("dateTime")            
                 self.debit = debit[["Beauharnois"]] * (26 / 36)                                
         elif self.donnees.nom == "Beauharnois_Kaplan":
-            debit = pd.read_csv(filepath_or_buffer=DEBIT_DIR / "Beauharnois.csv")
-            debit["dateTime"] = pd.to_datetime(debit["dateTime"])
+            debit = lire_serie(DEBIT_DIR / "Beauharnois.csv", "dateTime")
             debit = debit[
                 (debit["dateTime"] >= start_date) & (debit["dateTime"] <= end_date)
             ]
@@ -79,8 +78,7 @@ class InfraHydro(Infrastructure):
                 debit = debit.set_index("dateTime")            
                 self.debit = debit[["Beauharnois"]] * (10 / 36)
         else:
-            debit = pd.read_csv(filepath_or_buffer=DEBIT_DIR / filename_debit)
-            debit["dateTime"] = pd.to_datetime(debit["dateTime"])
+            debit = lire_serie(DEBIT_DIR / filename_debit, "dateTime")
             debit = debit[
                 (debit["dateTime"] >= start_date) & (debit["dateTime"] <= end_date)
             ]
@@ -101,8 +99,7 @@ class InfraHydro(Infrastructure):
         end_date = "2026-01-01"
         id_HQ = str(self.donnees.id_HQ)
         filename_apport = id_HQ + ".csv"
-        apport = pd.read_csv(filepath_or_buffer=APPORT_DIR / filename_apport)
-        apport["time"] = pd.to_datetime(apport["time"])
+        apport = lire_serie(APPORT_DIR / filename_apport, "time")
         self.apport = apport[
             (apport["time"] >= start_date) & (apport["time"] <= end_date)
         ]
@@ -5,11 +5,36 @@ from pathlib import Path
 from HydroGenerate.hydropower_potential import calculate_hp_potential
 from harmoniq.db.engine import get_db
 from harmoniq.db.CRUD import read_all_hydro
+from harmoniq.core.shared_data import shared_data
 
 CURRENT_DIR = Path(__file__).parent
 APPORT_DIR = CURRENT_DIR / "apport_naturel"
 
 
+def lire_serie(chemin: Path, colonne_temps: str) -> pd.DataFrame:
+    """
+    Lit une série de débits ou d'apports naturels (CSV), une seule fois pour
+    tous les processus : les colonnes numériques sont publiées en mémoire
+    partagée et les autres processus s'y attachent sans copie.
+
+    Args:
+        chemin: Fichier CSV de la série
+        colonne_temps: Colonne des dates
+
+    Returns:
+        pd.DataFrame: Colonnes numériques (lecture seule), avec la colonne des dates
+    """
+    stat = chemin.stat()
+    cle = ("hydro", str(chemin.resolve()), stat.st_size, stat.st_mtime_ns)
+
+    def charger():
+        serie = pd.read_csv(filepath_or_buffer=chemin)
+        serie[colonne_temps] = pd.to_datetime(serie[colonne_temps])
+        return serie.set_index(colonne_temps).select_dtypes("number").astype("float64")
+
+    return shared_data.frame(cle, charger).reset_index()
+
+
 def reservoir_infill(
     besoin_puissance, pourcentage_reservoir, apport_naturel, timestamp
 ):
@@ -105,8 +130,7 @@ def charger_apport_reservoir(
             data_barrage = barrages[i]
             id_HQ = data_barrage.id_HQ
             nom_fichier = str(id_HQ) + ".csv"
-            apport = pd.read_csv(filepath_or_buffer=APPORT_DIR / nom_fichier)
-            apport["time"] = pd.to_datetime(apport["time"])
+            apport = lire_serie(APPORT_DIR / nom_fichier, "time")
             apport = apport[
                 (apport["time"] >= start_date) & (apport["time"] <= end_date)
             ]
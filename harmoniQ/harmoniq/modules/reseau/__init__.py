@@ -5,22 +5,23 @@ from harmoniq.db.engine import get_db
 from harmoniq.modules.hydro.calcule import reservoir_infill
 
 from harmoniq.modules.reseau.core import NetworkBuilder, PowerFlowAnalyzer, NetworkOptimizer
+from harmoniq.modules.reseau.core.dispatch import (EMERGENCY_PREFIX, build_dispatch_matrices,
+                                                   capacity_multipliers, sweep_dispatch)
 from harmoniq.modules.reseau.utils import EnergyUtils
+from harmoniq.modules.reseau.utils.stage_cache import stage_key, frame_fingerprint, record_fingerprint
+from harmoniq.modules.reseau.utils.network_cache import NetworkCache, network_key, network_memory_cache
 
 import pandas as pd
 import numpy as np
 import pypsa
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Tuple, Union
+import itertools
 import logging
 from pathlib import Path
-import os
-import hashlib
 
 logger = logging.getLogger("Reseau")
 
 MODULES_DIR = Path(__file__).parent
-NETWORK_CACHE_DIR = MODULES_DIR / "n_cache"/ "network_cache"
-os.makedirs(NETWORK_CACHE_DIR, exist_ok=True)
 
 
 class InfraReseau(Infrastructure):
@@ -47,6 +48,10 @@ class InfraReseau(Infrastructure):
         self.statistics = {}
         self.builder = NetworkBuilder(data_dir)
         self.is_journalier = False  # Par défaut, le mode horaire est utilisé
+        self.workers = 1  # Nombre de processus pour la répartition de la production
+        self.stage_cache = self.builder.data_loader.stage_cache  # Cache des étapes du pipeline
+        self.network_cache = NetworkCache()  # Cache des réseaux construits
+        self.memory_cache = network_memory_cache  # Réseaux construits gardés en mémoire par le processus
         
     def charger_scenario(self, scenario: ScenarioBase):
 
@@ -68,41 +73,22 @@ class InfraReseau(Infrastructure):
         if liste_infra is None:
             liste_infra = self.donnees
             
-        # Générer un identifiant unique pour la configuration
-        scenario_id = getattr(self.scenario, 'id', 0)
-        scenario_date = getattr(self.scenario, 'date_de_debut', None)
-        scenario_year = scenario_date.year if scenario_date else "unknown"
-        
-        # Créer une signature unique pour la liste d'infrastructures
-        infra_id = getattr(liste_infra, 'id', 0)
-        infra_hash = str(infra_id)
-        try:
-            infra_str = str(liste_infra.dict()) if hasattr(liste_infra, 'dict') else str(infra_id)
-            infra_hash = hashlib.md5(infra_str.encode()).hexdigest()[:8]
-        except Exception:
-            pass
+        # Clé calculée à partir des données utilisées pour construire le réseau
+        network_cache_key = await network_key(self.builder.data_loader, self.scenario, liste_infra)
         
-        network_filename = f"network_s{scenario_id}_{scenario_year}_i{infra_id}_{infra_hash}.nc"
-        network_path = NETWORK_CACHE_DIR / network_filename
+        # Réseau déjà construit par ce processus
+        network = self.memory_cache.get(network_cache_key)
+        if network is not None:
+            self.network = network
+            logger.info(f"Réseau repris de la mémoire: {len(network.buses)} bus, {len(network.generators)} générateurs")
+            return network
         
         # Vérifier si un réseau précalculé existe
-        if network_path.exists():
-            logger.info(f"Chargement du réseau précalculé depuis {network_path}")
-            try:
-                network = pypsa.Network()
-                network.import_from_netcdf(str(network_path))
-                
-                self.network = network
-                logger.info(f"Réseau chargé: {len(network.buses)} bus, {len(network.lines)} lignes, {len(network.generators)} générateurs")
-                return network
-                
-            except Exception as e:
-                logger.warning(f"Erreur lors du chargement du réseau: {e}")
-                try:
-                    os.remove(network_path)
-                    logger.info(f"Fichier cache supprimé: {network_path}")
-                except:
-                    pass
+        network = self.network_cache.get(network_cache_key)
+        if network is not None:
+            self.network = self.memory_cache.put(network_cache_key, network)
+            logger.info(f"Réseau chargé: {len(network.buses)} bus, {len(network.lines)} lignes, {len(network.generators)} générateurs")
+            return self.network
         
         # Création d'un nouveau réseau
         logger.info("Création d'un nouveau réseau électrique")
@@ -114,48 +100,23 @@ class InfraReseau(Infrastructure):
         network = await self.builder.create_network(self.scenario, liste_infra, annee, start_date, end_date)
         
         
-        # Normaliser les types de données avant sauvegarde
-        self._normaliser_types_reseau(network)
-        
-        # Sauvegarder en format netCDF
-        try:
-            network.export_to_netcdf(str(network_path))
-            logger.info("Réseau sauvegardé avec succès")
-        except Exception as e:
-            logger.warning(f"Erreur lors de la sauvegarde du réseau: {e}")
+        # Sauvegarder au format Parquet (types des colonnes conservés)
+        self.network_cache.put(network_cache_key, network)
         
-        self.network = network
+        self.network = self.memory_cache.put(network_cache_key, network)
         logger.info(f"Réseau créé: {len(network.buses)} bus, {len(network.lines)} lignes, {len(network.generators)} générateurs")
         
-        return network
-
-    def _normaliser_types_reseau(self, network):
-        """
-        Normalise les types de données dans le réseau pour la sauvegarde.
-        
-        Args:
-            network: Réseau PyPSA à normaliser
-        """
-        if 'type' in network.buses.columns:
-            network.buses.type = network.buses.type.astype(str)
-        
-        for component in ['generators', 'loads', 'lines', 'transformers']:
-            df = getattr(network, component)
-            for col in df.columns:
-                if df[col].dtype == 'object':
-                    try:
-                        df[col] = df[col].astype(str)
-                    except:
-                        pass
+        return self.network
 
     @necessite_scenario
-    async def calculer_capacite_import_export(self, liste_infra) -> float:
+    async def calculer_capacite_import_export(self, liste_infra, verifier_dichotomie=False) -> float:
         """
         Calcule la capacité maximale d'import/export (Pmax) en équilibrant
         le déséquilibre énergétique global.
         
         Args:
             liste_infra: Liste des infrastructures du réseau
+            verifier_dichotomie: Si True, compare Pmax à la recherche par dichotomie
             
         Returns:
             float: Capacité maximale d'import/export calculée (Pmax)
@@ -178,61 +139,16 @@ class InfraReseau(Infrastructure):
             deltaE += energie_estimee
         
         # Calcul de l'import maximal théorique à chaque pas de temps
-        import_max_theorique = []
-        for heure in self.network.snapshots:
-            try:
-                # Besoins énergétiques
-                besoins_df = self.network.loads_t.p_set.loc[heure]
-                besoins_heure = besoins_df.sum() if isinstance(besoins_df, pd.Series) else besoins_df.sum().sum()
-                besoins_heure = float(besoins_heure)
-                
-                # Production des sources fatales
-                sources_fatales = self.network.generators[
-                    self.network.generators.carrier.isin(['hydro_fil', 'eolien', 'solaire'])
-                ].index
-                
-                production_fatale = 0
-                if not self.network.generators_t.p_max_pu.empty and len(sources_fatales) > 0:
-                    for gen in sources_fatales:
-                        if gen in self.network.generators_t.p_max_pu.columns:
-                            p_nom = float(self.network.generators.loc[gen, 'p_nom'])
-                            p_max_pu_val = float(self.network.generators_t.p_max_pu.loc[heure, gen])
-                            
-                            if pd.isna(p_nom) or pd.isna(p_max_pu_val):
-                                continue
-                                
-                            production_fatale += p_nom * p_max_pu_val
-                
-                import_max = besoins_heure - production_fatale
-                import_max_theorique.append(import_max)
-            
-            except Exception as e:
-                logger.error(f"Erreur lors du calcul pour {heure}: {str(e)}")
-                import_max_theorique.append(0.0)
+        import_max_theorique = EnergyUtils.calculer_import_max_theorique(self.network)
         
-        # Recherche de Pmax par dichotomie
-        Pmax_min = min(import_max_theorique)
-        Pmax_max = max(import_max_theorique)
-        Pmax = (Pmax_min + Pmax_max) / 2
+        # Pmax exact : la somme des imports plafonnés égale deltaE
+        Pmax = EnergyUtils.resoudre_pmax(import_max_theorique, deltaE)
+        logger.info(f"Pmax calculé: {Pmax:.2f} MW")
         
-        tolerance = 0.1
-        iterations_max = 100
-        
-        for iteration in range(iterations_max):
-            imports = [min(Pmax, max_theorique) for max_theorique in import_max_theorique]
-            somme_imports = sum(imports)
-            
-            if abs(somme_imports - deltaE) < tolerance:
-                break
-            
-            if somme_imports > deltaE:
-                Pmax_max = Pmax
-            else:
-                Pmax_min = Pmax
-            
-            Pmax = (Pmax_min + Pmax_max) / 2
-        
-        logger.info(f"Pmax calculé: {Pmax:.2f} MW après {iteration+1} itérations")
+        if verifier_dichotomie:
+            Pmax_dichotomie, iterations = EnergyUtils.pmax_par_dichotomie(import_max_theorique, deltaE)
+            logger.info(f"Pmax par dichotomie: {Pmax_dichotomie:.2f} MW après {iterations} itérations "
+                        f"(écart {abs(Pmax - Pmax_dichotomie):.4f} MW)")
         
         self.Pmax = Pmax
         self.deltaE = deltaE
@@ -271,6 +187,62 @@ class InfraReseau(Infrastructure):
             else:
                 Pmax = self.Pmax
         
+        preparation = self._preparer_repartition(Pmax, is_journalier)
+        if preparation is None:
+            return self.network, {}
+        bus_frontiere, niveaux_reservoirs = preparation
+        
+        # Optimiser le réseau avec l'optimisateur manuel au lieu de PyPSA standard
+        optimizer = NetworkOptimizer(self.network, is_journalier=is_journalier, workers=self.workers)
+        # On vérifie quand même la faisabilité pour information
+        feasible, message = optimizer.check_optimization_feasibility()
+        logger.info(f"Feasibility check: {feasible}, {message}")
+        
+        # Utilise notre méthode d'optimisation manuelle, répartie par blocs
+        # de pas de temps si plusieurs processus sont demandés
+        dispatch_key = self._cle_repartition(is_journalier)
+        if self._charger_repartition(dispatch_key):
+            logger.info("Répartition de la production chargée depuis le cache")
+            optimized_network = self.network
+        else:
+            if self.workers > 1:
+                optimized_network = optimizer.optimize(method="vectorized")
+            else:
+                optimized_network = optimizer.optimize_manually()
+            self._sauvegarder_repartition(dispatch_key)
+        optimization_results = optimizer.get_optimization_results()
+
+        statistics = {
+            "Pmax_calcule": Pmax,
+            "niveaux_reservoirs": niveaux_reservoirs,
+            "optimization_results": optimization_results,
+            "production_par_type": optimized_network.generators_t['p'].T.groupby(
+                optimized_network.generators.carrier
+            ).sum().T,
+            "energie_importee": optimized_network.generators_t['p'].get(f"import_{bus_frontiere}", pd.Series()).sum() 
+                if f"import_{bus_frontiere}" in optimized_network.generators_t['p'].columns else 0,
+            "energie_exportee": optimized_network.loads_t['p'].get(f"export_{bus_frontiere}", pd.Series()).sum() 
+                if f"export_{bus_frontiere}" in optimized_network.loads_t['p'].columns else 0
+        }
+        
+        self.statistics = statistics
+        self.network = optimized_network
+        return optimized_network, statistics
+
+    def _preparer_repartition(self, Pmax, is_journalier) -> Optional[Tuple[str, pd.DataFrame]]:
+        """
+        Prépare self.network pour la répartition : pas de temps journalier si
+        demandé, coûts des réservoirs selon des niveaux simulés, interconnexion
+        et solvabilité.
+        
+        Args:
+            Pmax: Capacité maximale d'import/export (MW)
+            is_journalier: Si True, utilise un pas de temps journalier (24h)
+            
+        Returns:
+            Optional[Tuple[str, pd.DataFrame]]: Bus frontière et niveaux des
+                réservoirs, ou None si le réseau n'a aucun barrage à réservoir
+        """
         # Réechantillonner à une fréquence journalière si demandé
         if is_journalier:
             logger.info("Passage en mode journalier (pas de temps = 24h)")
@@ -282,62 +254,114 @@ class InfraReseau(Infrastructure):
         
         if not barrages_reservoir:
             logger.warning("Aucun barrage à réservoir trouvé dans le réseau")
-            return self.network, {}
-        
-        # Générer des niveaux de réservoir simulés
+            return None
+        
+        # Générer des niveaux de réservoir simulés, avec une graine tirée du
+        # scénario et des pas de temps : les coûts (et donc la clé du cache de
+        # répartition) sont les mêmes d'une exécution à l'autre
+        graine = int(stage_key(
+            "niveaux_reservoirs",
+            record_fingerprint(self.scenario) if self.scenario is not None else None,
+            self.network.snapshots,
+            barrages_reservoir,
+        )[:8], 16)
         niveaux_reservoirs = EnergyUtils.generer_faux_niveaux_reservoirs(
-            self.network.snapshots, barrages_reservoir
+            self.network.snapshots, barrages_reservoir, seed=graine
+        )
+        
+        # Calculer les coûts marginaux basés sur les niveaux (pas de temps × barrages)
+        marginal_costs = pd.DataFrame(
+            EnergyUtils.calcul_cout_reservoir(niveaux_reservoirs.to_numpy()),
+            index=niveaux_reservoirs.index,
+            columns=niveaux_reservoirs.columns
         )
         
-        # Calculer les coûts marginaux basés sur les niveaux
-        marginal_costs = pd.DataFrame(index=self.network.snapshots)
-        for barrage in barrages_reservoir:
-            costs = []
-            for timestamp in self.network.snapshots:
-                niveau = niveaux_reservoirs.loc[timestamp, barrage]
-                costs.append(EnergyUtils.calcul_cout_reservoir(niveau))
-            marginal_costs[barrage] = costs
-        
-        # Ajouter les coûts marginaux au réseau
-        if not hasattr(self.network, 'generators_t'):
-            self.network.generators_t = {}
-        if 'marginal_cost' not in self.network.generators_t:
-            self.network.generators_t['marginal_cost'] = pd.DataFrame(index=self.network.snapshots)
-        
-        for barrage in barrages_reservoir:
-            self.network.generators_t['marginal_cost'][barrage] = marginal_costs[barrage]
+        # Ajouter les coûts marginaux au réseau en une seule opération
+        marginal_cost_t = self.network.generators_t['marginal_cost']
+        couts = pd.concat(
+            [marginal_cost_t.drop(columns=barrages_reservoir, errors='ignore'), marginal_costs],
+            axis=1
+        ).reindex(self.network.snapshots)
+        couts.columns.name = marginal_cost_t.columns.name
+        self.network.generators_t['marginal_cost'] = couts
 
         # Ajouter l'interconnexion et vérifier la connectivité
         bus_frontiere = EnergyUtils.obtenir_bus_frontiere(self.network, "Interconnexion")
         self.network = EnergyUtils.ajouter_interconnexion_import_export(self.network, Pmax)
         self.network = EnergyUtils.ensure_network_solvability(self.network)
         
-        # Optimiser le réseau avec l'optimisateur manuel au lieu de PyPSA standard
-        optimizer = NetworkOptimizer(self.network, is_journalier=is_journalier)
-        # On vérifie quand même la faisabilité pour information
-        feasible, message = optimizer.check_optimization_feasibility()
-        logger.info(f"Feasibility check: {feasible}, {message}")
+        return bus_frontiere, niveaux_reservoirs
+
+    def _cle_repartition(self, is_journalier) -> str:
+        """
+        Clé du cache de répartition : ne dépend que des entrées de l'optimisation.
         
-        # Utilise notre méthode d'optimisation manuelle
-        optimized_network = optimizer.optimize_manually()
-        optimization_results = optimizer.get_optimization_results()
+        Args:
+            is_journalier: Si True, le pas de temps est journalier
+            
+        Returns:
+            str: Clé de l'artefact de répartition
+        """
+        network = self.network
+        return stage_key(
+            "dispatch",
+            bool(is_journalier),
+            getattr(network.loads_t.p_set, '_energy_not_power', None),
+            frame_fingerprint(network.buses[['type']].astype(str)),
+            frame_fingerprint(network.generators[['bus', 'carrier', 'p_nom', 'marginal_cost']]),
+            frame_fingerprint(network.generators_t.p_max_pu),
+            frame_fingerprint(network.generators_t.marginal_cost),
+            frame_fingerprint(network.loads[['bus']]),
+            frame_fingerprint(network.loads_t.p_set),
+        )
 
-        statistics = {
-            "Pmax_calcule": Pmax,
-            "niveaux_reservoirs": niveaux_reservoirs,
-            "optimization_results": optimization_results,
-            "production_par_type": optimized_network.generators_t['p'].groupby(
-                optimized_network.generators.carrier, axis=1
-            ).sum(),
-            "energie_importee": optimized_network.generators_t['p'].get(f"import_{bus_frontiere}", pd.Series()).sum() 
-                if f"import_{bus_frontiere}" in optimized_network.generators_t['p'].columns else 0,
-            "energie_exportee": optimized_network.loads_t['p'].get(f"export_{bus_frontiere}", pd.Series()).sum() 
-                if f"export_{bus_frontiere}" in optimized_network.loads_t['p'].columns else 0
-        }
+    def _charger_repartition(self, key: str) -> bool:
+        """
+        Restaure une répartition de la production depuis le cache.
         
-        self.statistics = statistics
-        self.network = optimized_network
-        return optimized_network, statistics
+        Le générateur d'urgence éventuellement ajouté ou agrandi par la répartition
+        est restauré avec son profil de disponibilité.
+        
+        Args:
+            key: Clé de l'artefact de répartition
+            
+        Returns:
+            bool: True si la répartition a été restaurée
+        """
+        cached = self.stage_cache.load("dispatch", key)
+        if cached is None:
+            return False
+        
+        network = self.network
+        emergency = cached['emergency']
+        if not emergency.empty:
+            existing = network.generators.index.intersection(emergency.index)
+            if len(existing) > 0:
+                network.remove("Generator", existing)
+            network.add("Generator", emergency.index, **{col: emergency[col] for col in emergency.columns})
+            for name, p_max_pu in cached['emergency_p_max_pu'].items():
+                network.generators_t.p_max_pu[name] = p_max_pu
+        
+        network.generators_t['p'] = cached['p']
+        network.status = "ok"
+        network.termination_condition = "manual"
+        return True
+
+    def _sauvegarder_repartition(self, key: str):
+        """
+        Enregistre la répartition de la production dans le cache.
+        
+        Args:
+            key: Clé de l'artefact de répartition
+        """
+        network = self.network
+        emergency = network.generators.index[network.generators.index.str.startswith(EMERGENCY_PREFIX)]
+        p_max_pu = network.generators_t.p_max_pu
+        self.stage_cache.save("dispatch", key, {
+            'p': network.generators_t['p'],
+            'emergency': network.generators.loc[emergency, ['bus', 'p_nom', 'marginal_cost', 'carrier']],
+            'emergency_p_max_pu': p_max_pu[emergency.intersection(p_max_pu.columns)],
+        })
 
     @necessite_scenario
     async def optimiser_avec_gestion_reservoirs(self, liste_infra, Pmax=None, is_journalier=None) -> pypsa.Network:
@@ -375,7 +399,7 @@ class InfraReseau(Infrastructure):
         return network
 
     @necessite_scenario
-    async def workflow_import_export(self, liste_infra, is_journalier=False) -> Tuple[pypsa.Network, Dict]:
+    async def workflow_import_export(self, liste_infra, is_journalier=False, workers=None) -> Tuple[pypsa.Network, Dict]:
         """
         Exécute le workflow complet d'import/export avec gestion des réservoirs.
         
@@ -386,6 +410,8 @@ class InfraReseau(Infrastructure):
         Args:
             liste_infra: Liste des infrastructures du réseau
             is_journalier: Si True, utilise un pas de temps journalier (24h)
+            workers: Nombre de processus pour la répartition de la production
+                (valeur de l'instance si None)
         
         Returns:
             Tuple[network, statistics]: Réseau optimisé et statistiques
@@ -394,6 +420,8 @@ class InfraReseau(Infrastructure):
         
         # Mettre à jour le mode de l'instance
         self.is_journalier = is_journalier
+        if workers is not None:
+            self.workers = workers
         
         Pmax = await self.calculer_capacite_import_export(liste_infra)
         network, statistics = await self.fake_optimiser_reservoirs(liste_infra, Pmax, is_journalier)
@@ -401,6 +429,103 @@ class InfraReseau(Infrastructure):
         logger.info("Workflow d'optimisation terminé")
         return network, statistics
     
+    async def comparer_scenarios(self, scenarios: Dict[str, ScenarioBase], listes_infra: Optional[Dict] = None,
+                                 is_journalier=False) -> Dict[str, pd.DataFrame]:
+        """
+        Compare plusieurs scénarios (météo, consommation, listes d'infrastructures)
+        en répartissant leur production en un seul passage vectorisé.
+        
+        Chaque réseau est construit (ou repris des caches) et préparé comme dans
+        fake_optimiser_reservoirs, puis tous les réseaux sont répartis ensemble
+        par NetworkOptimizer.optimize_batch. L'état de l'instance (scénario,
+        réseau) n'est pas modifié.
+        
+        Args:
+            scenarios: Scénarios à comparer, par nom (même nombre de pas de temps)
+            listes_infra: Liste des infrastructures de chaque scénario
+                (self.donnees pour un scénario absent)
+            is_journalier: Si True, utilise un pas de temps journalier (24h)
+            
+        Returns:
+            Dict[str, pd.DataFrame]: Production de chaque scénario (pas de temps × générateurs)
+        """
+        listes_infra = listes_infra or {}
+        etat = (self.scenario, self.network, self.statistics, getattr(self, 'Pmax', None), getattr(self, 'deltaE', None))
+        
+        networks = {}
+        try:
+            for nom, scenario in scenarios.items():
+                logger.info(f"Préparation du scénario {nom}")
+                liste_infra = listes_infra.get(nom, self.donnees)
+                self.scenario = scenario
+                self.network = None
+                await self.creer_reseau(liste_infra)
+                Pmax = await self.calculer_capacite_import_export(liste_infra)
+                if self._preparer_repartition(Pmax, is_journalier) is None:
+                    raise ValueError(f"Aucun barrage à réservoir dans le réseau du scénario {nom}")
+                networks[nom] = self.network
+        finally:
+            self.scenario, self.network, self.statistics, Pmax, deltaE = etat
+            if Pmax is not None:
+                self.Pmax, self.deltaE = Pmax, deltaE
+            else:
+                for attr in ('Pmax', 'deltaE'):
+                    self.__dict__.pop(attr, None)
+        
+        networks = NetworkOptimizer.optimize_batch(networks, is_journalier=is_journalier, workers=self.workers)
+        return {nom: network.generators_t['p'] for nom, network in networks.items()}
+
+    @necessite_scenario
+    async def balayer_capacites(self, points: Union[List[Dict[str, float]], Dict[str, List[float]]],
+                                liste_infra=None, is_journalier=None) -> pd.DataFrame:
+        """
+        Étude de sensibilité sur les capacités installées, sans reconstruire le réseau.
+        
+        Chaque point multiplie p_nom par filière ('eolien': 1.5, 'thermique': 0.0)
+        ou par générateur; seule la répartition est refaite, à partir des profils
+        p_max_pu, des coûts et de la demande du réseau courant. Les points sont
+        répartis dans un pool de processus si self.workers > 1.
+        
+        Si aucun réseau n'est chargé, il est construit et préparé comme dans
+        fake_optimiser_reservoirs; sinon self.network est utilisé tel quel.
+        
+        Args:
+            points: Liste de points, ou grille {clé: [multiplicateurs]} dont
+                toutes les combinaisons sont évaluées
+            liste_infra: Liste des infrastructures du réseau (optionnel)
+            is_journalier: Si True, utilise un pas de temps journalier (24h)
+            
+        Returns:
+            pd.DataFrame: Une ligne par point : multiplicateurs, énergie par
+                filière, énergie importée, énergie d'urgence (MWh) et coût total
+        """
+        is_journalier = self.is_journalier if is_journalier is None else is_journalier
+        if isinstance(points, dict):
+            cles = list(points)
+            points = [dict(zip(cles, valeurs)) for valeurs in itertools.product(*points.values())]
+        
+        if self.network is None:
+            await self.creer_reseau(liste_infra)
+            Pmax = await self.calculer_capacite_import_export(liste_infra)
+            self._preparer_repartition(Pmax, is_journalier)
+        
+        network = self.network
+        loads_is_energy = getattr(network.loads_t.p_set, '_energy_not_power', is_journalier)
+        matrices = build_dispatch_matrices(network, loads_is_energy)
+        multipliers = np.array([
+            capacity_multipliers(point, matrices.generators, matrices.carriers) for point in points
+        ])
+        
+        logger.info(f"Balayage de {len(points)} points de capacité sur {self.workers} processus")
+        bilans = sweep_dispatch(matrices, multipliers, 24.0 if is_journalier else 1.0, self.workers)
+        
+        cles = list(dict.fromkeys(cle for point in points for cle in point))
+        resultats = pd.DataFrame(
+            [{**{f"facteur_{cle}": point.get(cle, 1.0) for cle in cles}, **bilan} for point, bilan in zip(points, bilans)]
+        )
+        resultats.index.name = "point"
+        return resultats
+
     async def calculer_production(self, liste_infra, is_journalier=False) -> pd.DataFrame:
         """
         Calcule la production optimisée par type d'énergie.
@@ -426,8 +551,8 @@ class InfraReseau(Infrastructure):
                 
         production_power = self.network.generators_t['p'].copy()
         
-        # Regrouper tous les générateurs d'urgence en une seule colonne
-        emergency_gens = [col for col in production_power.columns if col.startswith('emergency_gen_')]
+        # Regrouper les générateurs d'urgence (un par bus de référence) en une seule colonne
+        emergency_gens = [col for col in production_power.columns if col.startswith(EMERGENCY_PREFIX)]
         if emergency_gens:
             production_power['total_emergency'] = production_power[emergency_gens].sum(axis=1)
             production_power = production_power.drop(columns=emergency_gens)
@@ -445,7 +570,7 @@ class InfraReseau(Infrastructure):
             gens = self.network.generators[self.network.generators.carrier == carrier].index
             if len(gens) > 0:
                 # Exclure les générateurs d'urgence déjà regroupés
-                gens = [g for g in gens if not g.startswith('emergency_gen_')]
+                gens = [g for g in gens if not g.startswith(EMERGENCY_PREFIX)]
                 if gens:  # S'assurer qu'il reste des générateurs à sommer
                     production[f'total_{carrier}'] = production[gens].sum(axis=1)
         
@@ -0,0 +1,951 @@
+"""
+Module de répartition vectorisée de la production par ordre de mérite.
+
+Ce module reproduit les règles de priorité de `NetworkOptimizer.optimize_manually`
+sous forme d'opérations NumPy appliquées à tous les pas de temps à la fois :
+- Plancher de 20% de la demande fourni par les réservoirs
+- Sources fatales (éolien, solaire, fil de l'eau, nucléaire)
+- Complément par les réservoirs
+- Thermique, import et urgence
+
+Les matrices de disponibilité (p_nom × p_max_pu) et de coûts marginaux sont
+construites une seule fois. La boucle restante porte sur les rangs de mérite
+d'une filière (quelques dizaines de générateurs), chaque itération traitant
+l'ensemble des pas de temps.
+
+Les pas de temps étant indépendants, la répartition peut aussi être découpée
+en blocs de pas de temps traités dans un pool de processus
+(`parallel_merit_order_dispatch`). Les matrices sont alors partagées avec les
+processus par mémoire partagée plutôt que copiées.
+
+Pour comparer plusieurs scénarios (météo, consommation, listes
+d'infrastructures), les matrices de S scénarios sont empilées en tenseurs
+(S × pas de temps × générateurs) sur un ensemble commun de générateurs
+(`stack_dispatch_matrices`) et réparties en un seul passage
+(`batch_merit_order_dispatch`).
+
+Les études de sensibilité sur les capacités installées (« éolien ×1.5,
+thermique retiré ») ne modifient que la disponibilité : `sweep_dispatch`
+répartit chaque point à partir des mêmes matrices, en réutilisant les profils,
+la demande et l'ordre de mérite, et ne retourne que le bilan de chaque point.
+
+Example:
+    >>> from harmoniq.modules.reseau.core.dispatch import build_dispatch_matrices, merit_order_dispatch
+    >>> matrices = build_dispatch_matrices(network)
+    >>> result = merit_order_dispatch(matrices, MeritOrderIndex.from_matrices(matrices))
+    >>> result.p.shape  # (snapshots, générateurs)
+"""
+
+import copy
+import multiprocessing
+import numpy as np
+import pandas as pd
+import pypsa
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+
+FATALE_CARRIERS = ['eolien', 'solaire', 'hydro_fil', 'nucléaire']
+RESERVOIR_CARRIER = 'hydro_reservoir'
+THERMIQUE_CARRIERS = ['thermique', 'import', 'emergency']
+CARRIERS_BY_PRIORITY = FATALE_CARRIERS + [RESERVOIR_CARRIER] + THERMIQUE_CARRIERS
+
+# Part minimale de la demande fournie par les réservoirs
+RESERVOIR_MIN_SHARE = 0.20
+
+# Déficit (MW) au-delà duquel un générateur d'urgence est requis
+EMERGENCY_TOLERANCE = 1.0
+
+# Générateur d'urgence unique par bus : f"{EMERGENCY_PREFIX}{bus}"
+EMERGENCY_PREFIX = 'emergency_'
+EMERGENCY_MARGINAL_COST = 800.0
+
+# Coûts utilisés lorsque le coût marginal est NaN ou infini
+DEFAULT_MARGINAL_COSTS = {
+    'hydro_fil': 0.1,
+    'solaire': 0.1,
+    'eolien': 0.1,
+    'nucléaire': 0.2,
+    'hydro_reservoir': 7.0,
+    'thermique': 30.0,
+    'emergency': 800.0,
+    'import': 0.5
+}
+DEFAULT_MARGINAL_COST = 10.0
+
+
+@dataclass
+class DispatchMatrices:
+    """
+    Données du réseau sous forme matricielle pour la répartition.
+
+    Attributes:
+        snapshots (pd.DatetimeIndex): Pas de temps (S)
+        generators (pd.Index): Noms des générateurs (G)
+        carriers (np.ndarray): Filière de chaque générateur (G,)
+        availability (np.ndarray): Puissance disponible p_nom × p_max_pu (S × G)
+        marginal_cost (np.ndarray): Coûts marginaux, valeurs par défaut appliquées (S × G)
+        load (np.ndarray): Demande totale en MW (S,)
+        carrier_columns (Dict[str, np.ndarray]): Colonnes de chaque filière, dans l'ordre du réseau
+    """
+    snapshots: pd.DatetimeIndex
+    generators: pd.Index
+    carriers: np.ndarray
+    availability: np.ndarray
+    marginal_cost: np.ndarray
+    load: np.ndarray
+    carrier_columns: Dict[str, np.ndarray] = field(default_factory=dict)
+
+
+@dataclass
+class DispatchResult:
+    """
+    Résultat de la répartition par ordre de mérite.
+
+    Attributes:
+        p (np.ndarray): Production de chaque générateur (S × G)
+        remaining (np.ndarray): Demande non satisfaite après répartition (S,)
+        production_by_carrier (Dict[str, float]): Production cumulée par filière (MW)
+    """
+    p: np.ndarray
+    remaining: np.ndarray
+    production_by_carrier: Dict[str, float]
+
+
+def columns_by_carrier(carriers: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Colonnes des générateurs de chaque filière, dans l'ordre du réseau.
+
+    Args:
+        carriers: Filière de chaque générateur (G,)
+
+    Returns:
+        Dict[str, np.ndarray]: Positions des générateurs pour chaque filière de CARRIERS_BY_PRIORITY
+    """
+    return {
+        carrier: np.flatnonzero(carriers == carrier)
+        for carrier in CARRIERS_BY_PRIORITY
+    }
+
+
+def marginal_cost_matrix(network: pypsa.Network) -> np.ndarray:
+    """
+    Matrice (S × G) des coûts marginaux utilisés pour l'ordre de mérite.
+
+    La série temporelle generators_t.marginal_cost est utilisée lorsqu'elle couvre
+    le générateur et le pas de temps, sinon le coût statique. Les coûts NaN ou
+    infinis sont remplacés par le coût par défaut de la filière.
+
+    Args:
+        network: Réseau PyPSA
+
+    Returns:
+        np.ndarray: Coûts marginaux (S × G)
+    """
+    snapshots = network.snapshots
+    generators = network.generators.index
+    carriers = network.generators.carrier.to_numpy(dtype=object)
+
+    # Coûts marginaux: série temporelle si disponible, sinon coût statique
+    if 'marginal_cost' in network.generators.columns:
+        static_cost = network.generators.marginal_cost.to_numpy(dtype='float64')
+    else:
+        static_cost = np.zeros(len(generators))
+
+    marginal_cost_t = network.generators_t.marginal_cost
+    present = np.outer(
+        snapshots.isin(marginal_cost_t.index),
+        generators.isin(marginal_cost_t.columns)
+    )
+    marginal_cost = marginal_cost_t.reindex(index=snapshots, columns=generators).to_numpy(dtype='float64')
+    marginal_cost = np.where(present, marginal_cost, static_cost)
+
+    invalid = ~np.isfinite(marginal_cost)
+    if invalid.any():
+        default_cost = np.array([DEFAULT_MARGINAL_COSTS.get(c, DEFAULT_MARGINAL_COST) for c in carriers])
+        marginal_cost = np.where(invalid, np.broadcast_to(default_cost, marginal_cost.shape), marginal_cost)
+
+    return marginal_cost
+
+
+def build_dispatch_matrices(network: pypsa.Network, loads_is_energy: bool = False) -> DispatchMatrices:
+    """
+    Construit les matrices de disponibilité, de coûts et de demande du réseau.
+
+    Les conventions de `optimize_manually` sont conservées : p_max_pu vaut 1.0
+    pour un générateur ou un pas de temps absent de generators_t.p_max_pu, et le
+    coût statique est utilisé lorsque generators_t.marginal_cost ne couvre pas
+    le générateur.
+
+    Args:
+        network: Réseau PyPSA
+        loads_is_energy: Si True, la demande est en MWh/jour et convertie en MW moyens
+
+    Returns:
+        DispatchMatrices: Matrices prêtes pour merit_order_dispatch
+    """
+    snapshots = network.snapshots
+    generators = network.generators.index
+    carriers = network.generators.carrier.to_numpy(dtype=object)
+    n_snapshots = len(snapshots)
+
+    # Disponibilité p_nom × p_max_pu
+    p_nom = network.generators.p_nom.to_numpy(dtype='float64')
+    p_max_pu = network.generators_t.p_max_pu.reindex(
+        index=snapshots, columns=generators, fill_value=1.0
+    ).to_numpy(dtype='float64')
+    availability = p_nom * p_max_pu
+
+    marginal_cost = marginal_cost_matrix(network)
+
+    # Demande totale à chaque pas de temps (0 si absente)
+    p_set = network.loads_t.p_set
+    load = np.zeros(n_snapshots)
+    if not p_set.empty:
+        values = np.ascontiguousarray(p_set.reindex(snapshots).to_numpy(dtype='float64'))
+        load = np.nansum(values, axis=1)
+        load[~snapshots.isin(p_set.index)] = 0.0
+    if loads_is_energy:
+        load = load / 24
+
+    return DispatchMatrices(
+        snapshots=snapshots,
+        generators=generators,
+        carriers=carriers,
+        availability=availability,
+        marginal_cost=marginal_cost,
+        load=load,
+        carrier_columns=columns_by_carrier(carriers)
+    )
+
+
+@dataclass
+class BatchDispatchMatrices:
+    """
+    Matrices de répartition de plusieurs scénarios empilées en tenseurs.
+
+    Attributes:
+        names (List[str]): Noms des scénarios (S)
+        snapshots (List[pd.Index]): Pas de temps de chaque scénario (T chacun)
+        generators (pd.Index): Union des générateurs des scénarios (G)
+        carriers (np.ndarray): Filière de chaque générateur (G,)
+        availability (np.ndarray): Puissance disponible, 0 pour un générateur absent (S × T × G)
+        marginal_cost (np.ndarray): Coûts marginaux (S × T × G)
+        load (np.ndarray): Demande totale en MW (S × T)
+        carrier_columns (Dict[str, np.ndarray]): Colonnes de chaque filière
+    """
+    names: List[str]
+    snapshots: List[pd.Index]
+    generators: pd.Index
+    carriers: np.ndarray
+    availability: np.ndarray
+    marginal_cost: np.ndarray
+    load: np.ndarray
+    carrier_columns: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    def flatten(self) -> DispatchMatrices:
+        """
+        Matrices (S·T × G) où les scénarios se suivent sur l'axe des pas de temps.
+
+        Les pas de temps étant indépendants, répartir ces matrices revient à
+        répartir chaque scénario séparément.
+        """
+        n_scenarios, n_snapshots, n_generators = self.availability.shape
+        return DispatchMatrices(
+            snapshots=None,
+            generators=self.generators,
+            carriers=self.carriers,
+            availability=self.availability.reshape(n_scenarios * n_snapshots, n_generators),
+            marginal_cost=self.marginal_cost.reshape(n_scenarios * n_snapshots, n_generators),
+            load=self.load.reshape(n_scenarios * n_snapshots),
+            carrier_columns=self.carrier_columns
+        )
+
+
+@dataclass
+class BatchDispatchResult:
+    """
+    Résultat de la répartition de plusieurs scénarios.
+
+    Attributes:
+        names (List[str]): Noms des scénarios (S)
+        snapshots (List[pd.Index]): Pas de temps de chaque scénario
+        generators (pd.Index): Générateurs communs (G)
+        p (np.ndarray): Production de chaque générateur (S × T × G)
+        remaining (np.ndarray): Demande non satisfaite après répartition (S × T)
+        production_by_carrier (Dict[str, Dict[str, float]]): Production cumulée par filière de chaque scénario
+    """
+    names: List[str]
+    snapshots: List[pd.Index]
+    generators: pd.Index
+    p: np.ndarray
+    remaining: np.ndarray
+    production_by_carrier: Dict[str, Dict[str, float]]
+
+    def production(self, name: str) -> pd.DataFrame:
+        """
+        Production d'un scénario.
+
+        Args:
+            name: Nom du scénario
+
+        Returns:
+            pd.DataFrame: Production (pas de temps × générateurs)
+        """
+        i = self.names.index(name)
+        return pd.DataFrame(self.p[i], index=self.snapshots[i], columns=self.generators)
+
+    def production_frames(self) -> Dict[str, pd.DataFrame]:
+        """Production de chaque scénario (pas de temps × générateurs)."""
+        return {name: self.production(name) for name in self.names}
+
+
+def stack_dispatch_matrices(scenarios: Dict[str, DispatchMatrices]) -> BatchDispatchMatrices:
+    """
+    Empile les matrices de plusieurs scénarios sur un ensemble commun de générateurs.
+
+    Un générateur absent d'un scénario (liste d'infrastructures différente) y
+    a une disponibilité nulle et le coût par défaut de sa filière.
+
+    Args:
+        scenarios: Matrices de chaque scénario (voir build_dispatch_matrices)
+
+    Returns:
+        BatchDispatchMatrices: Tenseurs (S × T × G)
+
+    Raises:
+        ValueError: Si aucun scénario n'est fourni, si les scénarios n'ont pas le
+            même nombre de pas de temps ou si un générateur change de filière
+    """
+    if not scenarios:
+        raise ValueError("Aucun scénario à répartir")
+    names = list(scenarios)
+    lengths = {len(m.load) for m in scenarios.values()}
+    if len(lengths) > 1:
+        raise ValueError(f"Les scénarios doivent avoir le même nombre de pas de temps: {sorted(lengths)}")
+    n_snapshots = lengths.pop()
+
+    # Union des générateurs, dans l'ordre d'apparition
+    carrier_of = {}
+    for name, m in scenarios.items():
+        for generator, carrier in zip(m.generators, m.carriers):
+            if carrier_of.setdefault(generator, carrier) != carrier:
+                raise ValueError(f"Le générateur {generator} n'a pas la même filière dans tous les scénarios")
+    generators = pd.Index(list(carrier_of), name=next(iter(scenarios.values())).generators.name)
+    carriers = np.array(list(carrier_of.values()), dtype=object)
+    default_cost = np.array([DEFAULT_MARGINAL_COSTS.get(c, DEFAULT_MARGINAL_COST) for c in carriers])
+
+    shape = (len(names), n_snapshots, len(generators))
+    availability = np.zeros(shape)
+    marginal_cost = np.broadcast_to(default_cost, shape).copy()
+    load = np.empty(shape[:2])
+    for i, m in enumerate(scenarios.values()):
+        columns = generators.get_indexer(m.generators)
+        availability[i][:, columns] = m.availability
+        marginal_cost[i][:, columns] = m.marginal_cost
+        load[i] = m.load
+
+    return BatchDispatchMatrices(
+        names=names,
+        snapshots=[m.snapshots for m in scenarios.values()],
+        generators=generators,
+        carriers=carriers,
+        availability=availability,
+        marginal_cost=marginal_cost,
+        load=load,
+        carrier_columns=columns_by_carrier(carriers)
+    )
+
+
+def batch_merit_order_dispatch(batch: BatchDispatchMatrices, workers: int = 1) -> BatchDispatchResult:
+    """
+    Répartit plusieurs scénarios en un seul passage vectorisé.
+
+    Les tenseurs sont aplatis (les scénarios se suivent sur l'axe des pas de
+    temps, sans copie) puis répartis par merit_order_dispatch, ou par blocs
+    dans un pool de processus si workers > 1. La production de chaque scénario
+    est identique à celle d'une répartition séparée.
+
+    Args:
+        batch: Tenseurs construits par stack_dispatch_matrices
+        workers: Nombre de processus
+
+    Returns:
+        BatchDispatchResult: Production (S × T × G), demande restante et bilan par filière
+    """
+    matrices = batch.flatten()
+    merit_index = MeritOrderIndex.from_matrices(matrices)
+    if workers > 1:
+        result = parallel_merit_order_dispatch(matrices, merit_index, workers)
+    else:
+        result = merit_order_dispatch(matrices, merit_index)
+
+    p = result.p.reshape(batch.availability.shape)
+    production_by_carrier = {}
+    for i, name in enumerate(batch.names):
+        production_by_carrier[name] = {
+            carrier: float(p[i][:, columns].sum())
+            for carrier, columns in batch.carrier_columns.items()
+        }
+
+    return BatchDispatchResult(
+        names=batch.names,
+        snapshots=batch.snapshots,
+        generators=batch.generators,
+        p=p,
+        remaining=result.remaining.reshape(batch.load.shape),
+        production_by_carrier=production_by_carrier
+    )
+
+
+def add_emergency_slack(network: pypsa.Network, bus: str, deficit: np.ndarray, margin: float = 1.0) -> str:
+    """
+    Ajoute ou agrandit le générateur d'urgence unique d'un bus.
+
+    Plutôt qu'un générateur par pas de temps en déficit, un seul générateur
+    `emergency_<bus>` couvre tous les déficits : p_nom vaut le plus grand déficit
+    (avec marge) et p_max_pu suit le déficit de chaque pas de temps. Si le
+    générateur existe déjà, sa capacité n'est jamais réduite.
+
+    Args:
+        network: Réseau PyPSA à modifier
+        bus: Bus de raccordement du générateur
+        deficit: Déficit de capacité à chaque pas de temps (MW, 0 si aucun)
+        margin: Marge appliquée au déficit (p. ex. 1.1 pour 10%)
+
+    Returns:
+        str: Nom du générateur d'urgence
+    """
+    name = f"{EMERGENCY_PREFIX}{bus}"
+    capacity = np.where(deficit > 0, deficit * margin, 0.0)
+
+    if name in network.generators.index:
+        p_nom = network.generators.at[name, 'p_nom']
+        if name in network.generators_t.p_max_pu.columns:
+            existing = p_nom * network.generators_t.p_max_pu[name].reindex(
+                network.snapshots, fill_value=1.0
+            ).to_numpy(dtype='float64')
+        else:
+            existing = np.full(len(network.snapshots), p_nom)
+        capacity = np.maximum(capacity, existing)
+        network.generators.at[name, 'p_nom'] = capacity.max()
+    else:
+        network.add(
+            "Generator",
+            name,
+            bus=bus,
+            p_nom=capacity.max(),
+            marginal_cost=EMERGENCY_MARGINAL_COST,  # Très coûteux
+            carrier="import"
+        )
+
+    p_nom = network.generators.at[name, 'p_nom']
+    network.generators_t.p_max_pu[name] = capacity / p_nom if p_nom > 0 else 0.0
+    return name
+
+
+class MeritOrderIndex:
+    """
+    Index des ordres de mérite par filière, construit une seule fois par réseau.
+
+    Pour chaque filière, l'index contient la matrice (S × n) des colonnes triées
+    par coût marginal croissant. Une filière dont les coûts ne varient pas dans le
+    temps n'est triée qu'une fois et son ordre est partagé par tous les pas de temps.
+    Le tri est stable, comme `sorted` : à coût égal, l'ordre du réseau est conservé.
+
+    Attributes:
+        generators (pd.Index): Noms des générateurs (G)
+        carrier_columns (Dict[str, np.ndarray]): Colonnes de chaque filière
+        n_snapshots (int): Nombre de pas de temps
+
+    Example:
+        >>> index = MeritOrderIndex.from_network(network)
+        >>> index.sorted_generators('hydro_reservoir', 0)
+        ['Manic-5', 'Robert-Bourassa', ...]
+    """
+
+    def __init__(self, marginal_cost: np.ndarray, carrier_columns: Dict[str, np.ndarray], generators: pd.Index):
+        """
+        Args:
+            marginal_cost: Coûts marginaux (S × G), valeurs par défaut appliquées
+            carrier_columns: Colonnes de chaque filière, dans l'ordre du réseau
+            generators: Noms des générateurs
+        """
+        self.generators = generators
+        self.carrier_columns = carrier_columns
+        self.n_snapshots = marginal_cost.shape[0]
+        self._orders = {}
+        self._invariant = {}
+        self._names = {}
+
+        names = np.asarray(generators, dtype=object)
+        for carrier, columns in carrier_columns.items():
+            if len(columns) == 0:
+                continue
+            costs = marginal_cost[:, columns]
+            invariant = bool(np.all(costs == costs[:1]))
+            if invariant:
+                # Coûts constants: un seul tri pour tous les pas de temps
+                ranks = np.argsort(costs[:1], axis=1, kind='stable')
+            else:
+                ranks = np.argsort(costs, axis=1, kind='stable')
+            self._orders[carrier] = columns[ranks]
+            self._invariant[carrier] = invariant
+            if invariant:
+                self._names[carrier] = names[self._orders[carrier][0]].tolist()
+        self._all_names = names
+
+    @classmethod
+    def from_network(cls, network: pypsa.Network) -> "MeritOrderIndex":
+        """Construit l'index à partir des coûts marginaux du réseau."""
+        carriers = network.generators.carrier.to_numpy(dtype=object)
+        return cls(marginal_cost_matrix(network), columns_by_carrier(carriers), network.generators.index)
+
+    @classmethod
+    def from_matrices(cls, matrices: DispatchMatrices) -> "MeritOrderIndex":
+        """Construit l'index à partir de matrices déjà calculées."""
+        return cls(matrices.marginal_cost, matrices.carrier_columns, matrices.generators)
+
+    def carriers(self) -> List[str]:
+        """Filières présentes dans l'index."""
+        return list(self._orders)
+
+    def is_time_invariant(self, carrier: str) -> bool:
+        """Indique si l'ordre de mérite de la filière est le même à tous les pas de temps."""
+        return self._invariant.get(carrier, True)
+
+    def order(self, carrier: str) -> np.ndarray:
+        """
+        Ordre de mérite d'une filière à chaque pas de temps.
+
+        Args:
+            carrier: Filière à trier
+
+        Returns:
+            np.ndarray: Indices de colonnes (S × n) triés par coût croissant
+        """
+        if carrier not in self._orders:
+            return np.empty((self.n_snapshots, 0), dtype=int)
+        order = self._orders[carrier]
+        if self._invariant[carrier]:
+            return np.broadcast_to(order, (self.n_snapshots, order.shape[1]))
+        return order
+
+    def sorted_generators(self, carrier: str, position: int) -> List[str]:
+        """
+        Générateurs d'une filière triés par coût marginal croissant à un pas de temps.
+
+        Args:
+            carrier: Filière à trier
+            position: Position du pas de temps dans network.snapshots
+
+        Returns:
+            List[str]: Noms des générateurs triés
+        """
+        if carrier not in self._orders:
+            return []
+        if self._invariant[carrier]:
+            return self._names[carrier]
+        return self._all_names[self._orders[carrier][position]].tolist()
+
+    def snapshot_slice(self, start: int, stop: int) -> "MeritOrderIndex":
+        """
+        Index restreint aux pas de temps [start, stop), pour la répartition par blocs.
+
+        Les ordres invariants dans le temps sont partagés tels quels.
+        """
+        sliced = copy.copy(self)
+        sliced.n_snapshots = stop - start
+        sliced._orders = {
+            carrier: order if self._invariant[carrier] else order[start:stop]
+            for carrier, order in self._orders.items()
+        }
+        return sliced
+
+
+def _sequential_sum(values: np.ndarray) -> np.ndarray:
+    """Somme des colonnes dans l'ordre, comme une accumulation `+=` en Python."""
+    total = np.zeros(values.shape[0])
+    for j in range(values.shape[1]):
+        total = total + values[:, j]
+    return total
+
+
+def _allocate_carrier(p, availability, columns, order, remaining, rows):
+    """
+    Alloue une filière fatale ou thermique par ordre de mérite.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Production de la filière et demande restante (S,)
+    """
+    capacity = _sequential_sum(availability[:, columns])
+    allocation = np.minimum(capacity, remaining)
+
+    supplied = np.zeros(len(rows))
+    done = remaining <= 0
+    for k in range(order.shape[1]):
+        gen = order[:, k]
+        done |= remaining <= 0
+        power = np.minimum(np.minimum(availability[rows, gen], allocation - supplied), remaining)
+        ok = ~done & (power > 0)
+        p[rows[ok], gen[ok]] = power[ok]
+        supplied = np.where(ok, supplied + power, supplied)
+        remaining = np.where(ok, remaining - power, remaining)
+        done |= ok & ((supplied >= allocation) | (remaining <= 0))
+
+    return supplied, remaining
+
+
+def merit_order_dispatch(matrices: DispatchMatrices,
+                         merit_index: Optional[MeritOrderIndex] = None) -> DispatchResult:
+    """
+    Répartit la demande sur tous les pas de temps par ordre de priorité et de mérite.
+
+    Les règles sont celles de `NetworkOptimizer.optimize_manually` :
+    1. Plancher de 20% de la demande pour les réservoirs (borné par leur disponibilité)
+    2. Sources fatales dans l'ordre éolien, solaire, fil de l'eau, nucléaire
+    3. Complément par les réservoirs jusqu'à leur disponibilité
+    4. Thermique, import puis urgence
+
+    La demande non satisfaite est retournée dans `remaining` ; l'ajout des
+    générateurs d'urgence est laissé à l'appelant.
+
+    Args:
+        matrices: Matrices construites par build_dispatch_matrices
+        merit_index: Index des ordres de mérite (construit à partir des matrices si None)
+
+    Returns:
+        DispatchResult: Production (S × G), demande restante et bilan par filière
+    """
+    availability = matrices.availability
+    n_snapshots = availability.shape[0]
+    rows = np.arange(n_snapshots)
+
+    p = np.zeros_like(availability)
+    remaining = matrices.load.copy()
+    production_by_carrier = {carrier: 0.0 for carrier in CARRIERS_BY_PRIORITY}
+    if merit_index is None:
+        merit_index = MeritOrderIndex.from_matrices(matrices)
+    orders = {carrier: merit_index.order(carrier) for carrier in merit_index.carriers()}
+
+    # 1. Plancher des réservoirs
+    hydro_columns = matrices.carrier_columns.get(RESERVOIR_CARRIER, np.array([], dtype=int))
+    max_hydro = _sequential_sum(availability[:, hydro_columns])
+    min_hydro = matrices.load * RESERVOIR_MIN_SHARE
+    min_hydro = np.where(max_hydro < min_hydro, max_hydro, min_hydro)
+
+    hydro_supplied = np.zeros(n_snapshots)
+    if RESERVOIR_CARRIER in orders:
+        order = orders[RESERVOIR_CARRIER]
+        done = np.zeros(n_snapshots, dtype=bool)
+        for k in range(order.shape[1]):
+            gen = order[:, k]
+            power = np.minimum(availability[rows, gen], min_hydro - hydro_supplied)
+            ok = ~done & (power > 0)
+            p[rows[ok], gen[ok]] = power[ok]
+            hydro_supplied = np.where(ok, hydro_supplied + power, hydro_supplied)
+            remaining = np.where(ok, remaining - power, remaining)
+            done |= ok & (hydro_supplied >= min_hydro)
+        production_by_carrier[RESERVOIR_CARRIER] += hydro_supplied.sum()
+
+    # 2. Sources fatales
+    for carrier in FATALE_CARRIERS:
+        if carrier not in orders:
+            continue
+        supplied, remaining = _allocate_carrier(
+            p, availability, matrices.carrier_columns[carrier], orders[carrier], remaining, rows
+        )
+        production_by_carrier[carrier] += supplied.sum()
+
+    # 3. Complément par les réservoirs
+    if RESERVOIR_CARRIER in orders:
+        order = orders[RESERVOIR_CARRIER]
+        remaining_hydro = max_hydro - hydro_supplied
+        additional_allocation = np.minimum(remaining_hydro, remaining)
+        additional = np.zeros(n_snapshots)
+        done = (remaining <= 0) | (remaining_hydro <= 0)
+        for k in range(order.shape[1]):
+            gen = order[:, k]
+            done |= remaining <= 0
+            current = p[rows, gen]
+            remaining_capacity = availability[rows, gen] - current
+            power = np.minimum(remaining_capacity, remaining)
+            ok = ~done & (remaining_capacity > 0)
+            p[rows[ok], gen[ok]] = current[ok] + power[ok]
+            additional = np.where(ok, additional + power, additional)
+            remaining = np.where(ok, remaining - power, remaining)
+            done |= ok & ((additional >= additional_allocation) | (remaining <= 0))
+        production_by_carrier[RESERVOIR_CARRIER] += additional.sum()
+
+    # 4. Thermique, import et urgence
+    for carrier in THERMIQUE_CARRIERS:
+        if carrier not in orders:
+            continue
+        supplied, remaining = _allocate_carrier(
+            p, availability, matrices.carrier_columns[carrier], orders[carrier], remaining, rows
+        )
+        production_by_carrier[carrier] += supplied.sum()
+
+    return DispatchResult(p=p, remaining=remaining, production_by_carrier=production_by_carrier)
+
+
+
+def split_snapshots(n_snapshots: int, n_blocks: int) -> List[Tuple[int, int]]:
+    """
+    Découpe les pas de temps en blocs contigus de tailles égales (à un près).
+
+    Args:
+        n_snapshots: Nombre de pas de temps
+        n_blocks: Nombre de blocs souhaité
+
+    Returns:
+        List[Tuple[int, int]]: Bornes [début, fin) de chaque bloc non vide
+    """
+    bounds = np.linspace(0, n_snapshots, max(n_blocks, 1) + 1).astype(int)
+    return [(int(start), int(stop)) for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+
+
+def _attacher(segments: List[shared_memory.SharedMemory], name: str, shape: Tuple[int, ...]) -> np.ndarray:
+    """Vue NumPy sur un segment de mémoire partagée existant."""
+    shm = shared_memory.SharedMemory(name=name)
+    segments.append(shm)
+    return np.ndarray(shape, dtype='float64', buffer=shm.buf)
+
+
+def _dispatch_block(specs: Dict[str, Tuple[str, Tuple[int, ...]]], start: int, stop: int,
+                    carrier_columns: Dict[str, np.ndarray], merit_index: MeritOrderIndex) -> Dict[str, float]:
+    """
+    Répartit un bloc de pas de temps dans un processus du pool.
+
+    Les matrices d'entrée sont lues et les résultats (production, demande restante)
+    écrits directement dans la mémoire partagée du processus parent.
+
+    Returns:
+        Dict[str, float]: Production cumulée par filière sur le bloc
+    """
+    segments = []
+    arrays = {}
+    try:
+        arrays.update({key: _attacher(segments, name, shape) for key, (name, shape) in specs.items()})
+        matrices = DispatchMatrices(
+            snapshots=None,
+            generators=merit_index.generators,
+            carriers=None,
+            availability=arrays['availability'][start:stop],
+            marginal_cost=arrays['marginal_cost'][start:stop],
+            load=arrays['load'][start:stop],
+            carrier_columns=carrier_columns
+        )
+        result = merit_order_dispatch(matrices, merit_index)
+        arrays['p'][start:stop] = result.p
+        arrays['remaining'][start:stop] = result.remaining
+        return result.production_by_carrier
+    finally:
+        # Les vues doivent être libérées avant de fermer les segments
+        arrays.clear()
+        matrices = None
+        for shm in segments:
+            shm.close()
+
+
+def parallel_merit_order_dispatch(matrices: DispatchMatrices,
+                                  merit_index: Optional[MeritOrderIndex] = None,
+                                  workers: int = 2) -> DispatchResult:
+    """
+    Répartit la demande par blocs de pas de temps dans un pool de processus.
+
+    Les règles de répartition ne lient jamais un pas de temps au suivant : chaque
+    bloc est traité par merit_order_dispatch et la production obtenue est
+    identique à celle d'un seul appel. Les matrices de disponibilité, de coûts
+    et de demande ainsi que la production sont placées en mémoire partagée; seuls
+    les ordres de mérite du bloc sont transmis aux processus.
+
+    Le démarrage des processus coûte quelques secondes : ce mode n'est utile que
+    pour de longues simulations (p. ex. une année horaire).
+
+    Args:
+        matrices: Matrices construites par build_dispatch_matrices
+        merit_index: Index des ordres de mérite (construit à partir des matrices si None)
+        workers: Nombre de processus (et de blocs)
+
+    Returns:
+        DispatchResult: Production (S × G), demande restante et bilan par filière
+    """
+    if merit_index is None:
+        merit_index = MeritOrderIndex.from_matrices(matrices)
+
+    n_snapshots = matrices.availability.shape[0]
+    blocks = split_snapshots(n_snapshots, workers)
+    if len(blocks) <= 1:
+        return merit_order_dispatch(matrices, merit_index)
+
+    arrays = {
+        'availability': matrices.availability,
+        'marginal_cost': matrices.marginal_cost,
+        'load': matrices.load,
+        'p': np.zeros_like(matrices.availability),
+        'remaining': np.zeros(n_snapshots),
+    }
+    segments = []
+    views = {}
+    try:
+        specs = {}
+        for key, array in arrays.items():
+            array = np.ascontiguousarray(array, dtype='float64')
+            shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            segments.append(shm)
+            views[key] = np.ndarray(array.shape, dtype='float64', buffer=shm.buf)
+            views[key][...] = array
+            specs[key] = (shm.name, array.shape)
+
+        # 'spawn' évite d'hériter de l'état (fils d'exécution, verrous) du serveur parent
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=len(blocks), mp_context=context) as executor:
+            futures = [
+                executor.submit(_dispatch_block, specs, start, stop, matrices.carrier_columns,
+                                merit_index.snapshot_slice(start, stop))
+                for start, stop in blocks
+            ]
+            totals = [future.result() for future in futures]
+
+        p = views['p'].copy()
+        remaining = views['remaining'].copy()
+    finally:
+        views.clear()
+        for shm in segments:
+            shm.close()
+            shm.unlink()
+
+    production_by_carrier = {carrier: 0.0 for carrier in CARRIERS_BY_PRIORITY}
+    for block_totals in totals:
+        for carrier, value in block_totals.items():
+            production_by_carrier[carrier] += value
+
+    return DispatchResult(p=p, remaining=remaining, production_by_carrier=production_by_carrier)
+
+
+
+def capacity_multipliers(point: Dict[str, float], generators: pd.Index, carriers: np.ndarray) -> np.ndarray:
+    """
+    Multiplicateurs de p_nom de chaque générateur pour un point de balayage.
+
+    Args:
+        point: Multiplicateurs par filière ou par générateur; celui d'un
+            générateur remplace celui de sa filière
+        generators: Noms des générateurs (G)
+        carriers: Filière de chaque générateur (G,)
+
+    Returns:
+        np.ndarray: Multiplicateur de chaque générateur (G,), 1.0 par défaut
+
+    Raises:
+        ValueError: Si une clé n'est ni une filière ni un générateur du réseau
+    """
+    multipliers = np.ones(len(generators))
+    by_generator = {}
+    for key, value in point.items():
+        if key in generators:
+            by_generator[key] = value
+        elif np.any(carriers == key):
+            multipliers[carriers == key] = value
+        else:
+            raise ValueError(f"Filière ou générateur inconnu: {key}")
+    for name, value in by_generator.items():
+        multipliers[generators.get_loc(name)] = value
+    return multipliers
+
+
+def summarize_dispatch(matrices: DispatchMatrices, result: DispatchResult,
+                       hours_per_snapshot: float = 1.0) -> Dict[str, float]:
+    """
+    Bilan d'une répartition : énergie par filière, importations, urgence et coût.
+
+    Les générateurs d'urgence (préfixe EMERGENCY_PREFIX ou filière 'emergency')
+    sont comptés à part des importations.
+
+    La demande restante au-delà de EMERGENCY_TOLERANCE est comptée comme
+    énergie d'urgence, au coût EMERGENCY_MARGINAL_COST.
+
+    Args:
+        matrices: Matrices réparties
+        result: Résultat de merit_order_dispatch
+        hours_per_snapshot: Durée d'un pas de temps en heures (24 en mode journalier)
+
+    Returns:
+        Dict[str, float]: Énergies (MWh) et coût total ($)
+    """
+    emergency = np.asarray(matrices.generators.str.startswith(EMERGENCY_PREFIX), dtype=bool)
+    emergency |= matrices.carriers == 'emergency'
+    imports = (matrices.carriers == 'import') & ~emergency
+    energy = result.p.sum(axis=0) * hours_per_snapshot
+    deficit = np.where(result.remaining > EMERGENCY_TOLERANCE, result.remaining, 0.0)
+
+    summary = {
+        f"energie_{carrier}": float(energy[columns].sum())
+        for carrier, columns in matrices.carrier_columns.items()
+        if carrier not in ('import', 'emergency')
+    }
+    summary["energie_importee"] = float(energy[imports].sum())
+    summary["energie_urgence"] = float(energy[emergency].sum() + deficit.sum() * hours_per_snapshot)
+    summary["cout_total"] = float(
+        ((result.p * matrices.marginal_cost).sum() + deficit.sum() * EMERGENCY_MARGINAL_COST) * hours_per_snapshot
+    )
+    return summary
+
+
+# Matrices de référence d'un processus du pool de balayage
+_sweep_state = {}
+
+
+def _init_sweep(matrices: DispatchMatrices, merit_index: MeritOrderIndex, hours_per_snapshot: float):
+    """Reçoit les matrices de référence une seule fois par processus."""
+    _sweep_state.update(matrices=matrices, merit_index=merit_index, hours_per_snapshot=hours_per_snapshot)
+
+
+def _sweep_point(multipliers: np.ndarray, matrices: Optional[DispatchMatrices] = None,
+                 merit_index: Optional[MeritOrderIndex] = None,
+                 hours_per_snapshot: Optional[float] = None) -> Dict[str, float]:
+    """Répartit un point de balayage (disponibilité mise à l'échelle)."""
+    if matrices is None:
+        matrices = _sweep_state['matrices']
+        merit_index = _sweep_state['merit_index']
+        hours_per_snapshot = _sweep_state['hours_per_snapshot']
+    scaled = copy.copy(matrices)
+    scaled.availability = matrices.availability * multipliers
+    result = merit_order_dispatch(scaled, merit_index)
+    return summarize_dispatch(scaled, result, hours_per_snapshot)
+
+
+def sweep_dispatch(matrices: DispatchMatrices, multipliers: np.ndarray,
+                   hours_per_snapshot: float = 1.0, workers: int = 1) -> List[Dict[str, float]]:
+    """
+    Répartit la demande pour plusieurs jeux de capacités installées.
+
+    Multiplier p_nom revient à multiplier la disponibilité p_nom × p_max_pu :
+    les coûts, la demande et l'ordre de mérite sont communs à tous les points
+    et calculés une seule fois. Avec workers > 1, les points sont répartis dans
+    un pool de processus qui reçoit les matrices une seule fois.
+
+    Args:
+        matrices: Matrices de référence (voir build_dispatch_matrices)
+        multipliers: Multiplicateurs de p_nom de chaque point (P × G)
+        hours_per_snapshot: Durée d'un pas de temps en heures
+        workers: Nombre de processus
+
+    Returns:
+        List[Dict[str, float]]: Bilan de chaque point (voir summarize_dispatch)
+    """
+    multipliers = np.atleast_2d(np.asarray(multipliers, dtype='float64'))
+    merit_index = MeritOrderIndex.from_matrices(matrices)
+
+    if workers <= 1 or len(multipliers) <= 1:
+        return [_sweep_point(row, matrices, merit_index, hours_per_snapshot) for row in multipliers]
+
+    # 'spawn' évite d'hériter de l'état (fils d'exécution, verrous) du serveur parent
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=min(workers, len(multipliers)), mp_context=context,
+                             initializer=_init_sweep,
+                             initargs=(matrices, merit_index, hours_per_snapshot)) as executor:
+        return list(executor.map(_sweep_point, multipliers))
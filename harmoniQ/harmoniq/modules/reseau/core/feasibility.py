@@ -0,0 +1,239 @@
+"""
+Module de diagnostic de faisabilité du réseau électrique.
+
+Ce module vérifie, sur tous les pas de temps à la fois, que la répartition de
+la production est réalisable :
+- Capacité disponible (p_nom × p_max_pu) suffisante pour la demande totale
+- Îlots du réseau (composantes connexes) alimentés par leurs propres générateurs
+- Capacité des lignes suffisante pour couvrir les bus en déficit
+- Alignement temporel des séries de demande et de disponibilité
+
+Les bilans par bus sont obtenus avec des matrices d'incidence creuses
+(générateurs → bus, charges → bus) et les îlots avec
+`scipy.sparse.csgraph.connected_components`.
+
+Example:
+    >>> from harmoniq.modules.reseau.core.feasibility import diagnostiquer_faisabilite
+    >>> rapport = diagnostiquer_faisabilite(network)
+    >>> print(rapport.to_message())
+"""
+
+import numpy as np
+import pandas as pd
+import pypsa
+from dataclasses import dataclass, field
+from typing import List
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+
+
+@dataclass
+class FeasibilityReport:
+    """
+    Rapport compact de faisabilité.
+
+    Attributes:
+        is_feasible (bool): Si False, au moins un problème bloquant a été détecté
+        messages (List[str]): Problèmes identifiés
+        n_islands (int): Nombre d'îlots du réseau
+        worst_snapshots (pd.DataFrame): Pas de temps avec la plus faible marge
+            (colonnes demande, capacite, marge en MW)
+        worst_buses (pd.DataFrame): Bus avec le plus fort déficit local
+            (colonnes deficit en MW, snapshot du déficit maximal)
+    """
+    is_feasible: bool
+    messages: List[str] = field(default_factory=list)
+    n_islands: int = 1
+    worst_snapshots: pd.DataFrame = field(default_factory=pd.DataFrame)
+    worst_buses: pd.DataFrame = field(default_factory=pd.DataFrame)
+
+    def to_message(self) -> str:
+        """Message lisible résumant le rapport."""
+        if self.is_feasible and not self.messages:
+            return "Optimisation faisable"
+        return "Problèmes identifiés:\n- " + "\n- ".join(self.messages)
+
+
+def incidence_matrix(bus_names: pd.Series, buses: pd.Index) -> sparse.csr_matrix:
+    """
+    Matrice d'incidence creuse (composants × bus).
+
+    Args:
+        bus_names: Bus de raccordement de chaque composant
+        buses: Bus du réseau
+
+    Returns:
+        sparse.csr_matrix: 1 si le composant est raccordé au bus (composants inconnus ignorés)
+    """
+    bus_idx = buses.get_indexer(bus_names)
+    rows = np.flatnonzero(bus_idx >= 0)
+    return sparse.csr_matrix(
+        (np.ones(len(rows)), (rows, bus_idx[rows])),
+        shape=(len(bus_names), len(buses))
+    )
+
+
+def network_islands(network: pypsa.Network) -> np.ndarray:
+    """
+    Îlot de chaque bus, à partir des lignes, transformateurs et liens.
+
+    Returns:
+        np.ndarray: Étiquette d'îlot de chaque bus (B,)
+    """
+    buses = network.buses.index
+    bus0 = []
+    bus1 = []
+    for branches in (network.lines, network.transformers, network.links):
+        if not branches.empty:
+            bus0.append(buses.get_indexer(branches.bus0))
+            bus1.append(buses.get_indexer(branches.bus1))
+    if bus0:
+        bus0 = np.concatenate(bus0)
+        bus1 = np.concatenate(bus1)
+        valid = (bus0 >= 0) & (bus1 >= 0)
+        bus0, bus1 = bus0[valid], bus1[valid]
+    else:
+        bus0 = bus1 = np.array([], dtype=int)
+
+    adjacency = sparse.coo_matrix(
+        (np.ones(len(bus0)), (bus0, bus1)), shape=(len(buses), len(buses))
+    )
+    _, labels = connected_components(adjacency, directed=False)
+    return labels
+
+
+def _count_by_island(bus_names: pd.Series, buses: pd.Index, labels: np.ndarray, n_islands: int) -> np.ndarray:
+    """Nombre de composants raccordés à chaque îlot."""
+    bus_idx = buses.get_indexer(bus_names)
+    return np.bincount(labels[bus_idx[bus_idx >= 0]], minlength=n_islands)
+
+
+def diagnostiquer_faisabilite(network: pypsa.Network, n_worst: int = 5) -> FeasibilityReport:
+    """
+    Vérifie la faisabilité de l'optimisation sur tous les pas de temps.
+
+    Args:
+        network: Réseau PyPSA
+        n_worst: Nombre de pas de temps et de bus à inclure dans le rapport
+
+    Returns:
+        FeasibilityReport: Statut, problèmes identifiés et pires pas de temps/bus
+    """
+    messages = []
+    is_feasible = True
+
+    snapshots = network.snapshots
+    buses = network.buses.index
+    generators = network.generators
+    loads = network.loads
+
+    # Capacité disponible (S × G) et demande (S × L)
+    p_max_pu = network.generators_t.p_max_pu.reindex(
+        index=snapshots, columns=generators.index, fill_value=1.0
+    ).to_numpy(dtype='float64')
+    availability = p_max_pu * generators.p_nom.to_numpy(dtype='float64')
+    p_set_static = loads.p_set if 'p_set' in loads.columns else pd.Series(0.0, index=loads.index)
+    demand = network.loads_t.p_set.reindex(index=snapshots, columns=loads.index)
+    demand = demand.fillna(p_set_static).to_numpy(dtype='float64')
+    demand = np.nan_to_num(demand)
+
+    # Bilans par bus (S × B)
+    gen_incidence = incidence_matrix(generators.bus, buses)
+    load_incidence = incidence_matrix(loads.bus, buses)
+    capacity_by_bus = np.asarray(gen_incidence.T.dot(availability.T)).T
+    demand_by_bus = np.asarray(load_incidence.T.dot(demand.T)).T
+    balance = capacity_by_bus - demand_by_bus
+
+    # 1. Capacité totale (production vs demande) à chaque pas de temps
+    total_demand = demand_by_bus.sum(axis=1)
+    total_capacity = capacity_by_bus.sum(axis=1)
+    margin = total_capacity - total_demand
+    short = margin < 0
+    if short.any():
+        is_feasible = False
+        worst = int(np.argmin(margin))
+        messages.append(
+            f"Capacité insuffisante à {short.sum()} pas de temps sur {len(snapshots)} "
+            f"(pire: {snapshots[worst]}, {total_capacity[worst]:.2f} MW < {total_demand[worst]:.2f} MW)"
+        )
+
+    # 2. Îlots du réseau
+    labels = network_islands(network)
+    n_islands = int(labels.max()) + 1 if len(labels) else 0
+    if n_islands > 1:
+        messages.append(f"Réseau fragmenté en {n_islands} composants connectés")
+
+        membership = sparse.csr_matrix(
+            (np.ones(len(labels)), (np.arange(len(labels)), labels)), shape=(len(labels), n_islands)
+        )
+        balance_by_island = np.asarray(membership.T.dot(balance.T)).T
+        demand_by_island = np.asarray(membership.T.dot(demand_by_bus.T)).T
+        capacity_by_island = np.asarray(membership.T.dot(capacity_by_bus.T)).T
+
+        loads_by_island = _count_by_island(loads.bus, buses, labels, n_islands)
+        gens_by_island = _count_by_island(generators.bus, buses, labels, n_islands)
+
+        for island in np.flatnonzero((loads_by_island > 0) & (gens_by_island == 0)):
+            is_feasible = False
+            messages.append(
+                f"Composant {island} avec {loads_by_island[island]} charges totalisant "
+                f"{demand_by_island[:, island].max():.2f} MW sans générateurs"
+            )
+        for island in np.flatnonzero((gens_by_island > 0) & (balance_by_island.min(axis=0, initial=0) < 0)):
+            is_feasible = False
+            worst = int(np.argmin(balance_by_island[:, island]))
+            messages.append(
+                f"Composant {island} en déficit à {(balance_by_island[:, island] < 0).sum()} pas de temps "
+                f"(pire: {snapshots[worst]}, {capacity_by_island[worst, island]:.2f} MW < "
+                f"{demand_by_island[worst, island]:.2f} MW)"
+            )
+
+    # 3. Capacité des lignes face au déficit des bus
+    if 's_nom' in network.lines.columns and len(network.lines) > 0:
+        total_deficit = np.clip(-balance, 0, None).sum(axis=1)
+        line_capacities = network.lines.s_nom.sum()
+        over = total_deficit > line_capacities
+        if over.any():
+            is_feasible = False
+            worst = int(np.argmax(total_deficit))
+            messages.append(
+                f"Capacité des lignes insuffisante à {over.sum()} pas de temps "
+                f"(pire: {snapshots[worst]}, {line_capacities:.2f} MW < {total_deficit[worst]:.2f} MW)"
+            )
+
+    # 4. Alignement temporel
+    loads_index = network.loads_t.p_set.index
+    gens_index = network.generators_t.p_max_pu.index
+    if not loads_index.equals(gens_index):
+        is_feasible = False
+        messages.append("Désalignement temporel: les indices ne correspondent pas")
+    if not loads_index.equals(snapshots):
+        is_feasible = False
+        messages.append("Désalignement temporel: charges ≠ snapshots du réseau")
+
+    # Rapport compact des pires pas de temps et bus
+    worst_rows = np.argsort(margin, kind='stable')[:n_worst]
+    worst_snapshots = pd.DataFrame({
+        'demande': total_demand[worst_rows],
+        'capacite': total_capacity[worst_rows],
+        'marge': margin[worst_rows],
+    }, index=snapshots[worst_rows])
+
+    if len(buses) and len(snapshots):
+        min_balance = balance.min(axis=0)
+        deficit_buses = np.flatnonzero(min_balance < 0)
+        deficit_buses = deficit_buses[np.argsort(min_balance[deficit_buses], kind='stable')][:n_worst]
+        worst_buses = pd.DataFrame({
+            'deficit': -min_balance[deficit_buses],
+            'snapshot': snapshots[balance[:, deficit_buses].argmin(axis=0)],
+        }, index=buses[deficit_buses])
+    else:
+        worst_buses = pd.DataFrame(columns=['deficit', 'snapshot'])
+
+    return FeasibilityReport(
+        is_feasible=is_feasible,
+        messages=messages,
+        n_islands=n_islands,
+        worst_snapshots=worst_snapshots,
+        worst_buses=worst_buses
+    )
@@ -22,6 +22,15 @@ import pandas as pd
 from typing import Dict, Optional, Tuple
 from datetime import datetime
 import numpy as np
+import logging
+
+from .dispatch import (build_dispatch_matrices, merit_order_dispatch, parallel_merit_order_dispatch,
+                       stack_dispatch_matrices, batch_merit_order_dispatch,
+                       add_emergency_slack, MeritOrderIndex, CARRIERS_BY_PRIORITY, EMERGENCY_PREFIX,
+                       EMERGENCY_TOLERANCE)
+from .rolling_horizon import optimize_rolling_horizon, HORIZON, OVERLAP
+from .feasibility import diagnostiquer_faisabilite, FeasibilityReport
+from ..utils.stage_cache import frame_fingerprint
 
 
 class NetworkOptimizer:
@@ -37,9 +46,11 @@ class NetworkOptimizer:
         solver_name (str): Solveur à utiliser
         solver_options (dict): Options de configuration du solveur
         is_journalier (bool): Si True, les données sont traitées avec un pas de 24h
+        workers (int): Nombre de processus pour les méthodes 'vectorized' et 'lp'
     """
 
-    def __init__(self, network: pypsa.Network, solver_name: str = "highs", is_journalier=None):
+    def __init__(self, network: pypsa.Network, solver_name: str = "highs", is_journalier=None,
+                 solver_options: Optional[dict] = None, workers: int = 1):
         """
         Initialise l'optimiseur.
 
@@ -47,9 +58,14 @@ class NetworkOptimizer:
             network: Réseau PyPSA à optimiser
             solver_name: Nom du solveur linéaire à utiliser ('highs' par défaut)
             is_journalier: Si True, les données sont traitées avec un pas de 24h
+            solver_options: Options transmises au solveur linéaire (méthode 'lp')
+            workers: Nombre de processus; au-delà de 1, les pas de temps sont
+                répartis par blocs dans un pool de processus
         """
         self.network = network
         self.solver_name = solver_name
+        self.solver_options = solver_options or {}
+        self.workers = workers
         
         # Détecter automatiquement le mode journalier si non spécifié
         if is_journalier is None:
@@ -61,15 +77,54 @@ class NetworkOptimizer:
         else:
             self.is_journalier = is_journalier
 
-    def optimize(self) -> pypsa.Network:
+        self._merit_order_index = None
+        self._merit_order_key = None
+
+    @property
+    def merit_order_index(self) -> MeritOrderIndex:
+        """
+        Index des ordres de mérite par filière, construit au premier accès.
+        
+        Les coûts marginaux sont lus une seule fois pour tout le réseau; les
+        moteurs de répartition consultent l'index au lieu de trier à chaque pas de temps.
+        L'index est reconstruit si les générateurs, leurs filières ou leurs coûts
+        marginaux (statiques ou variables) ont changé depuis.
+        """
+        generators = self.network.generators
+        key = (
+            len(self.network.snapshots),
+            frame_fingerprint(generators[['carrier', 'marginal_cost']]),
+            frame_fingerprint(self.network.generators_t.marginal_cost),
+        )
+        if self._merit_order_index is None or key != self._merit_order_key:
+            self._merit_order_index = MeritOrderIndex.from_network(self.network)
+            self._merit_order_key = key
+        return self._merit_order_index
+
+    def optimize(self, method: str = "manual") -> pypsa.Network:
         """
         Exécute l'optimisation du réseau avec gestion robuste des erreurs SVD.
         
         Cette méthode optimise la production en minimisant les coûts totaux,
         et gère les erreurs SVD qui peuvent survenir lors de l'extraction des résultats.
+
+        Args:
+            method: Moteur de répartition à utiliser
+                - 'manual': boucle par pas de temps (optimize_manually)
+                - 'vectorized': calcul matriciel sur tous les pas de temps (optimize_vectorized)
+                - 'lp': optimisation linéaire PyPSA par horizon glissant (optimize_lp)
+
+        Raises:
+            ValueError: Si la méthode est inconnue
         """
         # Utiliser notre optimisateur manuel au lieu de PyPSA standard
-        return self.optimize_manually()
+        if method == "manual":
+            return self.optimize_manually()
+        if method == "vectorized":
+            return self.optimize_vectorized()
+        if method == "lp":
+            return self.optimize_lp()
+        raise ValueError(f"Méthode d'optimisation inconnue: {method}")
 
     def optimize_manually(self) -> pypsa.Network:
         """
@@ -84,62 +139,27 @@ class NetworkOptimizer:
         Returns:
             pypsa.Network: Réseau avec résultats d'optimisation
         """
-        import logging
         logger = logging.getLogger("ManualOptimizer")
         logger.info(f"Démarrage de l'optimisation manuelle en mode {'journalier' if self.is_journalier else 'horaire'}...")
         
 
         loads_is_energy = getattr(self.network.loads_t.p_set, '_energy_not_power', self.is_journalier)
         
-        if not hasattr(self.network, 'generators_t'):
-            self.network.generators_t = {}
-
-        self.network.generators_t['p'] = pd.DataFrame(
-            0.0, 
-            index=self.network.snapshots, 
-            columns=self.network.generators.index
-        )
-
-        self.network.lines_t = {}
-        self.network.lines_t['p0'] = pd.DataFrame(
-            0.0,
-            index=self.network.snapshots,
-            columns=self.network.lines.index
-        )
-        self.network.lines_t['q0'] = pd.DataFrame(
-            0.0,
-            index=self.network.snapshots,
-            columns=self.network.lines.index
-        )
+        self._initialiser_resultats()
         
         # Extraire les générateurs par type pour ordonner la priorité
-        carriers_by_priority = [
-            'eolien', 'solaire', 'hydro_fil', 'nucléaire',  # Priorité 1: Fatales
-            'hydro_reservoir',                              # Priorité 2: Réservoirs  
-            'thermique', 'import', 'emergency'              # Priorité 3: Thermiques
-        ]
-        
-        generators_by_carrier = {}
-        for carrier in carriers_by_priority:
-            generators_by_carrier[carrier] = self.network.generators[
-                self.network.generators.carrier == carrier
-            ].index.tolist()
-        
-        # Calculer les capacités maximales disponibles par type
-        max_capacities = {}
-        for carrier in carriers_by_priority:
-            generators = generators_by_carrier.get(carrier, [])
-            if generators:
-                total_capacity = sum(self.network.generators.at[gen, 'p_nom'] for gen in generators)
-                max_capacities[carrier] = total_capacity
-                logger.info(f"Capacité maximale {carrier}: {total_capacity:.2f} MW")
+        carriers_by_priority = CARRIERS_BY_PRIORITY
+        generators_by_carrier = self._generateurs_par_filiere(logger)
         
         # Variables pour suivre la production
         total_annual_load = 0
         total_annual_generation = 0
         production_by_carrier = {carrier: 0 for carrier in carriers_by_priority}
         
-        for snapshot in self.network.snapshots:
+        merit_order_index = self.merit_order_index
+        remaining_by_snapshot = np.zeros(len(self.network.snapshots))
+        
+        for position, snapshot in enumerate(self.network.snapshots):
             # 1. Calculer la demande totale pour ce pas de temps
             if snapshot in self.network.loads_t.p_set.index:
                 total_load = self.network.loads_t.p_set.loc[snapshot].sum()
@@ -179,7 +199,7 @@ class NetworkOptimizer:
             hydro_reservoir_supplied = 0
             if hydro_reservoir_gens:
                 # Trier les réservoirs par coût marginal croissant
-                sorted_hydro_reservoir = self._sort_generators_by_cost(hydro_reservoir_gens, snapshot)
+                sorted_hydro_reservoir = merit_order_index.sorted_generators('hydro_reservoir', position)
                 
                 for gen in sorted_hydro_reservoir:
                     p_nom = self.network.generators.at[gen, 'p_nom']
@@ -228,7 +248,7 @@ class NetworkOptimizer:
                 carrier_allocation = min(available_capacity, remaining_load)
                 
                 # Trier les générateurs par coût marginal croissant
-                sorted_generators = self._sort_generators_by_cost(generators, snapshot)
+                sorted_generators = merit_order_index.sorted_generators(carrier, position)
                 
                 # Allouer la production dans l'ordre de mérite
                 carrier_supplied = 0
@@ -277,8 +297,7 @@ class NetworkOptimizer:
                 if remaining_hydro_capacity > 0:
                     additional_allocation = min(remaining_hydro_capacity, remaining_load)
                     
-                    # Trier à nouveau pour prendre en compte d'éventuels changements de coûts
-                    sorted_hydro_reservoir = self._sort_generators_by_cost(hydro_reservoir_gens, snapshot)
+                    sorted_hydro_reservoir = merit_order_index.sorted_generators('hydro_reservoir', position)
                     
                     for gen in sorted_hydro_reservoir:
                         if remaining_load <= 0:
@@ -333,7 +352,7 @@ class NetworkOptimizer:
                 carrier_allocation = min(available_capacity, remaining_load)
                 
                 # Trier par coût
-                sorted_generators = self._sort_generators_by_cost(generators, snapshot)
+                sorted_generators = merit_order_index.sorted_generators(carrier, position)
                 
                 # Allouer la production dans l'ordre de mérite
                 carrier_supplied = 0
@@ -364,105 +383,294 @@ class NetworkOptimizer:
                         break
                 production_by_carrier[carrier] += carrier_supplied
 
-            if remaining_load > 1.0:  # Tolérance de 1 MW
-                # Si besoin, ajouter un générateur d'urgence
-                emergency_gen = f"emergency_{snapshot.strftime('%Y%m%d')}"
-                if emergency_gen not in self.network.generators.index:
-                    # Chercher un bus approprié
-                    suitable_buses = self.network.buses[self.network.buses.type.isin(['prod', 'conso'])].index
-                    if len(suitable_buses) > 0:
-                        emergency_bus = suitable_buses[0]
-
-                        self.network.add(
-                            "Generator",
-                            emergency_gen,
-                            bus=emergency_bus,
-                            p_nom=remaining_load * 1.2,  # 20% de marge
-                            marginal_cost=800,  # Très coûteux
-                            carrier="import"
-                        )
-                        
-                        # Produire l'énergie manquante
-                        self.network.generators_t['p'].at[snapshot, emergency_gen] = remaining_load
-                        
-                        # Mise à jour des statistiques
-                        production_by_carrier['emergency'] += remaining_load
-                        remaining_load = 0
-                    else:
-                        logger.error("Impossible de trouver un bus approprié pour le générateur d'urgence")
+            # Demande non satisfaite, couverte après la boucle par le générateur d'urgence
+            remaining_by_snapshot[position] = remaining_load
             
             # Calculer la production totale pour ce pas de temps
             total_generation_snapshot = self.network.generators_t['p'].loc[snapshot].sum()
             total_annual_generation += total_generation_snapshot
         
+        # Si besoin, un seul générateur d'urgence couvre tous les déficits
+        emergency_production = self._ajouter_generateur_urgence(remaining_by_snapshot, logger)
+        production_by_carrier['emergency'] += emergency_production
+        total_annual_generation += emergency_production
+        
         # Rapport final
         logger.info(f"Optimisation manuelle terminée.")
+        self._journaliser_bilan(logger, total_annual_load, total_annual_generation, production_by_carrier)
         
-        # Afficher des statistiques sur puissance vs énergie
-        avg_demand = total_annual_load/len(self.network.snapshots)
-        logger.info(f"Demande totale moyenne: {avg_demand:.2f} MW")
+        # Marquer le réseau comme optimisé
+        self.network.status = "ok"
+        self.network.termination_condition = "manual"
         
-        # Rapport sur l'énergie
-        if self.is_journalier:
-            total_energy_mwh = total_annual_generation * 24
-            logger.info(f"Mode journalier: Énergie totale produite: {total_energy_mwh:.2f} MWh ({total_energy_mwh/1e6:.2f} TWh)")
-        else:
-            total_energy_mwh = total_annual_generation
-            logger.info(f"Mode horaire: Énergie totale produite: {total_energy_mwh:.2f} MWh ({total_energy_mwh/1e6:.2f} TWh)")
+        return self.network
+
+    def optimize_vectorized(self) -> pypsa.Network:
+        """
+        Optimise le réseau par ordre de mérite sur tous les pas de temps à la fois.
         
-        # Production par type
-        for carrier in carriers_by_priority:
-            if production_by_carrier[carrier] > 0:
-                percentage = 100 * production_by_carrier[carrier] / total_annual_generation
-                logger.info(f"Production {carrier}: {production_by_carrier[carrier]:.2f} MW ({percentage:.1f}%)")
+        Applique les mêmes règles de priorité que optimize_manually (fatales, plancher
+        de 20% pour les réservoirs, thermique/import, urgence) à partir des matrices
+        de disponibilité et de coûts construites une seule fois. Le résultat
+        generators_t['p'] est identique à celui de optimize_manually.
         
+        Avec workers > 1, les pas de temps sont découpés en blocs répartis dans
+        un pool de processus (parallel_merit_order_dispatch).
+        
+        Returns:
+            pypsa.Network: Réseau avec résultats d'optimisation
+        """
+        logger = logging.getLogger("ManualOptimizer")
+        logger.info(f"Démarrage de l'optimisation vectorisée en mode {'journalier' if self.is_journalier else 'horaire'}...")
+
+        loads_is_energy = getattr(self.network.loads_t.p_set, '_energy_not_power', self.is_journalier)
+
+        self._initialiser_resultats()
+        self._generateurs_par_filiere(logger)
+
+        matrices = build_dispatch_matrices(self.network, loads_is_energy)
+        missing = ~self.network.snapshots.isin(self.network.loads_t.p_set.index)
+        if missing.any():
+            logger.warning(f"Pas de données de charge pour {missing.sum()} pas de temps, utilisation de 0")
+
+        if self.workers > 1:
+            logger.info(f"Répartition par blocs sur {self.workers} processus")
+            result = parallel_merit_order_dispatch(matrices, self.merit_order_index, self.workers)
+        else:
+            result = merit_order_dispatch(matrices, self.merit_order_index)
+        self.network.generators_t['p'] = pd.DataFrame(
+            result.p,
+            index=self.network.snapshots,
+            columns=self.network.generators.index
+        )
+        production_by_carrier = result.production_by_carrier
+        production_by_carrier['emergency'] += self._ajouter_generateur_urgence(result.remaining, logger)
+
+        logger.info(f"Optimisation vectorisée terminée.")
+        total_annual_generation = self.network.generators_t['p'].sum(axis=1).sum()
+        self._journaliser_bilan(logger, matrices.load.sum(), total_annual_generation, production_by_carrier)
+
         # Marquer le réseau comme optimisé
         self.network.status = "ok"
         self.network.termination_condition = "manual"
-        
+
         return self.network
 
-    def _sort_generators_by_cost(self, generators, snapshot):
+    @classmethod
+    def optimize_batch(cls, networks: Dict[str, pypsa.Network], is_journalier=None,
+                       workers: int = 1) -> Dict[str, pypsa.Network]:
         """
-        Trie les générateurs par coût marginal croissant.
+        Optimise plusieurs scénarios par ordre de mérite en un seul passage vectorisé.
+        
+        Les matrices de chaque réseau sont empilées en tenseurs (scénarios × pas de
+        temps × générateurs) sur l'union des générateurs, puis réparties ensemble
+        (batch_merit_order_dispatch). La production de chaque réseau est identique
+        à celle de optimize_vectorized; le générateur d'urgence est ajouté réseau
+        par réseau.
         
         Args:
-            generators: Liste des générateurs à trier
-            snapshot: Pas de temps actuel
+            networks: Réseaux à optimiser, par nom de scénario (même nombre de pas de temps)
+            is_journalier: Si True, les données sont traitées avec un pas de 24h
+                (détecté pour chaque réseau si None)
+            workers: Nombre de processus pour la répartition
             
         Returns:
-            Liste triée des générateurs
+            Dict[str, pypsa.Network]: Réseaux avec résultats d'optimisation
         """
-        costs = {}
-        
-        for gen in generators:
-            # Coût marginal fixe ou variable
-            if (hasattr(self.network.generators_t, 'marginal_cost') and 
-                gen in self.network.generators_t.marginal_cost.columns and
-                snapshot in self.network.generators_t.marginal_cost.index):
-                cost = self.network.generators_t.marginal_cost.at[snapshot, gen]
-            else:
-                cost = self.network.generators.at[gen, 'marginal_cost'] if 'marginal_cost' in self.network.generators.columns else 0.0
+        logger = logging.getLogger("ManualOptimizer")
+        logger.info(f"Démarrage de l'optimisation vectorisée de {len(networks)} scénarios...")
+        
+        optimizers = {name: cls(network, is_journalier=is_journalier, workers=workers)
+                      for name, network in networks.items()}
+        matrices = {}
+        for name, optimizer in optimizers.items():
+            network = optimizer.network
+            loads_is_energy = getattr(network.loads_t.p_set, '_energy_not_power', optimizer.is_journalier)
+            optimizer._initialiser_resultats()
+            matrices[name] = build_dispatch_matrices(network, loads_is_energy)
+        
+        result = batch_merit_order_dispatch(stack_dispatch_matrices(matrices), workers)
+        
+        for i, (name, optimizer) in enumerate(optimizers.items()):
+            network = optimizer.network
+            network.generators_t['p'] = result.production(name).reindex(columns=network.generators.index)
+            production_by_carrier = result.production_by_carrier[name]
+            production_by_carrier['emergency'] += optimizer._ajouter_generateur_urgence(result.remaining[i], logger)
+            
+            logger.info(f"Scénario {name}:")
+            total_annual_generation = network.generators_t['p'].sum(axis=1).sum()
+            optimizer._journaliser_bilan(logger, matrices[name].load.sum(), total_annual_generation,
+                                         production_by_carrier)
+            network.status = "ok"
+            network.termination_condition = "manual"
+        
+        return {name: optimizer.network for name, optimizer in optimizers.items()}
+
+    def optimize_lp(self, horizon: pd.Timedelta = HORIZON, overlap: pd.Timedelta = OVERLAP,
+                    workers: Optional[int] = None) -> pypsa.Network:
+        """
+        Optimise le réseau par programmation linéaire (PyPSA/linopy) sur un horizon glissant.
+        
+        Contrairement à l'ordre de mérite, cette méthode respecte les capacités des
+        lignes et minimise le coût total de chaque fenêtre. Les capacités installées
+        sont figées et l'état des stockages est transmis d'une fenêtre à l'autre.
+        
+        Args:
+            horizon: Durée de chaque fenêtre (1 semaine par défaut)
+            overlap: Chevauchement entre fenêtres consécutives (1 jour par défaut)
+            workers: Nombre de processus pour résoudre les fenêtres indépendantes
+                (self.workers par défaut)
             
-            # Si le coût est NaN ou infini, utiliser une valeur par défaut
-            if pd.isna(cost) or np.isinf(cost):
-                carrier = self.network.generators.at[gen, 'carrier']
-                default_costs = {
-                    'hydro_fil': 0.1,
-                    'solaire': 0.1,
-                    'eolien': 0.1,
-                    'nucléaire': 0.2,
-                    'hydro_reservoir': 7.0,
-                    'thermique': 30.0,
-                    'emergency': 800.0,
-                    'import': 0.5
-                }
-                cost = default_costs.get(carrier, 10.0)
+        Returns:
+            pypsa.Network: Réseau avec résultats d'optimisation
+            
+        Raises:
+            RuntimeError: Si une fenêtre n'a pas de solution optimale
+        """
+        logger = logging.getLogger("LPOptimizer")
+        logger.info(f"Démarrage de l'optimisation linéaire en mode {'journalier' if self.is_journalier else 'horaire'}...")
+
+        loads_is_energy = getattr(self.network.loads_t.p_set, '_energy_not_power', self.is_journalier)
+
+        resultats = optimize_rolling_horizon(
+            self.network,
+            solver_name=self.solver_name,
+            solver_options=self.solver_options,
+            horizon=horizon,
+            overlap=overlap,
+            workers=self.workers if workers is None else workers,
+            loads_is_energy=loads_is_energy
+        )
+
+        self._initialiser_resultats()
+        self.network.generators_t['p'] = resultats['generators_p'].reindex(
+            index=self.network.snapshots, columns=self.network.generators.index, fill_value=0.0
+        )
+        self.network.lines_t['p0'] = resultats['lines_p0'].reindex(
+            index=self.network.snapshots, columns=self.network.lines.index, fill_value=0.0
+        )
+        if not self.network.storage_units.empty:
+            self.network.storage_units_t['p'] = resultats['storage_units_p']
+            self.network.storage_units_t['state_of_charge'] = resultats['state_of_charge']
+        if not self.network.stores.empty:
+            self.network.stores_t['p'] = resultats['stores_p']
+            self.network.stores_t['e'] = resultats['stores_e']
+
+        logger.info(f"Optimisation linéaire terminée.")
+
+        # Marquer le réseau comme optimisé
+        self.network.status = "ok"
+        self.network.termination_condition = "optimal"
+
+        return self.network
+
+    def _initialiser_resultats(self):
+        """
+        Initialise les tables de résultats (production et flux des lignes) à zéro.
+        """
+        if not hasattr(self.network, 'generators_t'):
+            self.network.generators_t = {}
+
+        self.network.generators_t['p'] = pd.DataFrame(
+            0.0, 
+            index=self.network.snapshots, 
+            columns=self.network.generators.index
+        )
+
+        self.network.lines_t = {}
+        self.network.lines_t['p0'] = pd.DataFrame(
+            0.0,
+            index=self.network.snapshots,
+            columns=self.network.lines.index
+        )
+        self.network.lines_t['q0'] = pd.DataFrame(
+            0.0,
+            index=self.network.snapshots,
+            columns=self.network.lines.index
+        )
+
+    def _generateurs_par_filiere(self, logger) -> Dict:
+        """
+        Regroupe les générateurs par filière et journalise les capacités maximales.
+        
+        Returns:
+            Dict: Liste des générateurs pour chaque filière de CARRIERS_BY_PRIORITY
+        """
+        generators_by_carrier = {}
+        for carrier in CARRIERS_BY_PRIORITY:
+            generators_by_carrier[carrier] = self.network.generators[
+                self.network.generators.carrier == carrier
+            ].index.tolist()
+        
+        # Calculer les capacités maximales disponibles par type
+        for carrier in CARRIERS_BY_PRIORITY:
+            generators = generators_by_carrier.get(carrier, [])
+            if generators:
+                total_capacity = sum(self.network.generators.at[gen, 'p_nom'] for gen in generators)
+                logger.info(f"Capacité maximale {carrier}: {total_capacity:.2f} MW")
+        
+        return generators_by_carrier
+
+    def _ajouter_generateur_urgence(self, remaining: np.ndarray, logger) -> float:
+        """
+        Couvre la demande restante avec le générateur d'urgence du réseau.
+        
+        Un seul générateur `emergency_<bus>` (voir add_emergency_slack) produit
+        le déficit de chaque pas de temps qui dépasse la tolérance, au lieu d'un
+        générateur par journée en déficit.
+        
+        Args:
+            remaining: Demande non satisfaite à chaque pas de temps (MW)
             
-            costs[gen] = float(cost)
+        Returns:
+            float: Production totale du générateur d'urgence
+        """
+        deficit = np.where(remaining > EMERGENCY_TOLERANCE, remaining, 0.0)
+        if not deficit.any():
+            return 0.0
+        
+        suitable_buses = self.network.buses[self.network.buses.type.isin(['prod', 'conso'])].index
+        if len(suitable_buses) == 0:
+            logger.error("Impossible de trouver un bus approprié pour le générateur d'urgence")
+            return 0.0
+        
+        # Le générateur produit l'énergie manquante en plus d'une éventuelle
+        # production déjà répartie : sa capacité couvre les deux
+        bus = suitable_buses[0]
+        production = self.network.generators_t['p']
+        name = f"{EMERGENCY_PREFIX}{bus}"
+        if name in production.columns:
+            existing = production[name].reindex(self.network.snapshots).fillna(0.0).to_numpy(dtype='float64')
+        else:
+            existing = np.zeros(len(self.network.snapshots))
+        total = existing + deficit
+
+        emergency_gen = add_emergency_slack(self.network, bus, total, margin=1.2)  # 20% de marge
+        production[emergency_gen] = total
+        
+        return float(deficit.sum())
+
+    def _journaliser_bilan(self, logger, total_annual_load, total_annual_generation, production_by_carrier):
+        """
+        Journalise la demande moyenne, l'énergie produite et la production par filière.
+        """
+        # Afficher des statistiques sur puissance vs énergie
+        avg_demand = total_annual_load/len(self.network.snapshots)
+        logger.info(f"Demande totale moyenne: {avg_demand:.2f} MW")
+        
+        # Rapport sur l'énergie
+        if self.is_journalier:
+            total_energy_mwh = total_annual_generation * 24
+            logger.info(f"Mode journalier: Énergie totale produite: {total_energy_mwh:.2f} MWh ({total_energy_mwh/1e6:.2f} TWh)")
+        else:
+            total_energy_mwh = total_annual_generation
+            logger.info(f"Mode horaire: Énergie totale produite: {total_energy_mwh:.2f} MWh ({total_energy_mwh/1e6:.2f} TWh)")
         
-        # Trier par coût croissant, en garantissant des valeurs numériques valides
-        return sorted(generators, key=lambda g: costs[g])
+        # Production par type
+        for carrier in CARRIERS_BY_PRIORITY:
+            if production_by_carrier[carrier] > 0:
+                percentage = 100 * production_by_carrier[carrier] / total_annual_generation
+                logger.info(f"Production {carrier}: {production_by_carrier[carrier]:.2f} MW ({percentage:.1f}%)")
 
     def get_optimization_results(self) -> Dict:
         """
@@ -477,8 +685,10 @@ class NetworkOptimizer:
         """
         # Removed requirement for network.objective - we'll calculate it instead
         
-        # Calculate total cost if not already set
-        if not hasattr(self.network, 'objective'):
+        # Calculate total cost if not already set (PyPSA >= 1.0 always defines
+        # network.objective, None before a linopy optimization)
+        total_cost = getattr(self.network, 'objective', None)
+        if total_cost is None:
             total_cost = 0.0
             # Calculate cost based on production and marginal costs
             for gen in self.network.generators.index:
@@ -498,8 +708,11 @@ class NetworkOptimizer:
                         
                     total_cost += cost
                     
-            # Set the objective value
-            self.network.objective = float(total_cost)
+            # Set the objective value (read-only property in PyPSA >= 1.0)
+            try:
+                self.network.objective = float(total_cost)
+            except AttributeError:
+                pass
 
         pilotable_gens = self.network.generators[
             self.network.generators.carrier.isin(['hydro_reservoir', 'thermique'])
@@ -510,25 +723,38 @@ class NetworkOptimizer:
 
         return {
             "status": getattr(self.network, 'status', 'unknown'),
-            "objective_value": float(self.network.objective),
-            "total_cost": float(self.network.objective),
+            "objective_value": float(total_cost),
+            "total_cost": float(total_cost),
             "pilotable_production": self.network.generators_t['p'][pilotable_gens].sum().sum(),
             "non_pilotable_production": self.network.generators_t['p'][non_pilotable_gens].sum().sum(),
-            "production_by_type": self.network.generators_t['p'].groupby(
-                self.network.generators.carrier, axis=1
-            ).sum(),
+            "production_by_type": self.network.generators_t['p'].T.groupby(
+                self.network.generators.carrier
+            ).sum().T,
             "line_loading_max": self.network.lines_t['p0'].abs().max(),
             "n_active_line_constraints": (
-                self.network.lines_t['p0'].abs() > 0.99 * self.network.lines.s_nom
+                self.network.lines_t['p0'].abs().gt(0.99 * self.network.lines.s_nom, axis=1)
             ).sum().sum(),
             "global_constraints": self.network.global_constraints if hasattr(self.network, "global_constraints") else None
         }
 
+    def diagnose_feasibility(self, n_worst: int = 5) -> FeasibilityReport:
+        """
+        Diagnostic de faisabilité détaillé sur tous les pas de temps.
+        
+        Args:
+            n_worst: Nombre de pas de temps et de bus à inclure dans le rapport
+            
+        Returns:
+            FeasibilityReport: Statut, problèmes identifiés et pires pas de temps/bus
+        """
+        return diagnostiquer_faisabilite(self.network, n_worst)
+
     def check_optimization_feasibility(self) -> Tuple[bool, str]:
         """
         Vérifie en détail si l'optimisation est faisable.
         
-        Effectue une série de tests pour détecter les problèmes potentiels:
+        Effectue une série de tests sur tous les pas de temps pour détecter les
+        problèmes potentiels (voir diagnose_feasibility):
         - Capacité de production suffisante
         - Connectivité du réseau
         - Capacité des lignes suffisante
@@ -537,109 +763,5 @@ class NetworkOptimizer:
         Returns:
             Tuple[faisable, message]: Statut de faisabilité et message explicatif
         """
-        messages = []
-        is_feasible = True
-        
-        # 1. Capacité totale (production vs demande)
-        total_capacity = self.network.generators.p_nom.sum()
-        max_load = self.network.loads_t.p_set.sum(axis=1).max()
-        
-        if total_capacity < max_load:
-            is_feasible = False
-            messages.append(f"Capacité insuffisante: {total_capacity:.2f} MW < {max_load:.2f} MW")
-        
-        # 2. Vérifier la connectivité du réseau
-        import networkx as nx
-        G = nx.Graph()
-        
-        for _, line in self.network.lines.iterrows():
-            G.add_edge(line.bus0, line.bus1)
-        
-        components = list(nx.connected_components(G))
-        
-        if len(components) > 1:
-            messages.append(f"Réseau fragmenté en {len(components)} composants connectés")
-            
-            for i, comp in enumerate(components):
-                buses_in_comp = list(comp)
-                loads_in_comp = [l for l in self.network.loads.index 
-                          if self.network.loads.loc[l, 'bus'] in buses_in_comp]
-                gens_in_comp = [g for g in self.network.generators.index 
-                          if self.network.generators.loc[g, 'bus'] in buses_in_comp]
-                
-                if loads_in_comp and not gens_in_comp:
-                    is_feasible = False
-                    load_sum = self.network.loads_t.p_set[loads_in_comp].sum(axis=1).max()
-                    messages.append(f"Composant {i} avec {len(loads_in_comp)} charges totalisant {load_sum:.2f} MW sans générateurs")
-        
-        # 3. Vérifier les capacités des lignes
-        if hasattr(self.network.lines, 's_nom') and len(self.network.lines) > 0:
-            for snapshot in self.network.snapshots[:1]:
-                buses_with_gen = set(self.network.generators.bus)
-                buses_with_load = set(self.network.loads.bus)
-                
-                total_gen_per_bus = {}
-                total_load_per_bus = {}
-                
-                for gen_name, gen in self.network.generators.iterrows():
-                    bus = gen.bus
-                    p_nom = gen.p_nom
-                    
-                    p_max_pu = 1.0
-                    if (hasattr(self.network, 'generators_t') and 
-                        hasattr(self.network.generators_t, 'p_max_pu') and
-                        gen_name in self.network.generators_t.p_max_pu.columns):
-                        p_max_pu = self.network.generators_t.p_max_pu.loc[snapshot, gen_name]
-                    
-                    avail_capacity = p_nom * p_max_pu
-                    
-                    if bus not in total_gen_per_bus:
-                        total_gen_per_bus[bus] = 0
-                    total_gen_per_bus[bus] += avail_capacity
-                
-                for load_name, load in self.network.loads.iterrows():
-                    bus = load.bus
-                    if (hasattr(self.network, 'loads_t') and 
-                        hasattr(self.network.loads_t, 'p_set') and
-                        load_name in self.network.loads_t.p_set.columns):
-                        p_set = self.network.loads_t.p_set.loc[snapshot, load_name]
-                        
-                        if bus not in total_load_per_bus:
-                            total_load_per_bus[bus] = 0
-                        total_load_per_bus[bus] += p_set
-            
-                buses_with_deficit = []
-                total_deficit = 0
-                
-                for bus, load in total_load_per_bus.items():
-                    gen = total_gen_per_bus.get(bus, 0)
-                    if gen < load:
-                        deficit = load - gen
-                        buses_with_deficit.append((bus, deficit))
-                        total_deficit += deficit
-                
-                if buses_with_deficit:
-                    line_capacities = self.network.lines.s_nom.sum()
-                    if line_capacities < total_deficit:
-                        is_feasible = False
-                        messages.append(f"Capacité des lignes insuffisante: {line_capacities:.2f} MW < {total_deficit:.2f} MW")
-        
-        # 4. Vérifier l'alignement temporel
-        if (hasattr(self.network, 'loads_t') and hasattr(self.network.loads_t, 'p_set') and
-            hasattr(self.network, 'generators_t') and hasattr(self.network.generators_t, 'p_max_pu')):
-            
-            loads_index = self.network.loads_t.p_set.index
-            gens_index = self.network.generators_t.p_max_pu.index
-            
-            if not loads_index.equals(gens_index):
-                is_feasible = False
-                messages.append("Désalignement temporel: les indices ne correspondent pas")
-            
-            if not loads_index.equals(self.network.snapshots):
-                is_feasible = False
-                messages.append("Désalignement temporel: charges ≠ snapshots du réseau")
-        
-        if is_feasible and not messages:
-            return True, "Optimisation faisable"
-        
-        return is_feasible, "Problèmes identifiés:\n- " + "\n- ".join(messages)
\ No newline at end of file
+        report = self.diagnose_feasibility()
+        return report.is_feasible, report.to_message()
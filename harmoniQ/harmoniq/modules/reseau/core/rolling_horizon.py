@@ -0,0 +1,225 @@
+"""
+Module d'optimisation linéaire du réseau par horizon glissant.
+
+Ce module résout la répartition de la production avec `network.optimize`
+(PyPSA/linopy) sur des fenêtres successives plutôt que sur toute l'année,
+ce qui évite de construire un seul problème linéaire trop gros pour la mémoire :
+- Chaque fenêtre couvre `horizon` (1 semaine par défaut) et chevauche la
+  suivante de `overlap` (1 jour par défaut); seule la partie hors chevauchement
+  est conservée
+- L'état des stockages (StorageUnit, Store) à la fin de la partie conservée
+  sert d'état initial à la fenêtre suivante
+- Sans stockage, les fenêtres sont indépendantes et peuvent être résolues en
+  parallèle dans un pool de processus
+
+Les capacités sont figées (p_nom_extendable=False) : chaque fenêtre est un
+problème de répartition et non d'investissement.
+
+Example:
+    >>> from harmoniq.modules.reseau.core.rolling_horizon import optimize_rolling_horizon
+    >>> resultats = optimize_rolling_horizon(network, solver_name="highs", workers=4)
+    >>> resultats["generators_p"].sum()
+"""
+
+import pypsa
+import pandas as pd
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+logger = logging.getLogger("RollingHorizon")
+
+HORIZON = pd.Timedelta(weeks=1)
+OVERLAP = pd.Timedelta(days=1)
+
+
+@dataclass
+class Fenetre:
+    """
+    Fenêtre de l'horizon glissant.
+
+    Attributes:
+        snapshots (pd.DatetimeIndex): Pas de temps résolus dans la fenêtre
+        committed (pd.DatetimeIndex): Pas de temps dont les résultats sont conservés
+    """
+    snapshots: pd.DatetimeIndex
+    committed: pd.DatetimeIndex
+
+
+def decouper_fenetres(snapshots: pd.DatetimeIndex,
+                      horizon: pd.Timedelta = HORIZON,
+                      overlap: pd.Timedelta = OVERLAP) -> List[Fenetre]:
+    """
+    Découpe les pas de temps en fenêtres glissantes avec chevauchement.
+
+    Args:
+        snapshots: Pas de temps du réseau
+        horizon: Durée de chaque fenêtre
+        overlap: Durée du chevauchement avec la fenêtre suivante
+
+    Returns:
+        List[Fenetre]: Fenêtres couvrant tous les pas de temps
+
+    Raises:
+        ValueError: Si le chevauchement n'est pas plus court que l'horizon
+    """
+    if overlap >= horizon:
+        raise ValueError(f"Le chevauchement ({overlap}) doit être plus court que l'horizon ({horizon})")
+
+    snapshots = pd.DatetimeIndex(snapshots)
+    fenetres = []
+    if len(snapshots) == 0:
+        return fenetres
+
+    step = horizon - overlap
+    start = snapshots[0]
+    while True:
+        window = snapshots[(snapshots >= start) & (snapshots < start + horizon)]
+        last = window[-1] == snapshots[-1]
+        committed = window if last else window[window < start + step]
+        fenetres.append(Fenetre(snapshots=window, committed=committed))
+        if last:
+            break
+        start = snapshots[snapshots >= start + step][0]
+
+    return fenetres
+
+
+def fenetres_independantes(network: pypsa.Network) -> bool:
+    """
+    Indique si les fenêtres peuvent être résolues indépendamment.
+
+    Les fenêtres ne sont liées que par l'état des stockages.
+    """
+    return network.storage_units.empty and network.stores.empty
+
+
+def preparer_fenetre(network: pypsa.Network, fenetre: Fenetre, loads_is_energy: bool = False) -> pypsa.Network:
+    """
+    Extrait le sous-réseau d'une fenêtre, prêt pour la répartition linéaire.
+
+    Args:
+        network: Réseau complet
+        fenetre: Fenêtre à extraire
+        loads_is_energy: Si True, la demande est en MWh/jour et convertie en MW moyens
+
+    Returns:
+        pypsa.Network: Copie du réseau restreinte aux pas de temps de la fenêtre
+    """
+    sub_network = network.copy(snapshots=fenetre.snapshots)
+    # La copie partage les tableaux statiques en lecture seule avec le réseau
+    # d'origine, or PyPSA les modifie en place lors de l'analyse de la topologie
+    for component in sub_network.components:
+        component.static = component.static.copy(deep=True)
+    sub_network.generators.p_nom_extendable = False
+    if loads_is_energy:
+        sub_network.loads_t.p_set = sub_network.loads_t.p_set / 24
+    return sub_network
+
+
+def resoudre_fenetre(sub_network: pypsa.Network,
+                     solver_name: str = "highs",
+                     solver_options: Optional[dict] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Résout la répartition linéaire d'une fenêtre.
+
+    Fonction de niveau module pour pouvoir être exécutée dans un pool de processus.
+
+    Args:
+        sub_network: Sous-réseau de la fenêtre
+        solver_name: Solveur linéaire
+        solver_options: Options du solveur
+
+    Returns:
+        Dict[str, pd.DataFrame]: Séries temporelles de résultats de la fenêtre
+
+    Raises:
+        RuntimeError: Si le solveur ne trouve pas de solution optimale
+    """
+    status, condition = sub_network.optimize(
+        solver_name=solver_name,
+        solver_options=solver_options or {}
+    )
+    if status != "ok":
+        first, last = sub_network.snapshots[0], sub_network.snapshots[-1]
+        raise RuntimeError(f"Échec de l'optimisation de la fenêtre {first} - {last}: {condition}")
+
+    return {
+        "generators_p": sub_network.generators_t.p,
+        "lines_p0": sub_network.lines_t.p0,
+        "storage_units_p": sub_network.storage_units_t.p,
+        "state_of_charge": sub_network.storage_units_t.state_of_charge,
+        "stores_p": sub_network.stores_t.p,
+        "stores_e": sub_network.stores_t.e,
+    }
+
+
+def _demarrer_a_chaud(sub_network: pypsa.Network, resultats: Dict[str, pd.DataFrame], fin: pd.Timestamp):
+    """
+    Initialise les stockages d'une fenêtre avec l'état atteint à `fin`.
+    """
+    if not sub_network.storage_units.empty:
+        sub_network.storage_units.cyclic_state_of_charge = False
+        sub_network.storage_units.state_of_charge_initial = resultats["state_of_charge"].loc[fin]
+    if not sub_network.stores.empty:
+        sub_network.stores.e_cyclic = False
+        sub_network.stores.e_initial = resultats["stores_e"].loc[fin]
+
+
+def optimize_rolling_horizon(network: pypsa.Network,
+                             solver_name: str = "highs",
+                             solver_options: Optional[dict] = None,
+                             horizon: pd.Timedelta = HORIZON,
+                             overlap: pd.Timedelta = OVERLAP,
+                             workers: int = 1,
+                             loads_is_energy: bool = False) -> Dict[str, pd.DataFrame]:
+    """
+    Résout la répartition linéaire du réseau par horizon glissant.
+
+    Args:
+        network: Réseau PyPSA complet
+        solver_name: Solveur linéaire ('highs' par défaut)
+        solver_options: Options du solveur
+        horizon: Durée de chaque fenêtre
+        overlap: Durée du chevauchement entre fenêtres
+        workers: Nombre de processus pour les fenêtres indépendantes
+        loads_is_energy: Si True, la demande est en MWh/jour et convertie en MW moyens
+
+    Returns:
+        Dict[str, pd.DataFrame]: Séries temporelles de résultats sur tous les pas de temps
+    """
+    fenetres = decouper_fenetres(network.snapshots, horizon, overlap)
+    logger.info(f"Optimisation linéaire sur {len(fenetres)} fenêtres (horizon {horizon}, chevauchement {overlap})")
+
+    resultats_fenetres = []
+    if fenetres_independantes(network) and workers > 1 and len(fenetres) > 1:
+        logger.info(f"Fenêtres indépendantes: résolution parallèle sur {workers} processus")
+        sub_networks = [preparer_fenetre(network, f, loads_is_energy) for f in fenetres]
+        # 'spawn' évite d'hériter des fils d'exécution du solveur du processus parent
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            futures = [
+                executor.submit(resoudre_fenetre, sub_network, solver_name, solver_options)
+                for sub_network in sub_networks
+            ]
+            resultats_fenetres = [future.result() for future in futures]
+    else:
+        precedent = None
+        for i, fenetre in enumerate(fenetres):
+            sub_network = preparer_fenetre(network, fenetre, loads_is_energy)
+            if precedent is not None:
+                _demarrer_a_chaud(sub_network, precedent, fenetres[i - 1].committed[-1])
+            precedent = resoudre_fenetre(sub_network, solver_name, solver_options)
+            resultats_fenetres.append(precedent)
+            logger.info(f"Fenêtre {i + 1}/{len(fenetres)} résolue")
+
+    # Assembler les parties conservées de chaque fenêtre
+    resultats = {}
+    for key in resultats_fenetres[0] if resultats_fenetres else []:
+        resultats[key] = pd.concat([
+            r[key].loc[fenetre.committed] for r, fenetre in zip(resultats_fenetres, fenetres)
+        ])
+
+    return resultats
@@ -4,15 +4,20 @@ Test du chargeur de données pour le réseau électrique.
 
 import sys
 import os
+import types
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
+
 parent_dir = Path(__file__).parent.parent
 sys.path.append(str(parent_dir))
 
 from utils import NetworkDataLoader, DataLoadError
 from harmoniq.db.engine import get_db
 from harmoniq.db.CRUD import read_data_by_id
-from harmoniq.db.schemas import ListeInfrastructures,Scenario
+from harmoniq.db.schemas import ListeInfrastructures,Scenario, NucleaireBase
+from harmoniq.modules.nucleaire import InfraNucleaire
 import asyncio
 
 def test_network_data():
@@ -251,7 +256,51 @@ def test_timeseries_data():
         import traceback
         traceback.print_exc()
 
+
+def test_distribute_demand():
+    """
+    Teste la distribution vectorisée de la demande entre les charges.
+    """
+    snapshots = pd.date_range("2035-01-01", periods=48, freq="h")
+    total_demand = pd.Series(np.linspace(20000, 30000, 48), index=snapshots)
+    loads = pd.Index([f"load_{i}" for i in range(25)])
+
+    demand = NetworkDataLoader.distribute_demand(total_demand, loads, seed=42)
+    assert demand.shape == (48, 25)
+    assert (demand.dtypes == "float64").all()
+    assert (demand > 0).all().all()
+    np.testing.assert_allclose(demand.sum(axis=1), total_demand)
+
+    # Tirage reproductible avec la même graine
+    assert demand.equals(NetworkDataLoader.distribute_demand(total_demand, loads, seed=42))
+    assert not demand.equals(NetworkDataLoader.distribute_demand(total_demand, loads, seed=7))
+
+
+def test_compute_productions_pool():
+    """
+    Teste le calcul des profils de production dans un pool de processus.
+    """
+    scenario = types.SimpleNamespace(date_de_debut=pd.Timestamp("2035-03-01"),
+                                     date_de_fin=pd.Timestamp("2035-03-31"))
+    timestamps = pd.date_range("2035-03-01", "2035-03-31", freq="h")
+    productions = []
+    for i, semaine in enumerate([9, 10, 11]):
+        infra = InfraNucleaire(NucleaireBase(nom=f"smr_{i}", latitude=46.0, longitude=-72.0,
+                                             puissance_nominal=300.0, semaine_maintenance=semaine))
+        infra.charger_scenario(scenario)
+        productions.append((f"smr_{i}", infra, 'production_mwh', 300.0, 0.0))
+
+    loader = NetworkDataLoader()
+    sequentiel = asyncio.run(loader._compute_productions(productions, timestamps))
+    loader.production_workers = 2
+    parallele = asyncio.run(loader._compute_productions(productions, timestamps))
+
+    for attendu, profil in zip(sequentiel, parallele):
+        np.testing.assert_array_equal(attendu, profil)
+        assert profil.shape == (len(timestamps),)
+        assert set(np.unique(profil)) == {0.0, 1.0}
+
+
 if __name__ == "__main__":
     # test_network_data()
     test_timeseries_data()
-
@@ -0,0 +1,52 @@
+"""
+Test des utilitaires énergétiques du réseau électrique.
+"""
+
+import numpy as np
+import pytest
+
+from harmoniq.modules.reseau.utils import EnergyUtils
+from harmoniq.modules.reseau.tests.test_optimization import creer_reseau_test
+
+
+@pytest.mark.parametrize("deltaE", [-1e9, 0.0, 2.5e4, 1.2e5, 1e9])
+def test_resoudre_pmax_identique_dichotomie(deltaE):
+    limites = np.random.default_rng(0).uniform(-500, 2000, 240)
+
+    Pmax = EnergyUtils.resoudre_pmax(limites, deltaE)
+    Pmax_dichotomie, _ = EnergyUtils.pmax_par_dichotomie(limites, deltaE, tolerance=1e-6)
+
+    assert Pmax == pytest.approx(Pmax_dichotomie, abs=1e-3)
+    assert limites.min() <= Pmax <= limites.max()
+    if limites.min() < Pmax < limites.max():
+        assert np.minimum(Pmax, limites).sum() == pytest.approx(deltaE, abs=1e-6)
+
+
+def test_calculer_import_max_theorique():
+    network = creer_reseau_test()
+    import_max = EnergyUtils.calculer_import_max_theorique(network)
+
+    fatales = network.generators.index[network.generators.carrier.isin(['hydro_fil', 'eolien', 'solaire'])]
+    fatales = fatales[fatales.isin(network.generators_t.p_max_pu.columns)]
+    attendu = network.loads_t.p_set.sum(axis=1) - (
+        network.generators_t.p_max_pu[fatales] * network.generators.loc[fatales, 'p_nom']
+    ).sum(axis=1)
+    np.testing.assert_allclose(import_max, attendu.to_numpy())
+
+
+def test_calcul_cout_reservoir_vectorise():
+    niveaux = np.array([[-0.1, 0.0, 0.1], [0.25, 0.6, 1.2]])
+    couts = EnergyUtils.calcul_cout_reservoir(niveaux)
+
+    np.testing.assert_array_equal(couts, [[226.67, 226.67, 104.6], [8.75, 7.0, 5.0]])
+    assert EnergyUtils.calcul_cout_reservoir(0.6) == 7.0
+
+
+def test_generer_faux_niveaux_reservoirs():
+    snapshots = creer_reseau_test().snapshots
+    niveaux = EnergyUtils.generer_faux_niveaux_reservoirs(snapshots, ["a", "b"], seed=0)
+
+    assert niveaux.shape == (len(snapshots), 2)
+    assert list(niveaux.columns) == ["a", "b"]
+    assert ((niveaux >= 0.1) & (niveaux <= 1.0)).all().all()
+    assert niveaux.equals(EnergyUtils.generer_faux_niveaux_reservoirs(snapshots, ["a", "b"], seed=0))
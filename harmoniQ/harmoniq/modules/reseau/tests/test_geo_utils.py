@@ -0,0 +1,48 @@
+"""
+Test de la recherche du bus le plus proche.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from harmoniq.modules.reseau.utils.geo_utils import GeoUtils, BusSpatialIndex
+
+
+def creer_bus(n=200, seed=0):
+    """Bus aléatoires sur le territoire du Québec."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'x': rng.uniform(-79, -57, n),
+        'y': rng.uniform(45, 62, n),
+    }, index=pd.Index([f"bus_{i}" for i in range(n)], name='name'))
+
+
+def test_index_identique_recherche_exhaustive():
+    buses = creer_bus()
+    rng = np.random.default_rng(1)
+    latitudes = rng.uniform(45, 62, 50)
+    longitudes = rng.uniform(-79, -57, 50)
+
+    noms, distances = BusSpatialIndex.from_network(buses).query(latitudes, longitudes)
+
+    # Recherche exhaustive avec la distance Haversine
+    geo = GeoUtils()
+    for lat, lon, nom, distance in zip(latitudes, longitudes, noms, distances):
+        attendues = [geo.calculate_distance((lat, lon), (bus.y, bus.x)) for bus in buses.itertuples()]
+        assert nom == buses.index[int(np.argmin(attendues))]
+        assert distance == pytest.approx(min(attendues))
+
+
+def test_index_k_voisins_et_cache():
+    buses = creer_bus()
+    index = BusSpatialIndex.for_buses(buses)
+    assert BusSpatialIndex.for_buses(buses.copy()) is index
+
+    noms, distances = index.query([46.8, np.nan], [-71.2, -73.5], k=3)
+    assert noms.shape == (2, 3)
+    assert (np.diff(distances[0]) >= 0).all()
+    assert list(noms[1]) == [None] * 3 and np.isinf(distances[1]).all()
+
+    nom, distance = GeoUtils().find_nearest_bus((46.8, -71.2), buses)
+    assert nom == noms[0, 0] and distance == pytest.approx(distances[0, 0])
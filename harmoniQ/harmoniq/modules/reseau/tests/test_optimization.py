@@ -0,0 +1,266 @@
+"""
+Test de la répartition de la production du réseau électrique.
+"""
+
+import asyncio
+import logging
+
+import numpy as np
+import pandas as pd
+import pypsa
+import pytest
+
+from harmoniq.modules.reseau import InfraReseau
+from harmoniq.modules.reseau.core import NetworkOptimizer
+from harmoniq.modules.reseau.core.dispatch import (MeritOrderIndex, build_dispatch_matrices, capacity_multipliers,
+                                                   merit_order_dispatch, summarize_dispatch, sweep_dispatch)
+from harmoniq.modules.reseau.core.rolling_horizon import decouper_fenetres
+
+
+CARRIERS = ["eolien", "solaire", "hydro_fil", "nucléaire", "hydro_reservoir", "thermique", "import"]
+
+
+def creer_reseau_test(seed=0, n_snapshots=72, n_generators=30, freq="h"):
+    """Réseau synthétique avec des coûts variables et des déficits ponctuels."""
+    rng = np.random.default_rng(seed)
+    network = pypsa.Network()
+    snapshots = pd.date_range("2035-01-01", periods=n_snapshots, freq=freq)
+    network.set_snapshots(snapshots)
+
+    buses = [f"bus_{i}" for i in range(6)]
+    network.add("Bus", buses, type=["prod"] * 3 + ["conso"] * 3)
+    loads = [f"load_{bus}" for bus in buses[3:]]
+    network.add("Load", loads, bus=buses[3:])
+
+    generators = [f"gen_{i}" for i in range(n_generators)]
+    carriers = rng.choice(CARRIERS, n_generators)
+    network.add(
+        "Generator",
+        generators,
+        bus=rng.choice(buses, n_generators),
+        carrier=carriers,
+        p_nom=rng.uniform(10, 300, n_generators),
+        marginal_cost=rng.choice([0.1, 7.0, 30.0, np.nan], n_generators),
+    )
+
+    network.loads_t.p_set = pd.DataFrame(
+        rng.uniform(300, 1500, (n_snapshots, len(loads))), index=snapshots, columns=loads
+    )
+    with_profile = rng.choice(generators, 2 * n_generators // 3, replace=False)
+    network.generators_t.p_max_pu = pd.DataFrame(
+        rng.uniform(0, 1, (n_snapshots, len(with_profile))), index=snapshots, columns=with_profile
+    )
+    reservoirs = [g for g, c in zip(generators, carriers) if c == "hydro_reservoir"]
+    network.generators_t.marginal_cost = pd.DataFrame(
+        np.round(rng.uniform(5, 10, (n_snapshots, len(reservoirs)))),
+        index=snapshots,
+        columns=reservoirs,
+    )
+    return network
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("freq", ["h", "D"])
+def test_optimize_vectorized_identique_manuel(seed, freq):
+    manuel = NetworkOptimizer(creer_reseau_test(seed, freq=freq)).optimize()
+    vectorise = NetworkOptimizer(creer_reseau_test(seed, freq=freq)).optimize(method="vectorized")
+
+    assert list(manuel.generators.index) == list(vectorise.generators.index)
+    p_manuel = manuel.generators_t["p"]
+    p_vectorise = vectorise.generators_t["p"]
+    assert list(p_manuel.columns) == list(p_vectorise.columns)
+    np.testing.assert_array_equal(p_manuel.to_numpy(), p_vectorise.to_numpy())
+
+
+def test_optimize_vectorized_par_blocs():
+    sequentiel = NetworkOptimizer(creer_reseau_test(3, n_snapshots=100)).optimize(method="vectorized")
+    par_blocs = NetworkOptimizer(creer_reseau_test(3, n_snapshots=100), workers=3).optimize(method="vectorized")
+
+    assert list(sequentiel.generators_t["p"].columns) == list(par_blocs.generators_t["p"].columns)
+    np.testing.assert_array_equal(
+        sequentiel.generators_t["p"].to_numpy(), par_blocs.generators_t["p"].to_numpy()
+    )
+
+
+def test_generateur_urgence_unique():
+    network = creer_reseau_test(0)
+    network.loads_t.p_set = network.loads_t.p_set * 3
+    network = NetworkOptimizer(network).optimize(method="vectorized")
+
+    emergency = [g for g in network.generators.index if g.startswith("emergency_")]
+    assert emergency == ["emergency_bus_0"]
+    production = network.generators_t["p"]
+    np.testing.assert_allclose(production.sum(axis=1), network.loads_t.p_set.sum(axis=1), atol=1.0)
+    assert (production["emergency_bus_0"] <= network.generators.at["emergency_bus_0", "p_nom"]).all()
+
+
+def test_generateur_urgence_production_existante():
+    network = creer_reseau_test(0)
+    network.loads_t.p_set = network.loads_t.p_set * 3
+    optimizer = NetworkOptimizer(network)
+    network = optimizer.optimize(method="vectorized")
+
+    avant = network.generators_t["p"]["emergency_bus_0"].to_numpy().copy()
+    assert avant.max() > 0
+    deficit = np.full(len(network.snapshots), 2 * avant.max())
+    energie = optimizer._ajouter_generateur_urgence(deficit, logging.getLogger("test"))
+
+    apres = network.generators_t["p"]["emergency_bus_0"].to_numpy()
+    assert energie == pytest.approx(deficit.sum())
+    np.testing.assert_allclose(apres, avant + deficit)
+    capacite = network.generators.at["emergency_bus_0", "p_nom"] * network.generators_t.p_max_pu["emergency_bus_0"]
+    assert (apres <= capacite.to_numpy() + 1e-6).all()
+
+
+def test_optimize_batch_identique_par_scenario():
+    def scenarios():
+        froid = creer_reseau_test(0)
+        froid.loads_t.p_set = froid.loads_t.p_set * 1.5
+        sans_centrales = creer_reseau_test(0)
+        sans_centrales.remove("Generator", ["gen_3", "gen_7"])
+        return {"typique": creer_reseau_test(0), "froid": froid, "sans_centrales": sans_centrales}
+
+    attendus = {nom: NetworkOptimizer(network).optimize_vectorized() for nom, network in scenarios().items()}
+    resultats = NetworkOptimizer.optimize_batch(scenarios())
+
+    for nom, attendu in attendus.items():
+        pd.testing.assert_frame_equal(resultats[nom].generators_t["p"], attendu.generators_t["p"])
+
+
+def test_balayage_capacites():
+    network = creer_reseau_test(0)
+    infra = InfraReseau(None)
+    infra.scenario = object()
+    infra.network = network
+    resultats = asyncio.run(infra.balayer_capacites({"eolien": [1.0, 2.0], "thermique": [1.0, 0.0]}))
+    assert len(resultats) == 4
+    assert set(resultats.columns) >= {"facteur_eolien", "facteur_thermique", "energie_importee",
+                                      "energie_urgence", "cout_total"}
+
+    # Le point de référence correspond à la répartition du réseau
+    matrices = build_dispatch_matrices(network)
+    attendu = summarize_dispatch(matrices, merit_order_dispatch(matrices))
+    reference = resultats[(resultats.facteur_eolien == 1.0) & (resultats.facteur_thermique == 1.0)].iloc[0]
+    for cle, valeur in attendu.items():
+        assert reference[cle] == pytest.approx(valeur)
+    sans_thermique = resultats[resultats.facteur_thermique == 0.0]
+    assert (sans_thermique.energie_thermique == 0.0).all()
+
+    # Même bilan avec un pool de processus
+    multipliers = np.array([capacity_multipliers(p, matrices.generators, matrices.carriers)
+                            for p in [{"eolien": 2.0}, {"gen_0": 0.0, "hydro_reservoir": 0.9}]])
+    assert sweep_dispatch(matrices, multipliers, workers=2) == sweep_dispatch(matrices, multipliers)
+
+
+def test_optimize_methode_inconnue():
+    optimizer = NetworkOptimizer(creer_reseau_test())
+    with pytest.raises(ValueError):
+        optimizer.optimize(method="inconnue")
+
+
+def test_merit_order_index():
+    network = creer_reseau_test()
+    index = MeritOrderIndex.from_network(network)
+    marginal_cost = network.generators_t.marginal_cost
+
+    # Coûts variables des réservoirs: tri propre à chaque pas de temps
+    assert not index.is_time_invariant("hydro_reservoir")
+    for position, snapshot in enumerate(network.snapshots[:5]):
+        attendu = sorted(marginal_cost.columns, key=lambda g: marginal_cost.at[snapshot, g])
+        assert index.sorted_generators("hydro_reservoir", position) == attendu
+
+    # Coûts statiques: un seul ordre partagé par tous les pas de temps
+    assert index.is_time_invariant("thermique")
+    order = index.order("thermique")
+    assert order.shape[0] == len(network.snapshots)
+    assert (order == order[0]).all()
+
+
+def test_merit_order_index_suit_les_couts():
+    network = creer_reseau_test()
+    optimizer = NetworkOptimizer(network)
+    premier = optimizer.merit_order_index
+    assert optimizer.merit_order_index is premier
+
+    # Nouveaux coûts des réservoirs sur le même optimiseur : l'ordre est recalculé
+    reservoirs = network.generators_t.marginal_cost.columns
+    network.generators_t.marginal_cost = network.generators_t.marginal_cost[reservoirs[::-1]].set_axis(reservoirs, axis=1)
+    second = optimizer.merit_order_index
+    assert second is not premier
+    attendu = sorted(reservoirs, key=lambda g: network.generators_t.marginal_cost.iloc[0][g])
+    assert second.sorted_generators("hydro_reservoir", 0) == attendu
+
+    # Coût statique modifié
+    thermiques = network.generators.index[network.generators.carrier == "thermique"]
+    network.generators.loc[thermiques[0], "marginal_cost"] += 1000.0
+    assert optimizer.merit_order_index is not second
+
+
+def creer_reseau_lp(n_snapshots=24 * 10, storage=False):
+    """Petit réseau connecté pour l'optimisation linéaire."""
+    rng = np.random.default_rng(0)
+    network = pypsa.Network()
+    snapshots = pd.date_range("2035-01-01", periods=n_snapshots, freq="h")
+    network.set_snapshots(snapshots)
+    network.add("Bus", ["prod", "conso"], type=["prod", "conso"])
+    network.add("Line", "ligne", bus0="prod", bus1="conso", x=0.1, r=0.01, s_nom=800)
+    network.add("Load", "load_conso", bus="conso",
+                p_set=pd.Series(rng.uniform(300, 1000, n_snapshots), index=snapshots))
+    network.add("Generator", ["eolien", "reservoir", "thermique"], bus=["prod", "prod", "conso"],
+                carrier=["eolien", "hydro_reservoir", "thermique"],
+                p_nom=[600, 500, 1000], marginal_cost=[0.0, 8.0, 50.0])
+    network.generators_t.p_max_pu["eolien"] = rng.uniform(0, 1, n_snapshots)
+    if storage:
+        network.add("StorageUnit", "batterie", bus="conso", p_nom=100, max_hours=4)
+    return network
+
+
+def test_decouper_fenetres():
+    snapshots = pd.date_range("2035-01-01", periods=24 * 20, freq="h")
+    fenetres = decouper_fenetres(snapshots)
+    committed = pd.DatetimeIndex(np.concatenate([f.committed for f in fenetres]))
+    assert committed.equals(snapshots)
+    assert all(len(f.snapshots) <= 24 * 7 for f in fenetres)
+
+    with pytest.raises(ValueError):
+        decouper_fenetres(snapshots, horizon=pd.Timedelta(days=1), overlap=pd.Timedelta(days=1))
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_optimize_lp_identique_optimisation_globale(workers):
+    # Sans stockage, chaque pas de temps est indépendant : l'horizon glissant
+    # doit retrouver l'optimum global
+    reference = creer_reseau_lp()
+    reference.optimize(solver_name="highs")
+
+    network = NetworkOptimizer(creer_reseau_lp()).optimize_lp(workers=workers)
+    assert network.termination_condition == "optimal"
+    np.testing.assert_allclose(
+        network.generators_t["p"].to_numpy(),
+        reference.generators_t.p[network.generators.index].to_numpy(),
+        atol=1e-6
+    )
+
+
+def test_optimize_lp_stockage():
+    network = NetworkOptimizer(creer_reseau_lp(storage=True)).optimize(method="lp")
+    state_of_charge = network.storage_units_t["state_of_charge"]["batterie"]
+    assert state_of_charge.index.equals(network.snapshots)
+    assert (state_of_charge >= -1e-6).all() and (state_of_charge <= 400 + 1e-6).all()
+
+
+def test_diagnose_feasibility():
+    network = creer_reseau_lp(n_snapshots=48)
+    assert NetworkOptimizer(network).check_optimization_feasibility() == (True, "Optimisation faisable")
+
+    # Bus isolé avec une charge et sans générateur
+    network.add("Bus", "isole", type="conso")
+    network.add("Load", "load_isole", bus="isole", p_set=pd.Series(50.0, index=network.snapshots))
+    report = NetworkOptimizer(network).diagnose_feasibility(n_worst=3)
+
+    assert not report.is_feasible
+    assert report.n_islands == 2
+    assert any("sans générateurs" in message for message in report.messages)
+    assert len(report.worst_snapshots) == 3
+    assert report.worst_buses.index[0] == "isole"
+    assert report.worst_buses.at["isole", "deficit"] == 50.0
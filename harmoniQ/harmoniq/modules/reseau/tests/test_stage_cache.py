@@ -0,0 +1,269 @@
+"""
+Test du cache des étapes du pipeline du réseau électrique.
+"""
+
+import asyncio
+import os
+import time
+import types
+
+import numpy as np
+import pandas as pd
+
+from harmoniq.core.shared_data import SharedDataPlane
+from harmoniq.db.schemas import NucleaireBase
+from harmoniq.modules.reseau import InfraReseau
+from harmoniq.modules.reseau.core import NetworkOptimizer
+from harmoniq.modules.reseau.tests.test_optimization import creer_reseau_test
+from harmoniq.modules.reseau.utils import NetworkDataLoader, data_loader
+from harmoniq.modules.reseau.utils.network_cache import NetworkCache, NetworkMemoryCache, network_nbytes
+from harmoniq.modules.reseau.utils.network_snapshot import NetworkSnapshot
+from harmoniq.modules.reseau.utils.stage_cache import StageCache, stage_key
+
+
+def test_stage_key_et_artefacts(tmp_path):
+    assert stage_key("profiles", {"nom": "A", "p_nom": 1.0}) == stage_key("profiles", {"p_nom": 1.0, "nom": "A"})
+    assert stage_key("profiles", {"nom": "A"}) != stage_key("profiles", {"nom": "B"})
+
+    cache = StageCache(tmp_path)
+    key = stage_key("demand", "2035")
+    assert cache.load("demand", key) is None
+    cache.save("demand", key, pd.DataFrame({"load_a": [1.0, 2.0]}))
+    assert cache.load("demand", key)["load_a"].tolist() == [1.0, 2.0]
+    assert (cache.hits["demand"], cache.misses["demand"]) == (1, 1)
+
+
+def test_stage_cache_lru(tmp_path):
+    cache = StageCache(tmp_path)
+    artefact = np.zeros(1000)
+    cache.save("profiles", "a", artefact)
+    size = (tmp_path / "profiles" / "a.pkl").stat().st_size
+
+    # Budget de deux artefacts, toutes étapes confondues
+    cache.max_bytes = int(2.5 * size)
+    cache.save("demand", "b", artefact)
+    os.utime(tmp_path / "demand" / "b.pkl", (time.time() - 60, time.time() - 60))
+    os.utime(tmp_path / "profiles" / "a.pkl", (time.time() - 30, time.time() - 30))
+    assert cache.load("profiles", "a") is not None
+    cache.save("dispatch", "c", artefact)
+    assert (tmp_path / "profiles" / "a.pkl").exists()
+    assert (tmp_path / "dispatch" / "c.pkl").exists()
+    assert not (tmp_path / "demand" / "b.pkl").exists()
+    assert cache.evictions == 1
+
+
+def test_topologie_cle_sur_les_lignes_lues(tmp_path, monkeypatch):
+    bus = {"name": "b1", "x": -71.2, "y": 46.8, "v_nom": 315.0}
+
+    def lignes(**valeurs):
+        # Chaque lecture crée de nouveaux objets, comme une session SQLAlchemy
+        return [types.SimpleNamespace(_sa_instance_state=object(), **valeurs)]
+
+    async def read_all_bus_async(db):
+        return lignes(**bus)
+
+    async def vide(db):
+        return []
+
+    monkeypatch.setattr(data_loader, "get_db", lambda: iter([None]))
+    monkeypatch.setattr(data_loader, "read_all_bus_async", read_all_bus_async)
+    monkeypatch.setattr(data_loader, "read_all_line_async", vide)
+    monkeypatch.setattr(data_loader, "read_all_line_type_async", vide)
+
+    loader = NetworkDataLoader()
+    loader.stage_cache = StageCache(tmp_path)
+    for _ in range(2):
+        topology = asyncio.run(loader._load_topology())
+    assert list(topology["buses"].index) == ["b1"]
+    assert (loader.stage_cache.hits["topology"], loader.stage_cache.misses["topology"]) == (1, 1)
+
+    # Seule une modification des bus, lignes ou types de lignes change la clé
+    bus["v_nom"] = 230.0
+    assert asyncio.run(loader._load_topology())["buses"].loc["b1", "v_nom"] == 230.0
+    assert loader.stage_cache.misses["topology"] == 2
+
+
+def test_profils_recalcules_par_centrale(tmp_path):
+    scenario = type("Scenario", (), {"date_de_debut": pd.Timestamp("2035-03-01"),
+                                     "date_de_fin": pd.Timestamp("2035-03-10")})()
+    timestamps = pd.date_range("2035-03-01", "2035-03-10", freq="h")
+
+    def centrale(i):
+        donnees = NucleaireBase(nom=f"smr_{i}", latitude=46.0, longitude=-72.0,
+                                puissance_nominal=300.0, semaine_maintenance=9)
+        return (f"smr_{i}", "nucleaire", donnees, 'production_mwh', 300.0, 0.0)
+
+    loader = NetworkDataLoader()
+    loader.stage_cache = StageCache(tmp_path)
+    loader.shared_data = SharedDataPlane(enabled=False)
+
+    async def profils(centrales):
+        async def production_plants(generator_names, db):
+            return centrales
+        loader._production_plants = production_plants
+        return await loader._production_profiles(pd.Index([]), scenario, timestamps, None)
+
+    premier = asyncio.run(profils([centrale(0), centrale(1)]))
+    assert loader.stage_cache.misses["profiles"] == 2
+
+    # Ajouter une centrale ne recalcule que son profil
+    second = asyncio.run(profils([centrale(0), centrale(1), centrale(2)]))
+    assert loader.stage_cache.hits["profiles"] == 2
+    assert loader.stage_cache.misses["profiles"] == 3
+    np.testing.assert_array_equal(premier["smr_1"], second["smr_1"])
+
+
+def test_profils_eoliens_par_fournisseur_meteo(tmp_path, monkeypatch):
+    scenario = types.SimpleNamespace(date_de_debut=pd.Timestamp("2035-03-01"),
+                                     date_de_fin=pd.Timestamp("2035-03-02"))
+    timestamps = pd.date_range("2035-03-01", "2035-03-02", freq="h")
+    donnees = NucleaireBase(nom="parc", latitude=49.0, longitude=-66.7, puissance_nominal=100.0,
+                             semaine_maintenance=9)
+    parc = ("parc", "eolienne", donnees, 'puissance', 100.0, 0.0)
+
+    loader = NetworkDataLoader()
+    loader.stage_cache = StageCache(tmp_path)
+    loader.shared_data = SharedDataPlane(enabled=False)
+
+    async def production_plants(generator_names, db):
+        return [parc]
+
+    async def load_plant_scenarios(plants, scenario):
+        return [(nom, None, column, p_nom, fill_value) for nom, _, _, column, p_nom, fill_value in plants]
+
+    async def compute_productions(productions, timestamps):
+        return [np.full(len(timestamps), 0.5) for _ in productions]
+
+    loader._production_plants = production_plants
+    loader._load_plant_scenarios = load_plant_scenarios
+    loader._compute_productions = compute_productions
+
+    monkeypatch.setenv("HARMONIQ_WEATHER_PROVIDER", "synthetic")
+    for seed in ("1", "2", "1"):
+        monkeypatch.setenv("HARMONIQ_WEATHER_SEED", seed)
+        asyncio.run(loader._production_profiles(pd.Index([]), scenario, timestamps, None))
+
+    # Un profil calculé avec une autre graine n'est pas réutilisé
+    assert (loader.stage_cache.hits["profiles"], loader.stage_cache.misses["profiles"]) == (1, 2)
+
+
+def test_repartition_en_cache(tmp_path):
+    def reseau():
+        network = creer_reseau_test(0)
+        network.loads_t.p_set = network.loads_t.p_set * 3
+        return network
+
+    infra = InfraReseau(None)
+    infra.stage_cache = StageCache(tmp_path)
+
+    infra.network = reseau()
+    key = infra._cle_repartition(False)
+    assert not infra._charger_repartition(key)
+    attendu = NetworkOptimizer(infra.network).optimize_manually()
+    infra._sauvegarder_repartition(key)
+
+    infra.network = reseau()
+    assert infra._cle_repartition(False) == key
+    assert infra._charger_repartition(key)
+    network = infra.network
+    assert network.generators.at["emergency_bus_0", "p_nom"] == attendu.generators.at["emergency_bus_0", "p_nom"]
+    np.testing.assert_array_equal(
+        network.generators_t["p"][attendu.generators_t["p"].columns].to_numpy(),
+        attendu.generators_t["p"].to_numpy()
+    )
+    np.testing.assert_array_equal(
+        network.generators_t.p_max_pu["emergency_bus_0"].to_numpy(),
+        attendu.generators_t.p_max_pu["emergency_bus_0"].to_numpy()
+    )
+
+
+def test_fake_optimiser_reservoirs_en_cache(tmp_path):
+    scenario = types.SimpleNamespace(nom="scenario", date_de_debut=pd.Timestamp("2035-01-01"),
+                                     date_de_fin=pd.Timestamp("2035-01-03 23:00"))
+
+    def executer():
+        infra = InfraReseau(None)
+        infra.stage_cache = StageCache(tmp_path)
+        infra.scenario = scenario
+        infra.network = creer_reseau_test(0)
+        infra.network.loads_t.p_set = infra.network.loads_t.p_set * 3
+        asyncio.run(infra.fake_optimiser_reservoirs(None, Pmax=500.0, is_journalier=False))
+        return infra
+
+    premier = executer()
+    assert (premier.stage_cache.hits["dispatch"], premier.stage_cache.misses["dispatch"]) == (0, 1)
+    second = executer()
+    assert (second.stage_cache.hits["dispatch"], second.stage_cache.misses["dispatch"]) == (1, 0)
+    assert len(list((tmp_path / "dispatch").glob("*.pkl"))) == 1
+    np.testing.assert_array_equal(
+        second.network.generators_t["p"][premier.network.generators_t["p"].columns].to_numpy(),
+        premier.network.generators_t["p"].to_numpy()
+    )
+
+
+def test_network_cache_lru(tmp_path):
+    cache = NetworkCache(tmp_path, max_bytes=10 ** 9)
+    network = creer_reseau_test(0, n_snapshots=24)
+    assert cache.get("a") is None
+
+    cache.put("a", network)
+    size = cache.stats()["bytes"]
+    charge = cache.get("a")
+    assert list(charge.generators.index) == list(network.generators.index)
+    assert not list(tmp_path.glob(".tmp_*"))
+
+    # Budget de deux entrées : l'entrée la moins récemment utilisée est retirée
+    cache.max_bytes = int(2.5 * size)
+    cache.put("b", network)
+    os.utime(cache.path("b") / "manifest.json", (time.time() - 60, time.time() - 60))
+    cache.get("a")
+    cache.put("c", network)
+    assert cache.path("a").exists() and cache.path("c").exists()
+    assert not cache.path("b").exists()
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["entries"]) == (2, 1, 1, 2)
+
+
+def test_network_snapshot(tmp_path):
+    network = creer_reseau_test(0, n_snapshots=48)
+    network.generators["type_centrale"] = "hydro"
+    snapshot = NetworkSnapshot.save(network, tmp_path / "reseau")
+
+    # Types des colonnes conservés
+    generateurs = snapshot.static("Generator")
+    pd.testing.assert_series_equal(generateurs["p_nom"], network.generators["p_nom"], check_names=False)
+    assert generateurs["committable"].dtype == bool
+
+    # Lecture d'une période seulement
+    debut, fin = network.snapshots[24], network.snapshots[35]
+    p_set = snapshot.series("Load", "p_set", start=debut, end=fin)
+    pd.testing.assert_frame_equal(p_set, network.loads_t.p_set.loc[debut:fin], check_names=False, check_freq=False)
+
+    charge = snapshot.to_network(start=debut, end=fin)
+    assert len(charge.snapshots) == 12
+    assert list(charge.generators.index) == list(network.generators.index)
+    np.testing.assert_array_equal(charge.loads_t.p_set.to_numpy(), p_set.to_numpy())
+
+
+def test_network_memory_cache():
+    network = creer_reseau_test(0, n_snapshots=24)
+    p_nom = network.generators["p_nom"].copy()
+    cache = NetworkMemoryCache(max_bytes=int(2.5 * network_nbytes(network)))
+    assert cache.get("a") is None
+
+    # Les modifications d'une vue ne touchent pas le réseau en cache
+    vue = cache.put("a", network)
+    vue.generators.loc[vue.generators.index[0], "p_nom"] = -1.0
+    vue.loads_t.p_set.iloc[0, 0] = -1.0
+    vue.generators_t["marginal_cost"] = vue.generators_t["marginal_cost"] + 1.0
+    seconde = cache.get("a")
+    pd.testing.assert_series_equal(seconde.generators["p_nom"], p_nom)
+    assert seconde.loads_t.p_set.iloc[0, 0] != -1.0
+
+    cache.put("b", creer_reseau_test(1, n_snapshots=24))
+    cache.get("a")
+    cache.put("c", creer_reseau_test(2, n_snapshots=24))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.stats()["evictions"] == 1
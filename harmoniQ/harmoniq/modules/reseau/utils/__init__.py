@@ -1,6 +1,6 @@
 from .data_loader import NetworkDataLoader, DataLoadError,DATA_DIR
 from .validators import NetworkValidator
-from .geo_utils import GeoUtils
+from .geo_utils import GeoUtils, BusSpatialIndex
 from .time_utils import TimeSeriesManager
 from .lines_filter import LineFilter
 from .visualization_utils import NetworkVisualizer
@@ -11,6 +11,7 @@ __all__ = [
     'DataLoadError',
     'NetworkValidator',
     'GeoUtils',
+    'BusSpatialIndex',
     'TimeSeriesManager',
     'LineFilter',
     'NetworkVisualizer',
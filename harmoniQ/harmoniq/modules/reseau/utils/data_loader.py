@@ -9,15 +9,19 @@ et les séries temporelles de production/consommation.
 import pypsa
 import pandas as pd
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
 from .geo_utils import GeoUtils
+from .stage_cache import StageCache, stage_key, frame_fingerprint, record_fingerprint, file_fingerprint
 import asyncio
 import numpy as np
-import os
-import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from harmoniq.modules.eolienne import InfraParcEolienne
 from harmoniq.modules.solaire import InfraSolaire
 from harmoniq.modules.nucleaire import InfraNucleaire
+from harmoniq import DEMANDE_PATH
+from harmoniq.core.meteo_providers import provider_identity
+from harmoniq.core.shared_data import shared_data
 from harmoniq.db.engine import get_db
 from harmoniq.db.demande import read_demande_data
 from harmoniq.db.schemas import EolienneParc, Solaire, Hydro, Nucleaire, Thermique, Scenario, BusType
@@ -31,18 +35,53 @@ DATA_DIR = CURRENT_DIR / ".." / "data"
 
 MODULES_DIR = Path(__file__).parent.parent.parent.parent
 RESEAU_DIR = MODULES_DIR / "modules" / "reseau"
-DEMAND_CACHE_DIR = RESEAU_DIR / "n_cache"/ "demand_cache"
-os.makedirs(DEMAND_CACHE_DIR, exist_ok=True)
 
 import logging
 logger = logging.getLogger("DataLoader")
 
 
+# Types de centrales chargés dans le réseau
+NON_PILOTABLE_SOURCES = ("eolienne", "solaire", "hydro_fil", "nucleaire")
+PILOTABLE_SOURCES = ("hydro_reservoir", "thermique")
+
+# Nombre maximal de chargements météo simultanés des parcs éoliens
+MAX_CONCURRENT_WEATHER = 8
+
+# Graine par défaut de la distribution de la demande entre les charges
+DEMAND_SEED = 42
+
+
 class DataLoadError(Exception):
     """Exception levée lors d'erreurs de chargement des données."""
     pass
 
 
+def _compute_p_max_pu(infra, column: str, p_nom: float, fill_value: float,
+                      timestamps: pd.DatetimeIndex) -> Optional[np.ndarray]:
+    """
+    Calcule le profil p_max_pu d'une centrale.
+    
+    Fonction de niveau module pour pouvoir être exécutée dans un pool de processus.
+    
+    Args:
+        infra: Infrastructure avec un scénario chargé
+        column: Colonne de production à utiliser
+        p_nom: Puissance nominale dans l'unité de la colonne de production
+        fill_value: Valeur des pas de temps sans production calculée
+        timestamps: Pas de temps du scénario
+        
+    Returns:
+        Optional[np.ndarray]: Profil aligné sur les pas de temps, ou None
+    """
+    production_df = infra.calculer_production()
+    if production_df is None or production_df.empty or column not in production_df.columns:
+        return None
+    
+    index = production_df.index if 'datetime' not in production_df.columns else pd.to_datetime(production_df['datetime'])
+    production = pd.Series(production_df[column].to_numpy(), index=index)
+    return (production.reindex(timestamps) / p_nom).fillna(fill_value).to_numpy(dtype='float64')
+
+
 class NetworkDataLoader:
     """
     Gestionnaire de chargement des données du réseau.
@@ -52,6 +91,12 @@ class NetworkDataLoader:
     Attributes:
         data_dir: Chemin vers le répertoire des données
         eolienne_ids, solaire_ids, hydro_ids, etc: IDs des infrastructures à inclure
+        production_workers: Nombre de processus pour le calcul de la production des centrales
+        max_concurrent_weather: Nombre maximal de chargements météo simultanés
+        stage_cache: Cache des étapes (topologie, placement, profils, demande)
+        shared_data: Mémoire partagée entre processus (profils, demande)
+        demand_seed: Graine de la distribution de la demande entre les charges
+            (None pour un tirage non reproductible)
     """
 
     def __init__(self, data_dir: str = None):
@@ -74,6 +119,11 @@ class NetworkDataLoader:
         self.hydro_ids = None
         self.thermique_ids = None
         self.nucleaire_ids = None
+        self.demand_seed = DEMAND_SEED
+        self.production_workers = 1
+        self.max_concurrent_weather = MAX_CONCURRENT_WEATHER
+        self.stage_cache = StageCache()
+        self.shared_data = shared_data
 
     def set_infrastructure_ids(self, liste_infra):
         """
@@ -108,69 +158,70 @@ class NetworkDataLoader:
             DataLoadError: Si les données sont inaccessibles ou mal formatées
         """
         network = pypsa.Network()
-        db = next(get_db())
+        topology = await self._load_topology()
         
         # Chargement des bus
-        buses =  await read_all_bus_async(db)
-        buses_df = pd.DataFrame([bus.__dict__ for bus in buses])
+        buses_df = topology['buses']
+        self._add_components(network, "Bus", buses_df)
+        
+        # Création des charges pour les bus de type "conso"
         if not buses_df.empty:
-            buses_df = buses_df.drop(columns=['_sa_instance_state'], errors='ignore')
-            buses_df = buses_df.set_index('name')
-            
-            for idx, row in buses_df.iterrows():
-                network.add("Bus", name=idx, **row.to_dict())
-                # Création des charges pour les bus de type "conso"
-                if row.get('type') == 'conso':
-                    network.add("Load", 
-                              name=f"load_{idx}",
-                              bus=idx,
-                              p_set=0,  
-                              q_set=0
-                    )
-        
-        # Chargement des types de lignes
-        line_types = await read_all_line_type_async(db)
-        line_types_df = pd.DataFrame([lt.__dict__ for lt in line_types])
-        if not line_types_df.empty:
-            line_types_df = line_types_df.drop(columns=['_sa_instance_state'], errors='ignore')
-            line_types_df = line_types_df.set_index('name')
-            
-            for idx, row in line_types_df.iterrows():
-                network.add("LineType", name=idx, **row.to_dict())
-        
-        # Chargement des lignes
-        lines = await read_all_line_async(db)
-        lines_df = pd.DataFrame([line.__dict__ for line in lines])
-        if not lines_df.empty:
-            lines_df = lines_df.drop(columns=['_sa_instance_state'], errors='ignore')
-            lines_df = lines_df.set_index('name')
-            
-            for idx, row in lines_df.iterrows():
-                network.add("Line", name=idx, **row.to_dict())
-
-        # Chargement des carriers
-        carriers_df = pd.read_csv(self.data_dir / "topology" / "centrales" / "carriers.csv")
-        carriers_df = carriers_df.set_index('name')
-        for idx, row in carriers_df.iterrows():
-            network.add("Carrier", name=idx, **row.to_dict())
-
-        # Chargement des générateurs par type
-        network = await self.fill_non_pilotable(network, "eolienne")
-        network = await self.fill_non_pilotable(network, "solaire")
-        network = await self.fill_non_pilotable(network, "hydro_fil")
-        network = await self.fill_non_pilotable(network, "nucleaire")
-        network = await self.fill_pilotable(network, "hydro_reservoir")
-        network = await self.fill_pilotable(network, "thermique")
+            conso_buses = buses_df.index[buses_df['type'] == 'conso']
+            if len(conso_buses) > 0:
+                network.add("Load", "load_" + conso_buses, bus=conso_buses, p_set=0, q_set=0)
+        
+        # Chargement des types de lignes, des lignes et des carriers
+        self._add_components(network, "LineType", topology['line_types'])
+        self._add_components(network, "Line", topology['lines'])
+        self._add_components(network, "Carrier", topology['carriers'])
+
+        # Chargement des générateurs de tous les types en parallèle
+        network = await self.fill_generators(network)
         
         # Chargement des contraintes globales
-        global_constraints_df = pd.read_csv(
-            self.data_dir / "topology" / "constraints" / "global_constraints.csv"
-        ).set_index('name')
-        for idx, row in global_constraints_df.iterrows():
-            network.add("GlobalConstraint", name=idx, **row.to_dict())
+        self._add_components(network, "GlobalConstraint", topology['global_constraints'])
             
         return network
 
+    async def _load_topology(self) -> Dict[str, pd.DataFrame]:
+        """
+        Charge la topologie statique du réseau, avec mise en cache.
+        
+        La clé ne dépend que des bus, lignes et types de lignes lus dans la base
+        de données et des fichiers CSV de topologie : une écriture dans une autre
+        table (centrale, scénario...) ne change pas la topologie.
+        
+        Returns:
+            Dict[str, pd.DataFrame]: Bus, types de lignes, lignes, carriers et
+                contraintes globales, indexés par nom
+        """
+        carriers_path = self.data_dir / "topology" / "centrales" / "carriers.csv"
+        constraints_path = self.data_dir / "topology" / "constraints" / "global_constraints.csv"
+        db = next(get_db())
+        tables = {
+            'buses': self._records_to_frame(await read_all_bus_async(db)),
+            'line_types': self._records_to_frame(await read_all_line_type_async(db)),
+            'lines': self._records_to_frame(await read_all_line_async(db)),
+        }
+        key = stage_key(
+            "topology",
+            {name: frame_fingerprint(df) for name, df in tables.items()},
+            file_fingerprint(carriers_path, content=True),
+            file_fingerprint(constraints_path, content=True),
+        )
+        topology = self.stage_cache.load("topology", key)
+        if topology is not None:
+            logger.info("Topologie chargée depuis le cache")
+            return topology
+        
+        topology = {
+            **tables,
+            'carriers': pd.read_csv(carriers_path).set_index('name'),
+            'global_constraints': pd.read_csv(constraints_path).set_index('name'),
+        }
+        self.stage_cache.save("topology", key, topology)
+        return topology
+
     async def load_timeseries_data(self, 
                            network: pypsa.Network,
                            scenario,
@@ -253,19 +304,51 @@ class NetworkDataLoader:
         
         return network
 
-    async def fill_non_pilotable(self, network: pypsa.Network, source_type: str) -> pypsa.Network:
+    @staticmethod
+    def _records_to_frame(records) -> pd.DataFrame:
         """
-        Remplit les données pour les générateurs non pilotables.
+        Convertit des objets de la base de données en DataFrame indexé par nom.
+        
+        Args:
+            records: Objets SQLAlchemy lus dans la base de données
+            
+        Returns:
+            pd.DataFrame: Attributs des objets, indexés par la colonne 'name'
+        """
+        df = pd.DataFrame([record.__dict__ for record in records])
+        if df.empty:
+            return df
+        return df.drop(columns=['_sa_instance_state'], errors='ignore').set_index('name')
+
+    @staticmethod
+    def _add_components(network: pypsa.Network, class_name: str, df: pd.DataFrame):
+        """
+        Ajoute tous les composants d'un DataFrame au réseau en un seul appel.
         
         Args:
             network: Le réseau PyPSA à compléter
-            source_type: Type de source ('eolienne', 'solaire', 'hydro_fil', 'nucleaire')
+            class_name: Type de composant PyPSA ('Bus', 'Line', 'Generator', etc.)
+            df: Attributs des composants, indexés par nom
+        """
+        if df.empty:
+            return
+        network.add(class_name, df.index, **{col: df[col] for col in df.columns})
+
+    async def _read_centrales(self, source_type: str) -> pd.DataFrame:
+        """
+        Lit les centrales d'un type depuis la base de données.
+        
+        Args:
+            source_type: Type de source ('eolienne', 'solaire', 'hydro_fil', 'nucleaire',
+                'hydro_reservoir' ou 'thermique')
             
         Returns:
-            pypsa.Network: Réseau avec les générateurs ajoutés
+            pd.DataFrame: Centrales avec les colonnes name, p_nom (MW) et carrier
+            
+        Raises:
+            DataLoadError: Si le type de centrale n'est pas pris en charge
         """
         db = next(get_db())
-        geo_utils = GeoUtils()
         
         # Sélection des données selon le type de source
         if source_type == "eolienne":
@@ -292,17 +375,18 @@ class NetworkDataLoader:
                 df['p_nom'] = df['puissance_nominal'] # Déjà en MW
                 df['carrier'] = 'solaire'
 
-        elif source_type == "hydro_fil":
+        elif source_type in ("hydro_fil", "hydro_reservoir"):
             if self.hydro_ids:
                 centrales = await read_multiple_by_id(db, Hydro, self.hydro_ids)
             else:
                 centrales = await read_all_data(db, Hydro)
             df = pd.DataFrame([c.__dict__ for c in centrales])
             if not df.empty:
-                df = df[df['type_barrage'] == "Fil de l'eau"]
+                type_barrage = "Fil de l'eau" if source_type == "hydro_fil" else "Reservoir"
+                df = df[df['type_barrage'] == type_barrage].copy()
                 df['name'] = df['nom']
                 df['p_nom'] = df['puissance_nominal']
-                df['carrier'] = 'hydro_fil'
+                df['carrier'] = source_type
 
         elif source_type == "nucleaire":
             if self.nucleaire_ids:
@@ -314,49 +398,157 @@ class NetworkDataLoader:
                 df['name'] = df['centrale_nucleaire_nom']
                 df['p_nom'] = df['puissance_nominal'] * 1e-3  # MW
                 df['carrier'] = 'nucléaire'
+
+        elif source_type == "thermique":
+            if self.thermique_ids:
+                centrales = await read_multiple_by_id(db, Thermique, self.thermique_ids)
+            else:
+                centrales = await read_all_data(db, Thermique)
+            df = pd.DataFrame([c.__dict__ for c in centrales])
+            if not df.empty:
+                df['name'] = df['nom']
+                df['p_nom'] = df['puissance_nominal'] * 1e-3  # MW
+                df['carrier'] = 'thermique'
         else:
             raise DataLoadError(f"Type de centrale non pris en charge: {source_type}")
+
+        return df.drop(columns=['_sa_instance_state'], errors='ignore')
+
+    @staticmethod
+    def _generators_frame(df: pd.DataFrame, pilotable: bool) -> pd.DataFrame:
+        """
+        Construit les attributs PyPSA des générateurs d'un type de centrale.
+        
+        Args:
+            df: Centrales lues par `_read_centrales`
+            pilotable: Si True, la capacité est extensible jusqu'à 110%
             
-        if not df.empty:
-            df = df.drop(columns=['_sa_instance_state'], errors='ignore')
-            
-            generators_df = pd.DataFrame()
-            generators_df['name'] = df['name'] 
-            generators_df['bus'] = None  # Sera rempli par géolocalisation
+        Returns:
+            pd.DataFrame: Attributs des générateurs, indexés comme `df`
+        """
+        generators_df = pd.DataFrame(index=df.index)
+        generators_df['name'] = df['name']
+        generators_df['bus'] = None  # Sera rempli par géolocalisation
+        generators_df['p_nom'] = df['p_nom']
+        generators_df['p_nom_min'] = 0
+        generators_df['carrier'] = df['carrier']
+        if pilotable:
+            generators_df['type'] = 'pilotable'
+            generators_df['p_nom_extendable'] = True
+            generators_df['p_nom_max'] = df['p_nom'] * 1.1  # 110% de capacité
+            generators_df['p_max_pu'] = 1.0
+            generators_df['marginal_cost'] = 0.0
+        else:
             generators_df['type'] = 'non_pilotable'
-            generators_df['p_nom'] = df['p_nom']
             generators_df['p_nom_extendable'] = False
-            generators_df['p_nom_min'] = 0
-            generators_df['carrier'] = df['carrier']
+            generators_df['p_nom_max'] = np.inf
+            generators_df['p_max_pu'] = 1.0
             generators_df['marginal_cost'] = 0.1
+        return generators_df
+
+    def _attach_generators(self, network: pypsa.Network, df: pd.DataFrame,
+                           generators_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Raccorde chaque centrale au bus le plus proche.
+        
+        Args:
+            network: Le réseau PyPSA
+            df: Centrales lues par `_read_centrales` (latitude/longitude)
+            generators_df: Attributs des générateurs, indexés comme `df`
             
-            # Trouver le bus le plus proche pour chaque centrale
-            for idx, row in df.iterrows():
-                if 'latitude' in df.columns and 'longitude' in df.columns:
-                    point = (row['latitude'], row['longitude'])
-                    nearest_bus, _ = geo_utils.find_nearest_bus(point, network)
-                    generators_df.loc[idx, 'bus'] = nearest_bus
-                    
-                    # Mise à jour du type de bus si nécessaire
-                    if nearest_bus is not None and nearest_bus in network.buses.index:
-                        bus_type = network.buses.at[nearest_bus, 'type']
-                        if ((isinstance(bus_type, str) and bus_type.lower() != 'prod') or 
-                            (bus_type != BusType.prod)):
-                            network.buses.at[nearest_bus, 'type'] = BusType.prod
-            
-            # Ajouter les générateurs au réseau
-            for _, row in generators_df.iterrows():
-                network.add("Generator", 
-                           name=row['name'],
-                           bus=row['bus'],
-                           type=row['type'],
-                           p_nom=row['p_nom'],
-                           p_nom_extendable=row['p_nom_extendable'],
-                           p_nom_min=row['p_nom_min'],
-                           carrier=row['carrier'],
-                           marginal_cost=row['marginal_cost'])
+        Returns:
+            pd.DataFrame: Générateurs avec la colonne 'bus' remplie
+        """
+        if 'latitude' not in df.columns or 'longitude' not in df.columns:
+            return generators_df
+
+        # Trouver le bus le plus proche de toutes les centrales en un seul appel
+        nearest_buses, _ = GeoUtils().find_nearest_buses(df['latitude'], df['longitude'], network)
+        generators_df['bus'] = nearest_buses
+        return generators_df
+
+    @staticmethod
+    def _promote_buses(network: pypsa.Network, generators_df: pd.DataFrame):
+        """
+        Marque en production les bus auxquels des générateurs sont raccordés.
         
+        Args:
+            network: Le réseau PyPSA
+            generators_df: Générateurs avec leur bus de raccordement
+        """
+        if generators_df.empty:
+            return
+        buses = pd.Index(generators_df['bus'].dropna().unique())
+        buses = buses[buses.isin(network.buses.index)]
+        to_update = buses[network.buses.loc[buses, 'type'] != BusType.prod]
+        if len(to_update) > 0:
+            network.buses.loc[to_update, 'type'] = BusType.prod
+
+    async def _build_generators(self, network: pypsa.Network, source_types) -> pypsa.Network:
+        """
+        Lit les centrales de plusieurs types en parallèle et les ajoute au réseau.
+        
+        Args:
+            network: Le réseau PyPSA à compléter
+            source_types: Types de centrales à charger
+            
+        Returns:
+            pypsa.Network: Réseau avec les générateurs ajoutés
+        """
+        centrales = await asyncio.gather(*(self._read_centrales(t) for t in source_types))
+        # Le placement ne dépend que des centrales sélectionnées et des coordonnées des bus
+        key = stage_key(
+            "placement",
+            {t: frame_fingerprint(df) for t, df in zip(source_types, centrales)},
+            frame_fingerprint(network.buses[['x', 'y']]),
+        )
+        generators_df = self.stage_cache.load("placement", key)
+        
+        if generators_df is None:
+            frames = []
+            for source_type, df in zip(source_types, centrales):
+                if df.empty:
+                    continue
+                generators_df = self._generators_frame(df, pilotable=source_type in PILOTABLE_SOURCES)
+                frames.append(self._attach_generators(network, df, generators_df))
+
+            generators_df = pd.concat(frames, ignore_index=True).set_index('name') if frames else pd.DataFrame()
+            self.stage_cache.save("placement", key, generators_df)
+        else:
+            logger.info(f"Placement de {len(generators_df)} générateurs chargé depuis le cache")
+
+        self._promote_buses(network, generators_df)
+        self._add_components(network, "Generator", generators_df)
         return network
+
+    async def fill_generators(self, network: pypsa.Network) -> pypsa.Network:
+        """
+        Remplit les générateurs de tous les types de centrales.
+        
+        Les six types sont lus en parallèle puis ajoutés en un seul appel.
+        
+        Args:
+            network: Le réseau PyPSA à compléter
+            
+        Returns:
+            pypsa.Network: Réseau avec les générateurs ajoutés
+        """
+        return await self._build_generators(network, NON_PILOTABLE_SOURCES + PILOTABLE_SOURCES)
+
+    async def fill_non_pilotable(self, network: pypsa.Network, source_type: str) -> pypsa.Network:
+        """
+        Remplit les données pour les générateurs non pilotables.
+        
+        Args:
+            network: Le réseau PyPSA à compléter
+            source_type: Type de source ('eolienne', 'solaire', 'hydro_fil', 'nucleaire')
+            
+        Returns:
+            pypsa.Network: Réseau avec les générateurs ajoutés
+        """
+        if source_type not in NON_PILOTABLE_SOURCES:
+            raise DataLoadError(f"Type de centrale non pris en charge: {source_type}")
+        return await self._build_generators(network, (source_type,))
         
     async def fill_pilotable(self, network: pypsa.Network, source_type: str) -> pypsa.Network:
         """
@@ -369,76 +561,9 @@ class NetworkDataLoader:
         Returns:
             pypsa.Network: Réseau avec les générateurs ajoutés
         """
-        db = next(get_db())
-        geo_utils = GeoUtils()
-        
-        if source_type == "hydro_reservoir":
-            if self.hydro_ids:
-                centrales = await read_multiple_by_id(db, Hydro, self.hydro_ids)
-            else:
-                centrales = await read_all_data(db, Hydro)
-            df = pd.DataFrame([c.__dict__ for c in centrales])
-            if not df.empty:
-                df = df[df['type_barrage'] == "Reservoir"]
-                df['name'] = df['nom']
-                df['p_nom'] = df['puissance_nominal']
-                df['carrier'] = 'hydro_reservoir'
-
-        elif source_type == "thermique":
-            if self.thermique_ids:
-                centrales = await read_multiple_by_id(db, Thermique, self.thermique_ids)
-            else:
-                centrales = await read_all_data(db, Thermique)
-            df = pd.DataFrame([c.__dict__ for c in centrales])
-            if not df.empty:
-                df['name'] = df['nom']
-                df['p_nom'] = df['puissance_nominal'] * 1e-3  # MW
-                df['carrier'] = 'thermique'
-        else:
+        if source_type not in PILOTABLE_SOURCES:
             raise DataLoadError(f"Type de centrale pilotable non pris en charge: {source_type}")
-            
-        if not df.empty:
-            df = df.drop(columns=['_sa_instance_state'], errors='ignore')
-            
-            generators_df = pd.DataFrame()
-            generators_df['name'] = df['name'] 
-            generators_df['bus'] = None  # Sera rempli par géolocalisation
-            generators_df['type'] = 'pilotable'
-            generators_df['p_nom'] = df['p_nom']
-            generators_df['p_nom_extendable'] = True
-            generators_df['p_nom_min'] = 0
-            generators_df['p_nom_max'] = df['p_nom'] * 1.1  # 110% de capacité
-            generators_df['p_max_pu'] = 1.0
-            generators_df['carrier'] = df['carrier']
-            
-            # Trouver le bus le plus proche pour chaque centrale
-            for idx, row in df.iterrows():
-                if 'latitude' in df.columns and 'longitude' in df.columns:
-                    point = (row['latitude'], row['longitude'])
-                    nearest_bus, _ = geo_utils.find_nearest_bus(point, network)
-                    generators_df.loc[idx, 'bus'] = nearest_bus
-                    
-                    # Mise à jour du type de bus si nécessaire
-                    if nearest_bus is not None and nearest_bus in network.buses.index:
-                        bus_type = network.buses.at[nearest_bus, 'type']
-                        if ((isinstance(bus_type, str) and bus_type.lower() != 'prod') or 
-                            (bus_type != BusType.prod)):
-                            network.buses.at[nearest_bus, 'type'] = BusType.prod
-            
-            # Ajouter les générateurs au réseau
-            for _, row in generators_df.iterrows():
-                network.add("Generator", 
-                           name=row['name'],
-                           bus=row['bus'],
-                           type=row['type'],
-                           p_nom=row['p_nom'],
-                           p_nom_extendable=row['p_nom_extendable'],
-                           p_nom_min=row['p_nom_min'],
-                           p_nom_max=row['p_nom_max'],
-                           p_max_pu=row['p_max_pu'],
-                           carrier=row['carrier'])
-        
-        return network
+        return await self._build_generators(network, (source_type,))
         
     async def generate_timeseries(self, network: pypsa.Network, scenario) -> tuple:
         """
@@ -460,81 +585,15 @@ class NetworkDataLoader:
             freq=scenario.pas_de_temps
         )
         month_indices = pd.DatetimeIndex(timestamps).month
-        hour_indices = pd.DatetimeIndex(timestamps).hour
-        p_max_pu_df = pd.DataFrame(index=timestamps)
-        marginal_cost_df = pd.DataFrame(index=timestamps)
+        generators = network.generators
         
+        # Profils de toutes les centrales dans un seul tableau (pas de temps × générateurs)
+        p_max_pu = np.full((len(timestamps), len(generators)), np.nan)
         
-        # Génération pour les parcs solaires
-        if self.solaire_ids:
-            solaires = await read_multiple_by_id(db, Solaire, self.solaire_ids)
-            
-            for idx, parc in enumerate(solaires):
-                infraSolaire = InfraSolaire(parc)
-                infraSolaire.charger_scenario(scenario)
-                production_df = infraSolaire.calculer_production()
-                
-                if production_df is not None:
-                    nom = parc.nom
-                    if nom in network.generators.index:
-                        if 'production_horaire_wh' in production_df.columns:
-                            # Calculer p_max_pu pour chaque heure = production_horaire_wh / (puissance_nominale * 1e6)
-                            p_nom = parc.puissance_nominal * 1e6  # Conversion de MW à W
-                            
-                            p_values = production_df['production_horaire_wh'].values
-                            hourly_index = production_df.index if 'datetime' not in production_df.columns else pd.to_datetime(production_df['datetime'])
-                            hourly_production = pd.Series(p_values, index=hourly_index)
-                            
-                            aligned_production = hourly_production.reindex(network.snapshots).fillna(0)
-                            
-                            # Calculer p_max_pu = production_horaire / puissance_nominale
-                            p_max_pu_df[nom] = aligned_production / p_nom
-                            p_max_pu_df[nom] = p_max_pu_df[nom].fillna(0.1)  # Remplacer NaN par 0
-        
-        # Génération pour les centrales nucléaires
-        if self.nucleaire_ids:
-            nucleaires = await read_multiple_by_id(db, Nucleaire, self.nucleaire_ids)
-            
-            for idx, centrale in enumerate(nucleaires):
-                infraNucleaire = InfraNucleaire(centrale)
-                infraNucleaire.charger_scenario(scenario)
-                production_df = infraNucleaire.calculer_production()
-                
-                if production_df is not None:
-                    nom = centrale.centrale_nucleaire_nom
-                    if nom in network.generators.index:
-                        # Vérifier si on a des données horaires
-                        if 'production_horaire_wh' in production_df.columns:
-                            # Calculer p_max_pu pour chaque heure = production_horaire_wh / (puissance_nominale * 1e6)
-                            p_nom = centrale.puissance_nominal  # Déjà en W
-                            
-                            p_values = production_df['production_horaire_wh'].values
-                            hourly_index = production_df.index if 'datetime' not in production_df.columns else pd.to_datetime(production_df['datetime'])
-                            hourly_production = pd.Series(p_values, index=hourly_index)
-                            
-                            aligned_production = hourly_production.reindex(network.snapshots).fillna(0)
-                            
-                            # Calculer p_max_pu = production_horaire / puissance_nominale
-                            p_max_pu_df[nom] = aligned_production / p_nom
-                            p_max_pu_df[nom] = p_max_pu_df[nom].fillna(0.85)
-
-        # Génération pour les parcs éoliens
-        if self.eolienne_ids:
-            eoliennes = await read_multiple_by_id(db, EolienneParc, self.eolienne_ids)
-            
-            for parc in eoliennes:
-                infraEolienne = InfraParcEolienne(parc)
-                await infraEolienne.charger_scenario(scenario)
-                production_iteration = infraEolienne.calculer_production()
-                
-                if production_iteration is not None and not production_iteration.empty:
-                    nom = parc.nom
-                    if nom in network.generators.index:
-                        # Calcul du p_max_pu = production / puissance_nominale
-                        p_nom = (parc.puissance_nominal * parc.nombre_eoliennes)
-                        if 'puissance' in production_iteration.columns:
-                            p_max_pu_df[nom] = production_iteration['puissance'] / p_nom
-                            p_max_pu_df[nom] = p_max_pu_df[nom].fillna(0.25)
+        profiles = await self._production_profiles(generators.index, scenario, timestamps, db)
+        for nom, values in profiles.items():
+            if values is not None:
+                p_max_pu[:, generators.index.get_loc(nom)] = values
         
         marginal_cost_defaults = {
             'hydro_fil': 0.1,      # Faible coût - priorité haute
@@ -549,38 +608,34 @@ class NetworkDataLoader:
         }
         
         # Appliquer les coûts marginaux par défaut 
-        for gen_name, gen in network.generators.iterrows():
-            carrier = gen.carrier if 'carrier' in gen.index else 'unknown'
-
-            if carrier in marginal_cost_defaults:
-                default_cost = marginal_cost_defaults[carrier]
-                network.generators.at[gen_name, 'marginal_cost'] = default_cost            
-            # Pour le coût marginal temporel
-            if carrier in marginal_cost_defaults:
-                # Pour les réservoirs, on utilise un modèle complexe plus tard
-                marginal_cost_df[gen_name] = marginal_cost_defaults[carrier]
-            else:
-                marginal_cost_df[gen_name] = gen.marginal_cost if hasattr(gen, 'marginal_cost') else 10.0
-            
-            if gen_name not in p_max_pu_df.columns:
-                # Générer des séries temporelles adaptées au type d'énergie
-                    
-                if carrier == 'hydro_fil':
-                    seasonal = 0.7 + 0.3 * np.sin(np.pi * (month_indices - 3) / 6)
-                    noise = 0.1 * np.random.normal(0, 1, len(timestamps))
-                    profile = np.clip(seasonal + noise, 0.5, 1.0)
-                    p_max_pu_df[gen_name] = profile
-                    
-                elif carrier == 'hydro_reservoir':
-                    p_max_pu_df[gen_name] = 0.95 + 0.05 * np.random.random(len(timestamps))
-                    
-                elif carrier == 'thermique':
-                    p_max_pu_df[gen_name] = 0.90 + 0.05 * np.random.random(len(timestamps))
-                    
-                    
-                else:
-                    # Valeur par défaut pour les autres types
-                    p_max_pu_df[gen_name] = 1.0
+        carriers = generators.carrier if 'carrier' in generators.columns else pd.Series('unknown', index=generators.index)
+        default_costs = carriers.map(marginal_cost_defaults)
+        known = default_costs.notna()
+        network.generators.loc[known, 'marginal_cost'] = default_costs[known]
+        marginal_cost_df = pd.DataFrame(
+            np.broadcast_to(network.generators.marginal_cost.to_numpy(dtype='float64'), p_max_pu.shape).copy(),
+            index=timestamps, columns=generators.index
+        )
+        
+        # Générer des séries temporelles adaptées au type d'énergie pour les autres générateurs
+        missing = np.isnan(p_max_pu).all(axis=0)
+        carriers = carriers.to_numpy()
+        n_timestamps = len(timestamps)
+        
+        hydro_fil = np.flatnonzero(missing & (carriers == 'hydro_fil'))
+        seasonal = 0.7 + 0.3 * np.sin(np.pi * (np.asarray(month_indices) - 3) / 6)
+        noise = 0.1 * np.random.normal(0, 1, (n_timestamps, len(hydro_fil)))
+        p_max_pu[:, hydro_fil] = np.clip(seasonal[:, None] + noise, 0.5, 1.0)
+        
+        hydro_reservoir = np.flatnonzero(missing & (carriers == 'hydro_reservoir'))
+        p_max_pu[:, hydro_reservoir] = 0.95 + 0.05 * np.random.random((n_timestamps, len(hydro_reservoir)))
+        
+        thermique = np.flatnonzero(missing & (carriers == 'thermique'))
+        p_max_pu[:, thermique] = 0.90 + 0.05 * np.random.random((n_timestamps, len(thermique)))
+        
+        # Valeur par défaut pour les autres types
+        p_max_pu[np.isnan(p_max_pu)] = 1.0
+        p_max_pu_df = pd.DataFrame(p_max_pu, index=timestamps, columns=generators.index)
         
         p_max_pu_df = p_max_pu_df.astype('float64')
         marginal_cost_df = marginal_cost_df.astype('float64')
@@ -590,6 +645,215 @@ class NetworkDataLoader:
         
         return p_max_pu_df, marginal_cost_df
 
+    async def _production_plants(self, generator_names: pd.Index, db) -> list:
+        """
+        Liste les centrales dont la production est calculée par leur module.
+        
+        Les centrales des trois types sont lues en parallèle.
+        
+        Args:
+            generator_names: Générateurs du réseau
+            db: Session de base de données
+            
+        Returns:
+            list: Tuples (nom, type, données, colonne de production, puissance nominale,
+                valeur par défaut) des centrales présentes dans le réseau
+        """
+        async def read(model, ids):
+            return await read_multiple_by_id(db, model, ids) if ids else []
+        
+        solaires, nucleaires, eoliennes = await asyncio.gather(
+            read(Solaire, self.solaire_ids),
+            read(Nucleaire, self.nucleaire_ids),
+            read(EolienneParc, self.eolienne_ids),
+        )
+        
+        plants = []
+        for parc in solaires:
+            if parc.nom in generator_names:
+                # production_horaire_wh / puissance nominale (MW → W)
+                plants.append((parc.nom, "solaire", parc, 'production_horaire_wh', parc.puissance_nominal * 1e6, 0.0))
+        
+        for centrale in nucleaires:
+            if centrale.centrale_nucleaire_nom in generator_names:
+                # Puissance nominale déjà en W
+                plants.append((centrale.centrale_nucleaire_nom, "nucleaire", centrale, 'production_horaire_wh',
+                               centrale.puissance_nominal, 0.0))
+        
+        for parc in eoliennes:
+            if parc.nom in generator_names:
+                plants.append((parc.nom, "eolienne", parc, 'puissance', parc.puissance_nominal * parc.nombre_eoliennes, 0.25))
+        
+        return plants
+
+    async def _load_plant_scenarios(self, plants: list, scenario) -> list:
+        """
+        Crée les infrastructures des centrales et charge le scénario.
+        
+        La météo des parcs éoliens est chargée en parallèle avec au plus
+        `max_concurrent_weather` requêtes simultanées.
+        
+        Args:
+            plants: Centrales listées par `_production_plants`
+            scenario: Scénario de simulation
+            
+        Returns:
+            list: Tuples (nom, infrastructure, colonne de production, puissance nominale,
+                valeur par défaut) pour `_compute_productions`
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrent_weather)
+        
+        async def charger(kind, record):
+            if kind == "eolienne":
+                infra = InfraParcEolienne(record)
+                async with semaphore:
+                    await infra.charger_scenario(scenario)
+            else:
+                infra = InfraSolaire(record) if kind == "solaire" else InfraNucleaire(record)
+                infra.charger_scenario(scenario)
+            return infra
+        
+        infras = await asyncio.gather(*(charger(kind, record) for _, kind, record, _, _, _ in plants))
+        return [(nom, infra, column, p_nom, fill_value)
+                for (nom, _, _, column, p_nom, fill_value), infra in zip(plants, infras)]
+
+    async def _production_profiles(self, generator_names: pd.Index, scenario,
+                                   timestamps: pd.DatetimeIndex, db) -> Dict[str, Optional[np.ndarray]]:
+        """
+        Profils p_max_pu des centrales, avec un artefact en cache par centrale.
+        
+        La clé d'un profil ne dépend que des données de la centrale, des pas de
+        temps et, pour les parcs éoliens, du fournisseur météo : ajouter une
+        centrale ne recalcule que son propre profil.
+        
+        Args:
+            generator_names: Générateurs du réseau
+            scenario: Scénario de simulation
+            timestamps: Pas de temps du scénario
+            db: Session de base de données
+            
+        Returns:
+            Dict[str, Optional[np.ndarray]]: Profil de chaque centrale (None si aucune production)
+        """
+        plants = await self._production_plants(generator_names, db)
+        
+        profiles = {}
+        keys = {}
+        to_compute = []
+        weather = None
+        for plant in plants:
+            nom, kind, record, column, p_nom, fill_value = plant
+            if kind == "eolienne" and weather is None:
+                weather = provider_identity()
+            keys[nom] = stage_key(
+                "profiles", kind, record_fingerprint(record), column, p_nom, fill_value,
+                timestamps[0] if len(timestamps) else None, len(timestamps), timestamps.freqstr,
+                weather if kind == "eolienne" else None
+            )
+            # Profil déjà publié en mémoire partagée par un autre processus
+            shared = self.shared_data.attach_array(("profiles", keys[nom]))
+            if shared is not None:
+                profiles[nom] = shared
+                continue
+            cached = self.stage_cache.load("profiles", keys[nom])
+            if cached is not None:
+                profiles[nom] = self._publish_profile(keys[nom], cached['p_max_pu'])
+            else:
+                to_compute.append(plant)
+        
+        if plants:
+            logger.info(f"Profils de production: {len(plants) - len(to_compute)} en cache, "
+                        f"{len(to_compute)} à calculer")
+        
+        productions = await self._load_plant_scenarios(to_compute, scenario)
+        for (nom, _, _, _, _), values in zip(productions, await self._compute_productions(productions, timestamps)):
+            profiles[nom] = self._publish_profile(keys[nom], values)
+            self.stage_cache.save("profiles", keys[nom], {'p_max_pu': values})
+        
+        return profiles
+
+    def _publish_profile(self, key: str, values: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        """Publie un profil en mémoire partagée pour les autres processus."""
+        if values is None:
+            return None
+        return self.shared_data.publish_array(("profiles", key), values)
+
+    async def _compute_productions(self, productions: list, timestamps: pd.DatetimeIndex) -> list:
+        """
+        Calcule les profils p_max_pu des centrales.
+        
+        Avec `production_workers` > 1, les calculs (pvlib, modèles de turbines)
+        sont répartis dans un pool de processus.
+        
+        Args:
+            productions: Centrales préparées par `_production_plants`
+            timestamps: Pas de temps du scénario
+            
+        Returns:
+            list: Profil de chaque centrale (ou None si aucune production)
+        """
+        args = [(infra, column, p_nom, fill_value, timestamps)
+                for _, infra, column, p_nom, fill_value in productions]
+        if self.production_workers <= 1 or len(args) <= 1:
+            return [_compute_p_max_pu(*a) for a in args]
+        
+        loop = asyncio.get_running_loop()
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=self.production_workers, mp_context=context) as executor:
+            return await asyncio.gather(*(loop.run_in_executor(executor, _compute_p_max_pu, *a) for a in args))
+
+    @staticmethod
+    def distribute_demand(total_demand: pd.Series, loads, seed: Optional[int] = DEMAND_SEED) -> pd.DataFrame:
+        """
+        Distribue la demande totale entre les charges du réseau.
+        
+        Chaque charge reçoit une catégorie de taille (small, medium, large, xlarge)
+        dont dépend la loi de son poids (bêta ou gamma). Les poids de tous les pas
+        de temps et de toutes les charges sont tirés en une seule matrice, modulés
+        par des facteurs temporels, puis normalisés pour que leur somme soit égale
+        à la demande totale à chaque pas de temps.
+        
+        Args:
+            total_demand: Demande totale (MW) indexée par pas de temps
+            loads: Noms des charges
+            seed: Graine du générateur aléatoire (None pour un tirage non reproductible)
+            
+        Returns:
+            pd.DataFrame: Demande de chaque charge (pas de temps × charges), en float64
+        """
+        rng = np.random.default_rng(seed)
+        n_timestamps = len(total_demand)
+        n_loads = len(loads)
+        
+        # Assigner des catégories pour les différentes charges
+        categories = rng.choice(4, size=n_loads, p=[0.4, 0.3, 0.2, 0.1])
+        
+        # Poids de base selon la catégorie (pas de temps × charges)
+        base = np.empty((n_timestamps, n_loads))
+        samplers = [
+            lambda size: rng.beta(0.8, 4.0, size) * 0.5,          # small
+            lambda size: 0.5 + rng.beta(2.0, 2.0, size) * 1.5,    # medium
+            lambda size: 1.0 + rng.gamma(2.0, 0.9, size),         # large
+            lambda size: 3.0 + rng.gamma(3.0, 1.2, size),         # xlarge
+        ]
+        for category, sampler in enumerate(samplers):
+            columns = np.flatnonzero(categories == category)
+            base[:, columns] = sampler((n_timestamps, len(columns)))
+        
+        # Facteurs temporels communs et propres à chaque charge
+        t = np.arange(n_timestamps)[:, None]
+        i = np.arange(n_loads)[None, :]
+        time_factor = 0.7 + 0.6 * np.sin(t / 20.0)
+        time_specific = 0.6 + 0.8 * np.sin(t / 10.0 + i * 0.5)
+        noise_factor = 0.7 + 0.6 * rng.random((n_timestamps, n_loads))
+        weights = np.maximum(0.01, base * time_specific * noise_factor * time_factor)
+        
+        # Normaliser pour que la somme soit égale à la demande totale
+        total = total_demand.to_numpy(dtype='float64')[:, None]
+        distributed = weights / weights.sum(axis=1, keepdims=True) * total
+        
+        return pd.DataFrame(distributed, index=total_demand.index, columns=loads, dtype='float64')
+
     async def load_demand_data(self, network: pypsa.Network, scenario, start_date=None, end_date=None) -> pd.DataFrame:
         """
         Charge et distribue les données de demande énergétique.
@@ -626,22 +890,25 @@ class NetworkDataLoader:
         if n_loads == 0:
             return pd.DataFrame()
             
-        # Vérifier si une version en cache existe
-        cache_key = f"demand_{scenario_year}_{start_date}_{end_date}_loads{n_loads}"
-        cache_hash = hashlib.md5(cache_key.encode()).hexdigest()[:12]
-        cache_file = DEMAND_CACHE_DIR / f"demand_{scenario_year}_{cache_hash}.parquet"
-        
-        if cache_file.exists() and scenario_year in ['2035', '2050']:
-            try:
-                logger.info(f"Chargement de la demande depuis le cache: {cache_file}")
-                load_demand_df = pd.read_parquet(cache_file)
-                
-                if set(load_demand_df.columns) == set(loads):
-                    return load_demand_df
-                else:
-                    logger.warning("Cache de demande invalide: les charges ne correspondent pas")
-            except Exception as e:
-                logger.warning(f"Erreur lors du chargement du cache de demande: {e}")
+        # Vérifier si une version en cache existe (tirage reproductible seulement)
+        cache_key = stage_key(
+            "demand",
+            file_fingerprint(DEMANDE_PATH),
+            scenario_year, start_date, end_date,
+            getattr(scenario, 'weather', 1), getattr(scenario, 'consomation', 1),
+            list(loads), self.demand_seed,
+        )
+        cacheable = self.demand_seed is not None
+        if cacheable:
+            # Demande déjà publiée en mémoire partagée par un autre processus
+            load_demand_df = self.shared_data.attach_frame(("demand", cache_key))
+            if load_demand_df is not None:
+                logger.info("Demande reprise de la mémoire partagée")
+                return load_demand_df
+            load_demand_df = self.stage_cache.load("demand", cache_key)
+            if load_demand_df is not None:
+                logger.info("Demande chargée depuis le cache")
+                return self.shared_data.publish_frame(("demand", cache_key), load_demand_df)
         
         # Si pas de cache valide, calculer la demande
         db_scenario = Scenario(
@@ -711,56 +978,7 @@ class NetworkDataLoader:
         
         demand_df = demand_df.set_index('date')
         demand_df.index = pd.to_datetime(demand_df.index)
-        load_demand_df = pd.DataFrame(index=demand_df.index, columns=loads)
-        np.random.seed(42)
-        
-        # Assigner des catégories pour les différentes charges
-        load_categories = {}
-        for load in loads:
-            category = np.random.choice(['small', 'medium', 'large', 'xlarge'], 
-                                       p=[0.4, 0.3, 0.2, 0.1])
-            load_categories[load] = category
-        
-        # Distribuer la demande entre les charges
-        n_timestamps = len(demand_df)
-        
-        for t in range(n_timestamps):
-            timestamp = demand_df.index[t]
-            total_demand_val = demand_df.loc[timestamp, 'total_demand']
-            
-            # Normaliser en float
-            if isinstance(total_demand_val, (pd.Series, np.ndarray)):
-                total_demand = float(total_demand_val.iloc[0] if hasattr(total_demand_val, 'iloc') else total_demand_val[0])
-            else:
-                total_demand = float(total_demand_val)
-            
-            # Générer des poids aléatoires pour la distribution
-            random_weights = np.zeros(n_loads)
-            time_factor = 0.7 + 0.6 * np.sin(t / 20.0)
-            
-            for i, load in enumerate(loads):
-                category = load_categories[load]
-                
-                if category == 'small':
-                    base = np.random.beta(0.8, 4.0) * 0.5  
-                elif category == 'medium':
-                    base = 0.5 + np.random.beta(2.0, 2.0) * 1.5
-                elif category == 'large':
-                    base = 1.0 + np.random.gamma(2.0, 0.9)
-                else:  # 'xlarge'
-                    base = 3.0 + np.random.gamma(3.0, 1.2)
-                
-                time_specific = 0.6 + 0.8 * np.sin(t/10.0 + i*0.5)
-                noise_factor = 0.7 + 0.6 * np.random.random()
-                random_weights[i] = max(0.01, base * time_specific * noise_factor * time_factor)
-            
-            # Normaliser pour que la somme soit égale à la demande totale
-            total_weights = np.sum(random_weights)
-            normalized_weights = random_weights / total_weights * total_demand
-            
-            # Distribuer la demande selon les poids
-            for i, load in enumerate(loads):
-                load_demand_df.loc[timestamp, load] = normalized_weights[i]
+        load_demand_df = self.distribute_demand(demand_df['total_demand'], loads, seed=self.demand_seed)
         
         if len(network.snapshots) > 1:
             time_diff = network.snapshots[1] - network.snapshots[0]
@@ -768,13 +986,9 @@ class NetworkDataLoader:
                 load_demand_df._energy_not_power = True
                 logger.info("Mode journalier détecté: données marquées comme ÉNERGIE (MWh/jour)")
         
-        # Sauvegarder dans le cache pour les années futures
-        if scenario_year in ['2035', '2050']:
-            try:
-                logger.info(f"Sauvegarde de la demande dans le cache: {cache_file}")
-                load_demand_df.to_parquet(cache_file)
-            except Exception as e:
-                logger.warning(f"Erreur lors de la sauvegarde du cache de demande: {e}")
+        if cacheable:
+            self.stage_cache.save("demand", cache_key, load_demand_df)
+            load_demand_df = self.shared_data.publish_frame(("demand", cache_key), load_demand_df)
         
         return load_demand_df
 
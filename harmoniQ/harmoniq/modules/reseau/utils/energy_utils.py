@@ -100,6 +100,110 @@ class EnergyUtils:
         logger.warning(f"Bus {bus_interconnexion} non trouvé, utilisation du premier bus disponible")
         return reseau.buses.index[0]
     
+    @staticmethod
+    def calculer_import_max_theorique(network) -> np.ndarray:
+        """
+        Calcule l'import maximal théorique à chaque pas de temps.
+        
+        L'import maximal est la demande totale moins la production disponible
+        des sources fatales (fil de l'eau, éolien, solaire). Il vaut 0 pour un pas
+        de temps sans données de demande ou de disponibilité.
+        
+        Args:
+            network: Réseau PyPSA
+            
+        Returns:
+            np.ndarray: Import maximal théorique (MW) pour chaque pas de temps
+        """
+        snapshots = network.snapshots
+        p_set = network.loads_t.p_set
+        besoins = p_set.reindex(snapshots).sum(axis=1).to_numpy(dtype='float64')
+        valides = snapshots.isin(p_set.index)
+        
+        # Production des sources fatales présentes dans p_max_pu (S × G)
+        p_max_pu = network.generators_t.p_max_pu
+        sources_fatales = network.generators.index[
+            network.generators.carrier.isin(['hydro_fil', 'eolien', 'solaire'])
+        ]
+        sources_fatales = sources_fatales[sources_fatales.isin(p_max_pu.columns)]
+        production_fatale = np.zeros(len(snapshots))
+        if not p_max_pu.empty and len(sources_fatales) > 0:
+            p_nom = network.generators.loc[sources_fatales, 'p_nom'].to_numpy(dtype='float64')
+            disponibilite = p_max_pu.reindex(index=snapshots, columns=sources_fatales).to_numpy(dtype='float64')
+            production_fatale = np.nansum(disponibilite * p_nom, axis=1)
+            valides &= snapshots.isin(p_max_pu.index)
+        
+        return np.where(valides, besoins - production_fatale, 0.0)
+    
+    @staticmethod
+    def resoudre_pmax(import_max_theorique, deltaE: float) -> float:
+        """
+        Trouve Pmax tel que la somme des imports plafonnés égale deltaE.
+        
+        La somme f(P) = Σ min(P, import_max_t) est linéaire par morceaux entre les
+        limites triées : le segment contenant deltaE est trouvé par recherche
+        dichotomique sur les sommes cumulées, puis Pmax est obtenu exactement.
+        Comme pour la dichotomie, Pmax est borné par les limites minimale et maximale.
+        
+        Args:
+            import_max_theorique: Import maximal théorique à chaque pas de temps (MW)
+            deltaE: Énergie à importer sur la période (MWh)
+            
+        Returns:
+            float: Capacité d'import/export Pmax (MW)
+        """
+        limites = np.sort(np.asarray(import_max_theorique, dtype='float64'))
+        n = len(limites)
+        if n == 0:
+            return 0.0
+        
+        # f aux points de rupture : f(l_k) = Σ_{i<k} l_i + (n - k) l_k
+        cumul = np.concatenate(([0.0], np.cumsum(limites)[:-1]))
+        rangs = np.arange(n)
+        f_ruptures = cumul + (n - rangs) * limites
+        
+        k = int(np.searchsorted(f_ruptures, deltaE))
+        if k == 0:
+            return float(limites[0])
+        if k == n:
+            return float(limites[-1])
+        return float((deltaE - cumul[k]) / (n - k))
+    
+    @staticmethod
+    def pmax_par_dichotomie(import_max_theorique, deltaE: float, tolerance: float = 0.1,
+                            iterations_max: int = 100):
+        """
+        Recherche de Pmax par dichotomie (contre-vérification de resoudre_pmax).
+        
+        Args:
+            import_max_theorique: Import maximal théorique à chaque pas de temps (MW)
+            deltaE: Énergie à importer sur la période (MWh)
+            tolerance: Écart toléré sur la somme des imports (MWh)
+            iterations_max: Nombre maximal d'itérations
+            
+        Returns:
+            Tuple[float, int]: Pmax (MW) et nombre d'itérations effectuées
+        """
+        limites = np.asarray(import_max_theorique, dtype='float64')
+        Pmax_min = limites.min()
+        Pmax_max = limites.max()
+        Pmax = (Pmax_min + Pmax_max) / 2
+        
+        for iteration in range(iterations_max):
+            somme_imports = np.minimum(Pmax, limites).sum()
+            
+            if abs(somme_imports - deltaE) < tolerance:
+                break
+            
+            if somme_imports > deltaE:
+                Pmax_max = Pmax
+            else:
+                Pmax_min = Pmax
+            
+            Pmax = (Pmax_min + Pmax_max) / 2
+        
+        return float(Pmax), iteration + 1
+    
     @staticmethod
     def get_niveau_reservoir(productions: pd.DataFrame, niveaux_actuels: dict, timestamp) -> pd.DataFrame:
         """
@@ -156,38 +260,44 @@ class EnergyUtils:
         )
     
     @staticmethod
-    def calcul_cout_reservoir(niveau: float) -> float:
+    def calcul_cout_reservoir(niveau):
         """
         Calcule le coût marginal en fonction du niveau du réservoir.
         
+        Accepte un niveau scalaire ou un tableau de niveaux (p. ex. la matrice
+        pas de temps × réservoirs), calculé en une seule opération.
+        
         Args:
-            niveau: Niveau du réservoir (0-1)
+            niveau: Niveau du réservoir (0-1), scalaire ou np.ndarray
             
         Returns:
-            float: Coût marginal calculé
+            float ou np.ndarray: Coût marginal calculé, de même forme que `niveau`
         """
         cout_minimum = 5     # Coût quand le réservoir est plein
         cout_maximum = 35    # Coût quand le réservoir est presque vide (modifié de 150 à 35)
         niveau_critique = 0.25
         
-        niveau = max(0, min(1, niveau))
+        niveaux = np.clip(np.asarray(niveau, dtype='float64'), 0, 1)
         
-        if niveau < niveau_critique:
+        cout = np.where(
+            niveaux < niveau_critique,
             # Croissance exponentielle en dessous du seuil critique
-            facteur = (niveau_critique - niveau) / niveau_critique
-            cout = cout_minimum + (cout_maximum - cout_minimum) * np.exp(2 * facteur) # Exponentielle plus douce
-        else:
+            cout_minimum + (cout_maximum - cout_minimum) * np.exp(2 * (niveau_critique - niveaux) / niveau_critique),  # Exponentielle plus douce
             # Décroissance linéaire au-dessus du seuil critique
-            facteur = (1 - niveau) / (1 - niveau_critique)
-            cout = cout_minimum + (cout_maximum/4 - cout_minimum) * facteur
+            cout_minimum + (cout_maximum/4 - cout_minimum) * (1 - niveaux) / (1 - niveau_critique)
+        )
+        cout = np.round(cout, 2)
         
-        return round(cout, 2)
+        return float(cout) if cout.ndim == 0 else cout
         
     @staticmethod
     def generer_faux_niveaux_reservoirs(snapshots, barrages_reservoir, seed=None):
         """
         Génère des niveaux de réservoirs simulés.
         
+        La matrice (pas de temps × réservoirs) est générée en une seule passe :
+        niveau initial, marche aléatoire cumulée et saisonnalité commune.
+        
         Args:
             snapshots: DatetimeIndex avec les pas de temps du scénario
             barrages_reservoir: Liste des noms des barrages à simuler
@@ -196,29 +306,22 @@ class EnergyUtils:
         Returns:
             pd.DataFrame: Niveaux des réservoirs simulés (0-1)
         """
-        if seed is not None:
-            np.random.seed(seed)
+        # Générateur local : une graine ne modifie pas l'état global de numpy
+        rng = np.random.RandomState(seed) if seed is not None else np.random
         
-        niveaux_df = pd.DataFrame(index=snapshots)
+        snapshots = pd.DatetimeIndex(snapshots)
+        n_barrages = len(barrages_reservoir)
         
-        for barrage in barrages_reservoir:
-            # Niveau initial entre 0.4 et 0.8
-            niveau_initial = np.random.uniform(0.4, 0.8)
-            
-            # Variations aléatoires et saisonnalité
-            variations = np.random.normal(0, 0.01, size=len(snapshots))
-            mois = pd.DatetimeIndex(snapshots).month
-            saisonnalite = np.sin((mois - 3) * np.pi / 6) * 0.2  # Max en juin, min en décembre
-            
-            niveaux = niveau_initial + np.cumsum(variations)
-            
-            for i, timestamp in enumerate(snapshots):
-                idx = min(i, len(saisonnalite)-1)
-                niveaux[i] += saisonnalite[idx]
-            
-            niveaux_df[barrage] = np.clip(niveaux, 0.1, 1.0)
+        # Niveau initial entre 0.4 et 0.8
+        niveau_initial = rng.uniform(0.4, 0.8, size=n_barrages)
         
-        return niveaux_df
+        # Variations aléatoires et saisonnalité
+        variations = rng.normal(0, 0.01, size=(len(snapshots), n_barrages))
+        saisonnalite = np.sin((snapshots.month.to_numpy() - 3) * np.pi / 6) * 0.2  # Max en juin, min en décembre
+        
+        niveaux = niveau_initial + np.cumsum(variations, axis=0) + saisonnalite[:, np.newaxis]
+        
+        return pd.DataFrame(np.clip(niveaux, 0.1, 1.0), index=snapshots, columns=list(barrages_reservoir))
     
     @staticmethod
     def ajouter_interconnexion_import_export(network, Pmax, bus_frontiere=None):
@@ -433,55 +536,29 @@ class EnergyUtils:
         
         # Vérifier la capacité totale de génération à chaque pas de temps
         if hasattr(network.generators_t, 'p_max_pu'):
-            # Pour chaque pas de temps, vérifier si la capacité est suffisante
-            for timestamp in network.snapshots:
-                # Vérifier si le timestamp existe dans p_set
-                try:
-                    if timestamp in network.loads_t.p_set.index:
-                        total_demand_t = network.loads_t.p_set.loc[timestamp].sum()
-                    else:
-                        logger.warning(f"Timestamp {timestamp} non trouvé dans network.loads_t.p_set. Utilisation de valeur par défaut.")
-                        if not network.loads_t.p_set.empty:
-                            total_demand_t = network.loads_t.p_set.mean().sum()  # Moyenne comme valeur par défaut
-                        else:
-                            total_demand_t = 0  # Aucune demande si aucune donnée disponible
-                    
-                    # Calculer la capacité de génération disponible
-                    available_capacity = 0
-                    for gen in network.generators.index:
-                        p_nom = network.generators.loc[gen, 'p_nom']
-                        p_max_pu = 1.0  # Par défaut
-                        
-                        if gen in network.generators_t.p_max_pu.columns:
-                            if timestamp in network.generators_t.p_max_pu.index:
-                                p_max_pu = network.generators_t.p_max_pu.loc[timestamp, gen]
-                        
-                        available_capacity += p_nom * p_max_pu
-                    
-                    # Si la capacité est insuffisante, ajouter un générateur d'urgence
-                    if available_capacity < total_demand_t:
-                        capacity_gap = total_demand_t - available_capacity
-                        gen_name = f"emergency_gen_{timestamp.strftime('%Y%m%d')}"
-                        
-                        if gen_name not in network.generators.index:
-                            network.add(
-                                "Generator",
-                                gen_name,
-                                bus=reference_bus,
-                                p_nom=capacity_gap * 1.1,  # 10% de marge
-                                marginal_cost=800,  # Très coûteux
-                                carrier="import"
-                            )
-                        
-                        if gen_name not in network.generators_t.p_max_pu.columns:
-                            network.generators_t.p_max_pu[gen_name] = 0
-                        
-                        if timestamp in network.generators_t.p_max_pu.index:
-                            network.generators_t.p_max_pu.at[timestamp, gen_name] = 1.0
-                except KeyError as e:
-                    logger.error(f"Erreur lors du traitement du timestamp {timestamp}: {str(e)}")
-                    # Continuer avec le timestamp suivant
-                    continue
+            from harmoniq.modules.reseau.core.dispatch import add_emergency_slack
+
+            p_set = network.loads_t.p_set
+            total_demand = p_set.sum(axis=1).reindex(network.snapshots)
+            missing = ~network.snapshots.isin(p_set.index)
+            if missing.any():
+                logger.warning(f"{missing.sum()} pas de temps non trouvés dans network.loads_t.p_set. Utilisation de valeur par défaut.")
+                # Moyenne comme valeur par défaut, aucune demande si aucune donnée disponible
+                default_demand = p_set.mean().sum() if not p_set.empty else 0
+                total_demand[missing] = default_demand
+
+            # Capacité de génération disponible (p_max_pu = 1.0 par défaut)
+            p_max_pu = network.generators_t.p_max_pu.reindex(
+                index=network.snapshots, columns=network.generators.index, fill_value=1.0
+            )
+            available_capacity = p_max_pu.mul(network.generators.p_nom, axis=1).sum(axis=1, skipna=False)
+
+            # Si la capacité est insuffisante, un seul générateur d'urgence suit le déficit
+            capacity_gap = (total_demand - available_capacity).to_numpy(dtype='float64')
+            capacity_gap = np.where(capacity_gap > 0, capacity_gap, 0.0)
+            if capacity_gap.any():
+                gen_name = add_emergency_slack(network, reference_bus, capacity_gap, margin=1.1)  # 10% de marge
+                logger.info(f"Générateur d'urgence {gen_name}: {np.count_nonzero(capacity_gap)} pas de temps en déficit")
         
         # 6. Créer une matrice "safety_factor" pour tous les générateurs
         network.generators.p_nom_extendable = True
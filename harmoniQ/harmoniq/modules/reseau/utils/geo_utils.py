@@ -7,6 +7,7 @@ du réseau et l'optimisation des tracés des lignes de transmission.
 
 Classes:
     GeoUtils: Classe principale pour les calculs géographiques.
+    BusSpatialIndex: Index spatial (KD-tree) des bus pour la recherche du plus proche.
 
 Functions:
     calculate_distance: Calcule la distance entre deux points.
@@ -31,9 +32,12 @@ Contributeurs : Yanis Aksas (yanis.aksas@polymtl.ca)
 
 import numpy as np
 import math
+import hashlib
+from collections import OrderedDict
 from typing import Tuple, List, Dict, Optional
 from dataclasses import dataclass
 from math import radians, sin, cos, sqrt, atan2
+from scipy.spatial import cKDTree
 
 
 @dataclass
@@ -142,22 +146,184 @@ class GeoUtils:
             >>> nearest_bus, distance = geo.find_nearest_bus(point, buses_df)
             >>> print(f"Bus le plus proche: {nearest_bus}, distance: {distance:.2f} km")
         """
-        min_distance = float('inf')
-        nearest_bus = None
-        
-        # Vérifier si l'entrée est un réseau PyPSA ou un DataFrame
-        if hasattr(buses, 'buses'):  # C'est un réseau PyPSA
-            buses_data = buses.buses
-        else:  # C'est un DataFrame pandas
-            buses_data = buses
-        
-        for idx, bus in buses_data.iterrows():
-            # Dans le format des données, x est longitude et y est latitude
-            bus_point = (bus['y'], bus['x'])
-            distance = self.calculate_distance(point, bus_point)
-            
-            if distance < min_distance:
-                min_distance = distance
-                nearest_bus = idx if hasattr(buses, 'buses') else bus['name']
-        
-        return nearest_bus, min_distance
\ No newline at end of file
+        names, distances = self.find_nearest_buses([point[0]], [point[1]], buses)
+        if len(names) == 0 or names[0] is None:
+            return None, float('inf')
+        return names[0], float(distances[0])
+
+    def find_nearest_buses(self,
+                           latitudes,
+                           longitudes,
+                           buses,
+                           k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Trouve les k bus les plus proches de plusieurs points en un seul appel.
+
+        L'index spatial est construit une seule fois par topologie puis réutilisé.
+
+        Args:
+            latitudes: Latitudes des points en degrés décimaux
+            longitudes: Longitudes des points en degrés décimaux
+            buses: DataFrame des bus (colonnes 'x' et 'y') ou réseau PyPSA
+            k: Nombre de bus voisins par point
+
+        Returns:
+            Tuple (noms des bus, distances en kilomètres), de forme (N,) si k=1
+            et (N, k) sinon
+
+        Example:
+            >>> geo = GeoUtils()
+            >>> noms, distances = geo.find_nearest_buses([45.5, 46.8], [-73.5, -71.2], network)
+        """
+        return BusSpatialIndex.for_buses(buses).query(latitudes, longitudes, k=k)
+
+
+class BusSpatialIndex:
+    """
+    Index spatial des bus pour la recherche du bus le plus proche.
+
+    Les bus sont projetés sur la sphère unité en coordonnées 3D, où la distance
+    euclidienne (corde) croît avec la distance sur la sphère. Le bus le plus
+    proche selon le KD-tree est donc aussi le plus proche selon Haversine.
+    Les distances retournées sont recalculées exactement avec Haversine.
+
+    Attributes:
+        names (np.ndarray): Noms des bus indexés
+        latitudes (np.ndarray): Latitudes des bus en degrés décimaux
+        longitudes (np.ndarray): Longitudes des bus en degrés décimaux
+
+    Example:
+        >>> index = BusSpatialIndex.from_network(network)
+        >>> noms, distances = index.query([45.5, 46.8], [-73.5, -71.2])
+    """
+
+    MAX_CACHE_SIZE = 8
+    _cache: "OrderedDict[str, BusSpatialIndex]" = OrderedDict()
+
+    def __init__(self, names, latitudes, longitudes):
+        latitudes = np.asarray(latitudes, dtype='float64')
+        longitudes = np.asarray(longitudes, dtype='float64')
+        # Les bus sans coordonnées ne sont jamais retenus
+        valid = np.isfinite(latitudes) & np.isfinite(longitudes)
+        self.names = np.asarray(names, dtype=object)[valid]
+        self.latitudes = latitudes[valid]
+        self.longitudes = longitudes[valid]
+        self._tree = cKDTree(self._to_unit_sphere(self.latitudes, self.longitudes)) if valid.any() else None
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @staticmethod
+    def _to_unit_sphere(latitudes, longitudes) -> np.ndarray:
+        """Coordonnées 3D (N, 3) sur la sphère unité."""
+        lat = np.radians(latitudes)
+        lon = np.radians(longitudes)
+        cos_lat = np.cos(lat)
+        return np.column_stack((cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)))
+
+    @staticmethod
+    def haversine(lat1, lon1, lat2, lon2) -> np.ndarray:
+        """
+        Distance Haversine vectorisée en kilomètres.
+
+        Args:
+            lat1, lon1: Coordonnées des premiers points en degrés décimaux
+            lat2, lon2: Coordonnées des seconds points en degrés décimaux
+
+        Returns:
+            np.ndarray: Distances en kilomètres (diffusion numpy des entrées)
+        """
+        lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+        a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+        return GeoUtils.EARTH_RADIUS * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+    @classmethod
+    def from_network(cls, buses) -> "BusSpatialIndex":
+        """
+        Construit l'index à partir des bus d'un réseau.
+
+        Args:
+            buses: DataFrame des bus (colonnes 'x' et 'y') ou réseau PyPSA
+
+        Returns:
+            BusSpatialIndex: Index des bus
+        """
+        is_network = hasattr(buses, 'buses')
+        buses_data = buses.buses if is_network else buses
+        # Dans le format des données, x est longitude et y est latitude
+        names = buses_data.index if is_network or 'name' not in buses_data.columns else buses_data['name']
+        return cls(names, buses_data['y'], buses_data['x'])
+
+    @staticmethod
+    def topology_key(buses) -> str:
+        """
+        Empreinte des noms et coordonnées des bus.
+
+        Args:
+            buses: DataFrame des bus (colonnes 'x' et 'y') ou réseau PyPSA
+
+        Returns:
+            str: Empreinte identifiant la topologie
+        """
+        buses_data = buses.buses if hasattr(buses, 'buses') else buses
+        names = buses_data.index if hasattr(buses, 'buses') or 'name' not in buses_data.columns else buses_data['name']
+        key = hashlib.md5()
+        key.update("\x1f".join(map(str, names)).encode())
+        key.update(buses_data['x'].to_numpy(dtype='float64').tobytes())
+        key.update(buses_data['y'].to_numpy(dtype='float64').tobytes())
+        return key.hexdigest()
+
+    @classmethod
+    def for_buses(cls, buses) -> "BusSpatialIndex":
+        """
+        Index des bus, mis en cache par topologie.
+
+        Args:
+            buses: DataFrame des bus (colonnes 'x' et 'y') ou réseau PyPSA
+
+        Returns:
+            BusSpatialIndex: Index partagé par tous les appels sur la même topologie
+        """
+        key = cls.topology_key(buses)
+        index = cls._cache.get(key)
+        if index is None:
+            index = cls.from_network(buses)
+            cls._cache[key] = index
+            if len(cls._cache) > cls.MAX_CACHE_SIZE:
+                cls._cache.popitem(last=False)
+        else:
+            cls._cache.move_to_end(key)
+        return index
+
+    def query(self, latitudes, longitudes, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Trouve les k bus les plus proches de chaque point.
+
+        Args:
+            latitudes: Latitudes des points en degrés décimaux
+            longitudes: Longitudes des points en degrés décimaux
+            k: Nombre de bus voisins par point (limité au nombre de bus)
+
+        Returns:
+            Tuple (noms des bus, distances Haversine en kilomètres), de forme (N,)
+            si k=1 et (N, k) sinon. Sans bus, les noms sont None et les distances infinies.
+        """
+        latitudes = np.asarray(latitudes, dtype='float64').ravel()
+        longitudes = np.asarray(longitudes, dtype='float64').ravel()
+        shape = (len(latitudes),) if k == 1 else (len(latitudes), k)
+        if self._tree is None:
+            return np.full(shape, None, dtype=object), np.full(shape, np.inf)
+
+        # Les points sans coordonnées n'ont pas de bus le plus proche
+        valid = np.isfinite(latitudes) & np.isfinite(longitudes)
+        points = self._to_unit_sphere(np.where(valid, latitudes, 0.0), np.where(valid, longitudes, 0.0))
+        _, idx = self._tree.query(points, k=min(k, len(self)))
+        idx = idx.reshape(len(latitudes), -1)
+        names = self.names[idx]
+        names[~valid] = None
+        distances = self.haversine(latitudes[:, None], longitudes[:, None],
+                                   self.latitudes[idx], self.longitudes[idx])
+        distances[~valid] = np.inf
+        if k == 1:
+            return names[:, 0], distances[:, 0]
+        return names, distances
@@ -0,0 +1,448 @@
+"""
+Module de cache des réseaux construits.
+
+Les réseaux sont mis en cache sous une clé calculée à partir des données
+réellement utilisées pour les construire :
+- Lignes des infrastructures sélectionnées dans la base de données
+- Topologie (bus, lignes, types de lignes) et fichiers de `data/topology`
+- Paramètres du scénario
+- Fournisseur météo (nom, graine ou répertoire, voir provider_identity)
+- Version du code (CACHE_VERSION et version du paquet)
+
+Une infrastructure modifiée dans la base de données produit donc une nouvelle
+clé au lieu de servir un réseau périmé.
+
+Chaque entrée est un réseau au format Parquet (voir NetworkSnapshot), lisible
+à la demande sans reconstruire tout le réseau.
+
+Le cache est borné en octets : les entrées les moins récemment utilisées sont
+supprimées au-delà du budget. Les écritures passent par un répertoire temporaire
+renommé atomiquement, pour que plusieurs processus (workers uvicorn) ne lisent
+jamais une entrée à moitié écrite.
+
+Chaque processus garde aussi en mémoire les derniers réseaux construits
+(NetworkMemoryCache, même clé) : une requête répétée reçoit une vue du réseau
+qui partage les tables statiques et ne copie que les séries temporelles des
+générateurs et des charges, modifiées par l'optimisation.
+
+Example:
+    >>> cache = NetworkCache(max_bytes=500 * 1024**2)
+    >>> key = await network_key(loader, scenario, liste_infra)
+    >>> network = cache.get(key)
+    >>> if network is None:
+    ...     network = await builder.create_network(...)
+    ...     cache.put(key, network)
+    >>> cache.stats()
+"""
+
+import asyncio
+import copy
+import logging
+import os
+import shutil
+import uuid
+from collections import OrderedDict
+from importlib import metadata
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+import pypsa
+
+from harmoniq.core.meteo_providers import provider_identity
+
+from .network_snapshot import NetworkSnapshot, MANIFEST
+from .stage_cache import stage_key, frame_fingerprint, record_fingerprint, file_fingerprint, evict_lru
+
+logger = logging.getLogger("NetworkCache")
+
+RESEAU_DIR = Path(__file__).parent.parent
+NETWORK_CACHE_DIR = RESEAU_DIR / "n_cache" / "network_cache"
+
+# À incrémenter lorsque la construction du réseau ou le format des entrées change
+CACHE_VERSION = 2
+
+# Budget par défaut du cache (modifiable par HARMONIQ_NETWORK_CACHE_MAX_BYTES)
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+# Budget par défaut du cache en mémoire (modifiable par HARMONIQ_NETWORK_MEMORY_MAX_BYTES)
+DEFAULT_MEMORY_MAX_BYTES = 512 * 1024 ** 2
+
+# Séries temporelles modifiées par l'optimisation (copiées pour chaque vue)
+MUTABLE_SERIES = ("generators", "loads")
+
+# Avec la copie à l'écriture de pandas, une copie superficielle d'une table est
+# protégée des modifications en place; sinon les tables statiques sont copiées
+_COPY_ON_WRITE = int(pd.__version__.split(".")[0]) >= 3 or pd.options.mode.copy_on_write is True
+
+
+def code_version() -> str:
+    """Version du code utilisée dans les clés du cache."""
+    try:
+        package_version = metadata.version("harmoniq")
+    except metadata.PackageNotFoundError:
+        package_version = "unknown"
+    return f"{package_version}+cache{CACHE_VERSION}"
+
+
+async def network_key(loader, scenario, liste_infra) -> str:
+    """
+    Clé d'un réseau à partir des données utilisées pour le construire.
+
+    Args:
+        loader: NetworkDataLoader utilisé pour construire le réseau
+        scenario: Scénario de simulation
+        liste_infra: Liste des infrastructures incluses dans le réseau
+
+    Returns:
+        str: Clé du réseau
+    """
+    from .data_loader import NON_PILOTABLE_SOURCES, PILOTABLE_SOURCES
+
+    loader.set_infrastructure_ids(liste_infra)
+    source_types = NON_PILOTABLE_SOURCES + PILOTABLE_SOURCES
+    topology, *centrales = await asyncio.gather(
+        loader._load_topology(),
+        *(loader._read_centrales(t) for t in source_types)
+    )
+
+    topology_dir = Path(loader.data_dir) / "topology"
+    topology_files = {
+        str(path.relative_to(topology_dir)): file_fingerprint(path, content=True)
+        for path in sorted(topology_dir.rglob("*")) if path.is_file()
+    }
+
+    return stage_key(
+        "network",
+        code_version(),
+        record_fingerprint(scenario),
+        {name: frame_fingerprint(df) for name, df in topology.items()},
+        {t: frame_fingerprint(df) for t, df in zip(source_types, centrales)},
+        topology_files,
+        provider_identity(),
+    )
+
+
+class NetworkCache:
+    """
+    Cache LRU des réseaux construits, borné en octets.
+
+    Attributes:
+        cache_dir (Path): Répertoire des entrées
+        max_bytes (int): Taille maximale du cache en octets
+        enabled (bool): Si False, aucune lecture ni écriture n'est faite
+    """
+
+    def __init__(self, cache_dir: str = None, max_bytes: Optional[int] = None, enabled: bool = True):
+        """
+        Args:
+            cache_dir: Répertoire du cache (n_cache/network_cache par défaut)
+            max_bytes: Budget du cache en octets (HARMONIQ_NETWORK_CACHE_MAX_BYTES
+                ou DEFAULT_MAX_BYTES si None)
+            enabled: Si False, le cache est désactivé
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else NETWORK_CACHE_DIR
+        if max_bytes is None:
+            max_bytes = int(os.environ.get("HARMONIQ_NETWORK_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def path(self, key: str) -> Path:
+        """Répertoire d'une entrée."""
+        return self.cache_dir / f"network_{key}"
+
+    def snapshot(self, key: str) -> Optional[NetworkSnapshot]:
+        """
+        Accès à la demande à un réseau du cache (tables et séries lues au besoin).
+
+        Args:
+            key: Clé du réseau (voir network_key)
+
+        Returns:
+            Optional[NetworkSnapshot]: Réseau enregistré, ou None s'il est absent ou illisible
+        """
+        if not self.enabled:
+            return None
+        path = self.path(key)
+        try:
+            snapshot = NetworkSnapshot(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as e:
+            logger.warning(f"Entrée du cache illisible {path.name}: {e}")
+            self.misses += 1
+            self._remove(path)
+            return None
+
+        # Date de modification du manifeste = date du dernier accès (ordre LRU)
+        try:
+            os.utime(path / MANIFEST)
+        except OSError:
+            pass
+        self.hits += 1
+        return snapshot
+
+    def get(self, key: str, **kwargs) -> Optional[pypsa.Network]:
+        """
+        Lit un réseau du cache.
+
+        Args:
+            key: Clé du réseau (voir network_key)
+            **kwargs: Options de NetworkSnapshot.to_network (séries, période)
+
+        Returns:
+            Optional[pypsa.Network]: Réseau, ou None s'il est absent ou illisible
+        """
+        snapshot = self.snapshot(key)
+        if snapshot is None:
+            return None
+        try:
+            network = snapshot.to_network(**kwargs)
+        except Exception as e:
+            # Entrée supprimée par un autre processus ou corrompue
+            logger.warning(f"Erreur lors du chargement du réseau {snapshot.path.name}: {e}")
+            self.hits -= 1
+            self.misses += 1
+            self._remove(snapshot.path)
+            return None
+        logger.info(f"Réseau chargé depuis le cache: {snapshot.path.name}")
+        return network
+
+    def put(self, key: str, network: pypsa.Network):
+        """
+        Enregistre un réseau (écriture atomique) puis applique le budget.
+
+        Args:
+            key: Clé du réseau (voir network_key)
+            network: Réseau à enregistrer
+        """
+        if not self.enabled:
+            return
+        path = self.path(key)
+        tmp_path = self.cache_dir / f".tmp_{os.getpid()}_{uuid.uuid4().hex}"
+        try:
+            NetworkSnapshot.save(network, tmp_path)
+            os.replace(tmp_path, path)
+            logger.info(f"Réseau sauvegardé dans le cache: {path.name}")
+        except OSError as e:
+            if not path.exists():
+                logger.warning(f"Erreur lors de la sauvegarde du réseau: {e}")
+            # Sinon, la même entrée a été écrite par un autre processus
+            self._remove(tmp_path)
+        except Exception as e:
+            logger.warning(f"Erreur lors de la sauvegarde du réseau: {e}")
+            self._remove(tmp_path)
+            return
+        self.evict(keep=path)
+
+    def evict(self, keep: Optional[Path] = None):
+        """
+        Supprime les entrées les moins récemment utilisées au-delà du budget.
+
+        Args:
+            keep: Entrée à conserver même si elle dépasse seule le budget
+        """
+        entries = []
+        for path in self.cache_dir.glob("network_*"):
+            try:
+                entries.append(((path / MANIFEST).stat().st_mtime, self._size(path), path))
+            except OSError:
+                continue
+
+        for path in evict_lru(entries, self.max_bytes, self._remove, keep=keep):
+            self.evictions += 1
+            logger.info(f"Réseau retiré du cache: {path.name}")
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Statistiques du cache.
+
+        Returns:
+            Dict[str, int]: Lectures réussies, absentes, évictions, nombre
+                d'entrées et taille totale en octets
+        """
+        sizes = [self._size(path) for path in self.cache_dir.glob("network_*")]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(sizes),
+            "bytes": sum(sizes),
+            "max_bytes": self.max_bytes,
+        }
+
+    @staticmethod
+    def _size(path: Path) -> int:
+        """Taille d'une entrée en octets."""
+        size = 0
+        for f in path.rglob("*"):
+            try:
+                size += f.stat().st_size if f.is_file() else 0
+            except OSError:
+                continue
+        return size
+
+    def _remove(self, path: Path) -> bool:
+        """
+        Supprime une entrée. Elle est d'abord renommée pour disparaître
+        atomiquement pour les autres processus.
+        """
+        trash = self.cache_dir / f".del_{os.getpid()}_{uuid.uuid4().hex}"
+        try:
+            os.replace(path, trash)
+        except OSError:
+            return False
+        shutil.rmtree(trash, ignore_errors=True)
+        return True
+
+
+def network_nbytes(network: pypsa.Network) -> int:
+    """
+    Taille approximative d'un réseau en mémoire.
+
+    Args:
+        network: Réseau PyPSA
+
+    Returns:
+        int: Taille des tables statiques et des séries temporelles en octets
+    """
+    nbytes = 0
+    for component in network.components:
+        nbytes += int(component.static.memory_usage(deep=True).sum())
+        for df in component.dynamic.values():
+            nbytes += int(df.memory_usage(deep=False).sum())
+    return nbytes
+
+
+def network_view(network: pypsa.Network) -> pypsa.Network:
+    """
+    Vue d'un réseau qui peut être modifiée sans altérer l'original.
+
+    Les tables statiques et les séries temporelles des autres composants sont
+    partagées (copie à l'écriture); seules les séries des générateurs et des
+    charges, modifiées par l'optimisation, sont copiées.
+
+    Args:
+        network: Réseau d'origine
+
+    Returns:
+        pypsa.Network: Nouveau réseau
+    """
+    memo = {}
+    for component in network.components:
+        memo[id(component.static)] = component.static.copy(deep=not _COPY_ON_WRITE)
+        for df in component.dynamic.values():
+            deep = component.list_name in MUTABLE_SERIES or not _COPY_ON_WRITE
+            memo[id(df)] = df.copy(deep=deep)
+    return copy.deepcopy(network, memo)
+
+
+class NetworkMemoryCache:
+    """
+    Cache LRU des réseaux construits dans le processus courant, borné en octets.
+
+    Les réseaux ne sont jamais remis tels quels : get et put retournent une vue
+    (voir network_view), pour que les modifications d'une requête ne touchent
+    pas le réseau en cache.
+
+    Attributes:
+        max_bytes (int): Taille maximale du cache en octets
+        enabled (bool): Si False, aucun réseau n'est conservé
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None, enabled: bool = True):
+        """
+        Args:
+            max_bytes: Budget du cache en octets (HARMONIQ_NETWORK_MEMORY_MAX_BYTES
+                ou DEFAULT_MEMORY_MAX_BYTES si None)
+            enabled: Si False, le cache est désactivé
+        """
+        if max_bytes is None:
+            max_bytes = int(os.environ.get("HARMONIQ_NETWORK_MEMORY_MAX_BYTES", DEFAULT_MEMORY_MAX_BYTES))
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[pypsa.Network, int]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[pypsa.Network]:
+        """
+        Vue d'un réseau du cache.
+
+        Args:
+            key: Clé du réseau (voir network_key)
+
+        Returns:
+            Optional[pypsa.Network]: Vue du réseau, ou None s'il est absent
+        """
+        if not self.enabled or key not in self._entries:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        network, _ = self._entries[key]
+        return network_view(network)
+
+    def put(self, key: str, network: pypsa.Network) -> pypsa.Network:
+        """
+        Conserve un réseau puis applique le budget.
+
+        Le réseau passé devient la copie de référence et ne doit plus être
+        modifié : l'appelant utilise la vue retournée.
+
+        Args:
+            key: Clé du réseau (voir network_key)
+            network: Réseau construit
+
+        Returns:
+            pypsa.Network: Vue du réseau à utiliser par l'appelant
+        """
+        if not self.enabled:
+            return network
+        nbytes = network_nbytes(network)
+        if nbytes > self.max_bytes:
+            logger.info(f"Réseau trop volumineux pour le cache en mémoire ({nbytes} octets)")
+            return network
+
+        self._entries[key] = (network, nbytes)
+        self._entries.move_to_end(key)
+        while self.nbytes > self.max_bytes:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return network_view(network)
+
+    @property
+    def nbytes(self) -> int:
+        """Taille des réseaux en cache en octets."""
+        return sum(nbytes for _, nbytes in self._entries.values())
+
+    def clear(self):
+        """Vide le cache."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Statistiques du cache.
+
+        Returns:
+            Dict[str, int]: Lectures réussies, absentes, évictions, nombre
+                d'entrées et taille totale en octets
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self.nbytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+# Cache partagé par toutes les requêtes du processus (un par worker uvicorn)
+network_memory_cache = NetworkMemoryCache()
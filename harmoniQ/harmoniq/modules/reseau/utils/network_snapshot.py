@@ -0,0 +1,266 @@
+"""
+Module de sauvegarde binaire des réseaux (Parquet).
+
+Un réseau est enregistré dans un répertoire contenant :
+- manifest.json : version du format, attributs du réseau et liste des tables
+- snapshots.parquet : pas de temps et leurs pondérations
+- static/<Composant>.parquet : une table par type de composant
+- series/<Composant>-<attribut>.parquet : une matrice par série temporelle
+
+Les types des colonnes sont conservés (pas de conversion en chaînes comme avec
+netCDF). Les séries temporelles sont écrites par groupes d'environ un mois et
+lues à la demande : on peut ne charger que les métadonnées des générateurs,
+quelques colonnes ou une période, sans lire toute l'année.
+
+Example:
+    >>> NetworkSnapshot.save(network, "n_cache/network_cache/reseau")
+    >>> snapshot = NetworkSnapshot("n_cache/network_cache/reseau")
+    >>> generateurs = snapshot.static("Generator")
+    >>> janvier = snapshot.series("Generator", "p_max_pu", start="2035-01-01", end="2035-01-31 23:00")
+    >>> network = snapshot.to_network(start="2035-01-01", end="2035-01-31 23:00")
+"""
+
+import json
+import logging
+from enum import Enum
+from pathlib import Path
+from typing import List, Optional
+
+import pandas as pd
+import pypsa
+
+logger = logging.getLogger("NetworkSnapshot")
+
+FORMAT_VERSION = 1
+MANIFEST = "manifest.json"
+
+# Environ un mois de pas de temps horaires par groupe de lignes
+ROWS_PER_GROUP = 24 * 31
+
+# Composants qui ne sont pas des tables de données simples
+IGNORED_COMPONENTS = ("SubNetwork", "Shape")
+
+try:
+    import pyarrow.parquet  # noqa: F401
+    PARQUET_ENGINE = "pyarrow"
+    _WRITE_OPTIONS = {"row_group_size": ROWS_PER_GROUP}
+    _READ_OPTIONS = {"memory_map": True}
+except ImportError:
+    PARQUET_ENGINE = "fastparquet"
+    _WRITE_OPTIONS = {"row_group_offsets": ROWS_PER_GROUP}
+    _READ_OPTIONS = {}
+
+
+def _sans_enums(df: pd.DataFrame) -> pd.DataFrame:
+    """Remplace les valeurs Enum (p. ex. BusType) des colonnes objet par leur valeur."""
+    columns = [col for col in df.columns if df[col].dtype == object]
+    if not columns:
+        return df
+    df = df.copy()
+    for col in columns:
+        df[col] = df[col].map(lambda v: v.value if isinstance(v, Enum) else v)
+    return df
+
+
+class NetworkSnapshot:
+    """
+    Réseau enregistré au format Parquet, lu à la demande.
+
+    Attributes:
+        path (Path): Répertoire du réseau enregistré
+        manifest (dict): Contenu de manifest.json
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path: Répertoire créé par NetworkSnapshot.save
+
+        Raises:
+            FileNotFoundError: Si le manifeste est absent
+            ValueError: Si la version du format n'est pas prise en charge
+        """
+        self.path = Path(path)
+        with open(self.path / MANIFEST, encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("format") != FORMAT_VERSION:
+            raise ValueError(f"Format de réseau non pris en charge: {self.manifest.get('format')}")
+        self._snapshot_weightings = None
+
+    @classmethod
+    def save(cls, network: pypsa.Network, path) -> "NetworkSnapshot":
+        """
+        Enregistre un réseau.
+
+        Args:
+            network: Réseau à enregistrer
+            path: Répertoire de destination (créé si nécessaire)
+
+        Returns:
+            NetworkSnapshot: Réseau enregistré
+        """
+        path = Path(path)
+        (path / "static").mkdir(parents=True, exist_ok=True)
+        (path / "series").mkdir(parents=True, exist_ok=True)
+
+        weightings = network.snapshot_weightings.copy()
+        weightings.index.name = "snapshot"
+        weightings.to_parquet(path / "snapshots.parquet", engine=PARQUET_ENGINE)
+
+        static = {}
+        series = {}
+        for component in network.components:
+            if component.name in IGNORED_COMPONENTS or component.static.empty:
+                continue
+            filename = f"static/{component.name}.parquet"
+            _sans_enums(component.static).to_parquet(path / filename, engine=PARQUET_ENGINE)
+            static[component.name] = filename
+
+            for attr, df in component.dynamic.items():
+                if df.empty:
+                    continue
+                df = df.copy()
+                df.index.name = "snapshot"
+                filename = f"series/{component.name}-{attr}.parquet"
+                df.to_parquet(path / filename, engine=PARQUET_ENGINE, **_WRITE_OPTIONS)
+                series.setdefault(component.name, {})[attr] = filename
+
+        # Statut de la répartition (attributs ajoutés par NetworkOptimizer)
+        attributes = {"name": network.name}
+        for attr in ("status", "termination_condition"):
+            value = vars(network).get(attr)
+            if isinstance(value, str):
+                attributes[attr] = value
+
+        manifest = {
+            "format": FORMAT_VERSION,
+            "pypsa_version": pypsa.__version__,
+            "n_snapshots": len(network.snapshots),
+            "attributes": attributes,
+            "static": static,
+            "series": series,
+        }
+        with open(path / MANIFEST, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        return cls(path)
+
+    @property
+    def snapshot_weightings(self) -> pd.DataFrame:
+        """Pondérations des pas de temps (lues une seule fois)."""
+        if self._snapshot_weightings is None:
+            self._snapshot_weightings = pd.read_parquet(self.path / "snapshots.parquet", engine=PARQUET_ENGINE)
+        return self._snapshot_weightings
+
+    @property
+    def snapshots(self) -> pd.Index:
+        """Pas de temps du réseau."""
+        return self.snapshot_weightings.index
+
+    @property
+    def components(self) -> List[str]:
+        """Types de composants enregistrés."""
+        return list(self.manifest["static"])
+
+    def series_attributes(self, component: str) -> List[str]:
+        """Séries temporelles enregistrées pour un type de composant."""
+        return list(self.manifest["series"].get(component, {}))
+
+    def static(self, component: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Lit la table d'un type de composant.
+
+        Args:
+            component: Type de composant PyPSA ('Bus', 'Generator', etc.)
+            columns: Colonnes à lire (toutes si None)
+
+        Returns:
+            pd.DataFrame: Attributs des composants, indexés par nom
+        """
+        filename = self.manifest["static"].get(component)
+        if filename is None:
+            return pd.DataFrame()
+        df = pd.read_parquet(self.path / filename, engine=PARQUET_ENGINE, columns=columns, **_READ_OPTIONS)
+        df.index.name = component
+        return df
+
+    def series(self, component: str, attr: str,
+               columns: Optional[List[str]] = None,
+               start=None, end=None) -> pd.DataFrame:
+        """
+        Lit une série temporelle, éventuellement restreinte à des colonnes et une période.
+
+        Seuls les groupes de lignes qui recouvrent la période sont lus.
+
+        Args:
+            component: Type de composant PyPSA
+            attr: Attribut temporel ('p_max_pu', 'p_set', 'p', etc.)
+            columns: Composants à lire (tous si None)
+            start: Premier pas de temps inclus (optionnel)
+            end: Dernier pas de temps inclus (optionnel)
+
+        Returns:
+            pd.DataFrame: Série temporelle (pas de temps × composants)
+        """
+        filename = self.manifest["series"].get(component, {}).get(attr)
+        if filename is None:
+            return pd.DataFrame(index=self.snapshots[self._window(start, end)])
+
+        filters = []
+        if start is not None:
+            filters.append(("snapshot", ">=", pd.Timestamp(start)))
+        if end is not None:
+            filters.append(("snapshot", "<=", pd.Timestamp(end)))
+        df = pd.read_parquet(self.path / filename, engine=PARQUET_ENGINE, columns=columns,
+                             filters=filters or None, **_READ_OPTIONS)
+        # Les filtres ne s'appliquent qu'aux groupes de lignes avec certains moteurs
+        if start is not None or end is not None:
+            df = df.loc[start:end]
+        df.columns.name = component
+        return df
+
+    def _window(self, start=None, end=None):
+        """Masque des pas de temps de la période."""
+        mask = pd.Series(True, index=self.snapshots)
+        if start is not None:
+            mask &= self.snapshots >= pd.Timestamp(start)
+        if end is not None:
+            mask &= self.snapshots <= pd.Timestamp(end)
+        return mask.to_numpy()
+
+    def to_network(self, series=True, start=None, end=None) -> pypsa.Network:
+        """
+        Reconstruit un réseau PyPSA.
+
+        Args:
+            series: True pour toutes les séries temporelles, False pour aucune, ou
+                liste de noms 'Composant-attribut' à charger
+            start: Premier pas de temps inclus (optionnel)
+            end: Dernier pas de temps inclus (optionnel)
+
+        Returns:
+            pypsa.Network: Réseau restreint à la période demandée
+        """
+        network = pypsa.Network()
+        weightings = self.snapshot_weightings[self._window(start, end)]
+        network.set_snapshots(weightings.index)
+        network.snapshot_weightings = weightings
+
+        for component in self.components:
+            df = self.static(component)
+            if not df.empty:
+                network.add(component, df.index, overwrite=True, **{col: df[col] for col in df.columns})
+
+        if series:
+            for component, attrs in self.manifest["series"].items():
+                dynamic = network.components[component].dynamic
+                for attr in attrs:
+                    if series is True or f"{component}-{attr}" in series:
+                        dynamic[attr] = self.series(component, attr, start=start, end=end)
+
+        for attr, value in self.manifest.get("attributes", {}).items():
+            setattr(network, attr, value)
+        return network
+
+    def size(self) -> int:
+        """Taille totale des fichiers en octets."""
+        return sum(f.stat().st_size for f in self.path.rglob("*") if f.is_file())
@@ -0,0 +1,310 @@
+"""
+Module de cache des étapes de construction et d'optimisation du réseau.
+
+Chaque étape du pipeline du réseau a son propre cache, dont la clé ne dépend
+que des entrées de l'étape :
+- topology : bus, lignes, types de lignes, carriers et contraintes globales
+  (base de données et fichiers CSV de topologie)
+- placement : générateurs raccordés aux bus (centrales sélectionnées et
+  coordonnées des bus)
+- profiles : profil p_max_pu de chaque centrale (données de la centrale et
+  pas de temps du scénario)
+- demand : répartition de la demande entre les charges
+- dispatch : résultats de la répartition de la production
+
+Ajouter un parc éolien ne recalcule donc que son propre profil, et changer les
+dates du scénario réutilise la topologie et le placement des générateurs.
+
+Les artefacts sont enregistrés avec pickle dans `n_cache/stage_cache/<étape>/`.
+Le cache est borné en octets, comme le cache des réseaux : les artefacts les
+moins récemment utilisés sont supprimés au-delà du budget (voir evict_lru).
+
+Example:
+    >>> from harmoniq.modules.reseau.utils.stage_cache import StageCache, stage_key
+    >>> cache = StageCache()
+    >>> key = stage_key("profiles", "eolienne", {"nom": "Parc A"}, "2035-01-01")
+    >>> profil = cache.load("profiles", key)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+from enum import Enum
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger("StageCache")
+
+RESEAU_DIR = Path(__file__).parent.parent
+STAGE_CACHE_DIR = RESEAU_DIR / "n_cache" / "stage_cache"
+
+STAGES = ("topology", "placement", "profiles", "demand", "dispatch")
+
+# Budget par défaut du cache (modifiable par HARMONIQ_STAGE_CACHE_MAX_BYTES)
+DEFAULT_MAX_BYTES = 1024 ** 3
+
+_file_fingerprints: Dict[Tuple[str, int, int], str] = {}
+
+
+def _json_default(value):
+    """Sérialisation JSON des valeurs non standards (dates, enums, numpy)."""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=str)
+    if isinstance(value, (pd.Index, np.ndarray)):
+        return list(value)
+    return str(value)
+
+
+def stage_key(*parts) -> str:
+    """
+    Clé d'un artefact à partir des entrées de son étape.
+
+    Args:
+        *parts: Entrées de l'étape (valeurs sérialisables en JSON, dates, enums...)
+
+    Returns:
+        str: Empreinte SHA-256 (tronquée) des entrées
+    """
+    payload = json.dumps(parts, sort_keys=True, default=_json_default, ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()[:24]
+
+
+def frame_fingerprint(data) -> str:
+    """
+    Empreinte du contenu d'un DataFrame ou d'une Series (index, colonnes et valeurs).
+
+    Les colonnes privées (p. ex. `_sa_instance_state` des lignes SQLAlchemy)
+    sont ignorées, comme dans record_fingerprint.
+
+    Args:
+        data: DataFrame ou Series
+
+    Returns:
+        str: Empreinte SHA-256 du contenu
+    """
+    digest = hashlib.sha256()
+    if isinstance(data, pd.DataFrame):
+        data = data[[c for c in data.columns if not str(c).startswith('_')]]
+    columns = list(data.columns) if isinstance(data, pd.DataFrame) else [data.name]
+    digest.update(json.dumps(columns, default=_json_default).encode())
+    if len(data) > 0:
+        digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def record_fingerprint(record) -> Dict[str, Any]:
+    """
+    Attributs d'un objet de la base de données (SQLAlchemy ou Pydantic) pour une clé.
+
+    Args:
+        record: Objet de la base de données
+
+    Returns:
+        Dict[str, Any]: Attributs publics de l'objet
+    """
+    return {k: v for k, v in vars(record).items() if not k.startswith('_')}
+
+
+def file_fingerprint(path, content: bool = False) -> str:
+    """
+    Empreinte d'un fichier d'entrée.
+
+    Args:
+        path: Chemin du fichier
+        content: Si True, l'empreinte porte sur le contenu (petits fichiers CSV);
+            sinon sur le chemin, la taille et la date de modification (bases de données)
+
+    Returns:
+        str: Empreinte du fichier ('absent' s'il n'existe pas)
+    """
+    path = Path(path)
+    if not path.exists():
+        return "absent"
+    stat = path.stat()
+    signature = (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+    if not content:
+        return stage_key(*signature)
+
+    if signature not in _file_fingerprints:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        _file_fingerprints[signature] = digest.hexdigest()
+    return _file_fingerprints[signature]
+
+
+def evict_lru(entries: Iterable[Tuple[float, int, Path]], max_bytes: int,
+              remove: Callable[[Path], bool], keep: Optional[Path] = None) -> List[Path]:
+    """
+    Supprime les entrées les moins récemment utilisées au-delà d'un budget.
+
+    Args:
+        entries: Date du dernier accès, taille en octets et chemin de chaque entrée
+        max_bytes: Budget en octets
+        remove: Supprime une entrée (True si elle a été supprimée)
+        keep: Entrée à conserver même si elle dépasse seule le budget
+
+    Returns:
+        List[Path]: Entrées supprimées
+    """
+    entries = list(entries)
+    total = sum(size for _, size, _ in entries)
+    removed = []
+    for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+        if total <= max_bytes:
+            break
+        if keep is not None and path == keep:
+            continue
+        if remove(path):
+            removed.append(path)
+        total -= size
+    return removed
+
+
+class StageCache:
+    """
+    Cache adressé par contenu des artefacts de chaque étape du pipeline.
+
+    Attributes:
+        cache_dir (Path): Répertoire racine du cache
+        enabled (bool): Si False, aucune lecture ni écriture n'est faite
+        max_bytes (int): Taille maximale du cache en octets (toutes étapes)
+        hits (Dict[str, int]): Nombre de lectures réussies par étape
+        misses (Dict[str, int]): Nombre d'artefacts absents par étape
+        evictions (int): Nombre d'artefacts retirés pour respecter le budget
+    """
+
+    def __init__(self, cache_dir: str = None, enabled: bool = True, max_bytes: Optional[int] = None):
+        """
+        Args:
+            cache_dir: Répertoire du cache (n_cache/stage_cache par défaut)
+            enabled: Si False, le cache est désactivé
+            max_bytes: Budget du cache en octets (HARMONIQ_STAGE_CACHE_MAX_BYTES
+                ou DEFAULT_MAX_BYTES si None)
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else STAGE_CACHE_DIR
+        self.enabled = enabled
+        if max_bytes is None:
+            max_bytes = int(os.environ.get("HARMONIQ_STAGE_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+        self.max_bytes = max_bytes
+        self.hits = dict.fromkeys(STAGES, 0)
+        self.misses = dict.fromkeys(STAGES, 0)
+        self.evictions = 0
+
+    def _path(self, stage: str, key: str) -> Path:
+        if stage not in STAGES:
+            raise ValueError(f"Étape de cache inconnue: {stage}")
+        return self.cache_dir / stage / f"{key}.pkl"
+
+    def load(self, stage: str, key: str) -> Optional[Any]:
+        """
+        Lit un artefact.
+
+        Args:
+            stage: Étape du pipeline
+            key: Clé de l'artefact (voir stage_key)
+
+        Returns:
+            Optional[Any]: Artefact, ou None s'il est absent ou illisible
+        """
+        if not self.enabled:
+            return None
+        path = self._path(stage, key)
+        if not path.exists():
+            self.misses[stage] += 1
+            return None
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except Exception as e:
+            logger.warning(f"Artefact {stage} illisible ({path.name}): {e}")
+            self.misses[stage] += 1
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        # Date de modification = date du dernier accès (ordre LRU)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits[stage] += 1
+        return value
+
+    def save(self, stage: str, key: str, value: Any):
+        """
+        Enregistre un artefact (écriture atomique) puis applique le budget.
+
+        Args:
+            stage: Étape du pipeline
+            key: Clé de l'artefact (voir stage_key)
+            value: Artefact à enregistrer
+        """
+        if not self.enabled:
+            return
+        path = self._path(stage, key)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Erreur lors de la sauvegarde de l'artefact {stage}: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+        self.evict(keep=path)
+
+    def evict(self, keep: Optional[Path] = None):
+        """
+        Supprime les artefacts les moins récemment utilisés au-delà du budget.
+
+        Args:
+            keep: Artefact à conserver même s'il dépasse seul le budget
+        """
+        entries = []
+        for path in self.cache_dir.glob("*/*.pkl"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        removed = evict_lru(entries, self.max_bytes, self._remove, keep=keep)
+        self.evictions += len(removed)
+        if removed:
+            logger.info(f"{len(removed)} artefacts retirés du cache des étapes")
+
+    @staticmethod
+    def _remove(path: Path) -> bool:
+        try:
+            os.remove(path)
+        except OSError:
+            return False
+        return True
+
+    def clear(self, stage: Optional[str] = None):
+        """
+        Supprime les artefacts d'une étape (ou de toutes les étapes).
+
+        Args:
+            stage: Étape à vider (toutes si None)
+        """
+        for name in ([stage] if stage else STAGES):
+            directory = self.cache_dir / name
+            if directory.exists():
+                for path in directory.glob("*.pkl"):
+                    path.unlink(missing_ok=True)
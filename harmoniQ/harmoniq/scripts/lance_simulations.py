@@ -0,0 +1,221 @@
+"""Script qui exécute le workflow du réseau pour plusieurs scénarios et listes d'infrastructures
+
+Chaque combinaison (scénario, liste d'infrastructures) est simulée dans un pool
+de processus, avec les caches du réseau (étapes, réseaux construits). La
+production est écrite en Parquet partitionné :
+
+    <sortie>/scenario_id=<id>/liste_infra_id=<id>/production.parquet
+
+ainsi qu'un résumé des durées de chaque étape (<sortie>/resume.csv).
+
+Exemples :
+    harmoniq-run --scenarios 1 2 --listes 1 3 --workers 4
+    harmoniq-run --balayage balayage.yaml
+
+Fichier de balayage YAML (les options de la ligne de commande ont priorité) :
+    scenarios: [1, 2]
+    listes: [1, 3]
+    journalier: false
+    workers: 4
+    sortie: resultats
+    cache: true
+"""
+
+import argparse
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import pandas as pd
+import yaml
+from tqdm import tqdm
+
+ETAPES = ["lecture", "reseau", "import_export", "repartition", "production", "ecriture"]
+
+
+async def _simuler(scenario_id: int, liste_infra_id: int, is_journalier: bool,
+                   sortie: Path, cache: bool, durees: Dict[str, float]) -> Dict:
+    from harmoniq.db import schemas
+    from harmoniq.db.CRUD import read_data_by_id
+    from harmoniq.db.engine import get_db
+    from harmoniq.modules.reseau import InfraReseau
+
+    debut = time.perf_counter()
+
+    def etape(nom):
+        nonlocal debut
+        maintenant = time.perf_counter()
+        durees[nom] = maintenant - debut
+        debut = maintenant
+
+    db = next(get_db())
+    scenario, liste_infra = await asyncio.gather(
+        read_data_by_id(db, schemas.Scenario, scenario_id),
+        read_data_by_id(db, schemas.ListeInfrastructures, liste_infra_id),
+    )
+    if scenario is None:
+        raise ValueError(f"Scénario {scenario_id} non trouvé")
+    if liste_infra is None:
+        raise ValueError(f"Liste d'infrastructures {liste_infra_id} non trouvée")
+    etape("lecture")
+
+    infra_reseau = InfraReseau(liste_infra)
+    infra_reseau.stage_cache.enabled = cache
+    infra_reseau.network_cache.enabled = cache
+    infra_reseau.charger_scenario(scenario)
+    infra_reseau.is_journalier = is_journalier
+
+    await infra_reseau.creer_reseau(liste_infra)
+    etape("reseau")
+    Pmax = await infra_reseau.calculer_capacite_import_export(liste_infra)
+    etape("import_export")
+    await infra_reseau.fake_optimiser_reservoirs(liste_infra, Pmax, is_journalier)
+    etape("repartition")
+    production = await infra_reseau.calculer_production(liste_infra, is_journalier)
+    etape("production")
+
+    if production.empty:
+        raise RuntimeError("Calcul de production échoué")
+    partition = sortie / f"scenario_id={scenario_id}" / f"liste_infra_id={liste_infra_id}"
+    partition.mkdir(parents=True, exist_ok=True)
+    production = production.rename_axis("timestamp").reset_index()
+    production.columns = [str(c) for c in production.columns]
+    production.to_parquet(partition / "production.parquet", index=False)
+    etape("ecriture")
+
+    return {
+        "cache_hits": sum(infra_reseau.stage_cache.hits.values()),
+        "cache_misses": sum(infra_reseau.stage_cache.misses.values()),
+    }
+
+
+def executer(scenario_id: int, liste_infra_id: int, is_journalier: bool, sortie: str, cache: bool = True) -> Dict:
+    """
+    Simule une combinaison (scénario, liste d'infrastructures) et écrit sa production.
+
+    Args:
+        scenario_id: Identifiant du scénario
+        liste_infra_id: Identifiant de la liste d'infrastructures
+        is_journalier: Si True, utilise un pas de temps journalier (24h)
+        sortie: Répertoire de sortie
+        cache: Si False, les caches du réseau sont désactivés
+
+    Returns:
+        Dict: Identifiants, statut, durée de chaque étape et bilan des caches
+    """
+    durees = {}
+    resultat = {"scenario_id": scenario_id, "liste_infra_id": liste_infra_id, "statut": "ok", "durees": durees}
+    debut = time.perf_counter()
+    try:
+        resultat.update(asyncio.run(_simuler(scenario_id, liste_infra_id, is_journalier, Path(sortie), cache, durees)))
+    except Exception as e:
+        # Première ligne seulement (les erreurs SQL incluent la requête)
+        resultat["statut"] = f"erreur: {str(e).splitlines()[0] if str(e) else type(e).__name__}"
+    resultat["duree_totale"] = time.perf_counter() - debut
+    return resultat
+
+
+def lire_balayage(chemin: Path) -> Dict:
+    """
+    Lit un fichier de balayage YAML.
+
+    Raises:
+        ValueError: Si le fichier ne contient pas un dictionnaire
+    """
+    with open(chemin, encoding="utf-8") as f:
+        balayage = yaml.safe_load(f) or {}
+    if not isinstance(balayage, dict):
+        raise ValueError(f"Le fichier de balayage {chemin} doit contenir un dictionnaire")
+    return balayage
+
+
+def combinaisons(scenarios: List[int], listes: List[int]) -> List[Tuple[int, int]]:
+    """Toutes les combinaisons (scénario, liste d'infrastructures)."""
+    return list(itertools.product(scenarios, listes))
+
+
+def resumer(resultats: List[Dict]) -> pd.DataFrame:
+    """
+    Résumé par simulation : statut, durée de chaque étape et bilan des caches.
+    """
+    lignes = []
+    for resultat in resultats:
+        ligne = {k: v for k, v in resultat.items() if k != "durees"}
+        ligne.update({f"duree_{etape}": resultat.get("durees", {}).get(etape) for etape in ETAPES})
+        lignes.append(ligne)
+    return pd.DataFrame(lignes).sort_values(["scenario_id", "liste_infra_id"]).reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Simuler le réseau pour plusieurs scénarios et listes d'infrastructures",
+    )
+    parser.add_argument("--scenarios", type=int, nargs="+", help="Identifiants des scénarios")
+    parser.add_argument("--listes", type=int, nargs="+", help="Identifiants des listes d'infrastructures")
+    parser.add_argument("--balayage", type=Path, help="Fichier de balayage YAML")
+    parser.add_argument("--journalier", action="store_true", default=None, help="Pas de temps journalier")
+    parser.add_argument("--workers", type=int, help="Nombre de processus (1 par défaut)")
+    parser.add_argument("--sortie", type=Path, help="Répertoire de sortie (resultats par défaut)")
+    parser.add_argument("--sans-cache", action="store_true", help="Désactiver les caches du réseau")
+
+    args = parser.parse_args()
+    balayage = lire_balayage(args.balayage) if args.balayage else {}
+
+    scenarios = args.scenarios or balayage.get("scenarios")
+    listes = args.listes or balayage.get("listes")
+    if not scenarios or not listes:
+        parser.error("Au moins un scénario et une liste d'infrastructures sont requis")
+    is_journalier = bool(args.journalier if args.journalier is not None else balayage.get("journalier", False))
+    workers = args.workers or int(balayage.get("workers", 1))
+    sortie = args.sortie or Path(balayage.get("sortie", "resultats"))
+    cache = not args.sans_cache and balayage.get("cache", True)
+
+    logging.basicConfig(level=logging.WARNING)
+    sortie.mkdir(parents=True, exist_ok=True)
+    simulations = combinaisons(scenarios, listes)
+    print(f"{len(simulations)} simulations sur {min(workers, len(simulations))} processus")
+
+    debut = time.perf_counter()
+    resultats = []
+    barre = tqdm(total=len(simulations), unit="simulation")
+    if workers <= 1:
+        for scenario_id, liste_infra_id in simulations:
+            resultats.append(executer(scenario_id, liste_infra_id, is_journalier, str(sortie), cache))
+            barre.update()
+    else:
+        # 'spawn' : chaque processus ouvre sa propre connexion à la base de données
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            futures = [
+                executor.submit(executer, scenario_id, liste_infra_id, is_journalier, str(sortie), cache)
+                for scenario_id, liste_infra_id in simulations
+            ]
+            for future in as_completed(futures):
+                resultats.append(future.result())
+                barre.update()
+    barre.close()
+
+    resume = resumer(resultats)
+    resume.to_csv(sortie / "resume.csv", index=False)
+
+    colonnes = [f"duree_{etape}" for etape in ETAPES]
+    print(f"\nDurée totale: {time.perf_counter() - debut:.1f} s")
+    print("Durée par étape (s):")
+    print(resume[colonnes].agg(["sum", "mean", "max"]).T.rename(index=lambda c: c[len("duree_"):]).round(2).to_string())
+
+    erreurs = resume[resume.statut != "ok"]
+    for _, ligne in erreurs.iterrows():
+        print(f"Scénario {ligne.scenario_id}, liste {ligne.liste_infra_id}: {ligne.statut}")
+    print(f"\n{len(resume) - len(erreurs)}/{len(resume)} simulations réussies, résultats dans {sortie}")
+    if len(erreurs):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
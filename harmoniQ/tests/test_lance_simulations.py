@@ -0,0 +1,21 @@
+from harmoniq.scripts.lance_simulations import combinaisons, executer, lire_balayage, resumer
+
+
+def test_balayage_et_resume(tmp_path):
+    fichier = tmp_path / "balayage.yaml"
+    fichier.write_text("scenarios: [1, 2]\nlistes: [3]\njournalier: true\n", encoding="utf-8")
+    balayage = lire_balayage(fichier)
+    assert combinaisons(balayage["scenarios"], balayage["listes"]) == [(1, 3), (2, 3)]
+
+    resume = resumer([
+        {"scenario_id": 2, "liste_infra_id": 3, "statut": "ok", "durees": {"reseau": 1.5}},
+        {"scenario_id": 1, "liste_infra_id": 3, "statut": "erreur: x", "durees": {}},
+    ])
+    assert resume.scenario_id.tolist() == [1, 2]
+    assert resume.loc[1, "duree_reseau"] == 1.5
+
+
+def test_executer_scenario_inconnu(tmp_path):
+    resultat = executer(-1, -1, False, str(tmp_path))
+    assert resultat["statut"].startswith("erreur")
+    assert not list(tmp_path.iterdir())
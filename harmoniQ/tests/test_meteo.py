@@ -1,8 +1,12 @@
+import asyncio
 from datetime import datetime
+import pandas as pd
 import pytest
+from harmoniq.core import meteo
 from harmoniq.core.meteo import WeatherHelper
-from harmoniq.db.schemas import PositionBase
+from harmoniq.db.schemas import PositionBase, weather_schema
 from harmoniq.core.meteo import Granularity, EnergyType
+from harmoniq.core.meteo_providers import LocalProvider, SyntheticProvider, get_provider
 
 
 @pytest.fixture
@@ -70,3 +74,66 @@ def test_weather_helper_nearest_station(position, start_time, end_time):
     )
     stations = weather._get_nearest_station()
     assert not stations.empty
+
+
+def test_weather_cache_parquet(position, start_time, end_time, tmp_path, monkeypatch):
+    monkeypatch.setattr(meteo, "CACHE", tmp_path)
+    weather = WeatherHelper(
+        position, True, start_time, end_time, EnergyType.EOLIEN, Granularity.HOURLY
+    )
+    index = pd.date_range(start_time, end_time, freq="h", name="tempsdate")
+    data = pd.DataFrame(
+        {column: 1.5 for column in weather_schema.columns}, index=index
+    )
+
+    # An older CSV cache is migrated on first use
+    data.to_csv(tmp_path / f"{weather._cache_key}.csv")
+    assert weather.test_cache()
+    assert not (tmp_path / f"{weather._cache_key}.csv").exists()
+
+    cached = weather.load_cache(
+        columns=["vitesse_vent_kmh"], start=datetime(2021, 2, 1), end=datetime(2021, 2, 28, 23)
+    )
+    assert list(cached.columns) == ["vitesse_vent_kmh"]
+    assert cached["vitesse_vent_kmh"].dtype == "float32"
+    assert len(cached) == 28 * 24
+    assert weather.load_cache()["latitude"].dtype == "float64"
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_weather_providers(position, tmp_path, monkeypatch):
+    monkeypatch.setattr(meteo, "CACHE", tmp_path)
+
+    def helper(provider, granularity=Granularity.HOURLY, pos=position):
+        return WeatherHelper(
+            pos, True, datetime(2021, 1, 1), datetime(2021, 12, 31),
+            EnergyType.EOLIEN, granularity, provider=provider,
+        )
+
+    data = asyncio.run(helper(SyntheticProvider(seed=1)).load())
+    again = asyncio.run(helper(SyntheticProvider(seed=1)).load())
+    pd.testing.assert_frame_equal(data, again)
+    assert not data.equals(asyncio.run(helper(SyntheticProvider(seed=2)).load()))
+    assert list(data.columns) == list(weather_schema.columns)
+    temperature = data["temperature_C"]
+    assert temperature[data.index.month == 1].mean() < temperature[data.index.month == 7].mean() - 15
+    assert temperature[data.index.hour == 15].mean() > temperature[data.index.hour == 3].mean()
+    assert (data["vitesse_vent_kmh"] >= 0).all()
+    # Synthetic data is never written to the cache
+    assert not list(tmp_path.iterdir())
+
+    daily = asyncio.run(helper(SyntheticProvider(seed=1), Granularity.DAILY).load())
+    assert len(daily) == 365
+    assert (daily["max_temperature_C"] >= daily["min_tempature_C"]).all()
+
+    # Local provider: nearest file of the granularity
+    (tmp_path / "local" / "hourly").mkdir(parents=True)
+    data.to_parquet(tmp_path / "local" / "hourly" / "gaspesie.parquet")
+    monkeypatch.setenv("HARMONIQ_WEATHER_PROVIDER", "local")
+    monkeypatch.setenv("HARMONIQ_WEATHER_DIR", str(tmp_path / "local"))
+    provider = get_provider()
+    assert isinstance(provider, LocalProvider)
+    local = asyncio.run(helper(provider).load())
+    pd.testing.assert_frame_equal(local, data, check_freq=False)
+    with pytest.raises(ValueError):
+        asyncio.run(helper(provider, pos=PositionBase(latitude=45.5, longitude=-73.6)).load())
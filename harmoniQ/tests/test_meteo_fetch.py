@@ -0,0 +1,216 @@
+import asyncio
+from datetime import datetime
+
+import pandas as pd
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from env_canada.ec_exc import UnknownStationId
+
+from harmoniq.core import meteo, meteo_stations
+from harmoniq.core.meteo import EnergyType, Granularity, WeatherHelper
+from harmoniq.core.meteo_fetch import WeatherFetcher
+from harmoniq.core.meteo_stations import StationInventory
+from harmoniq.db.schemas import PositionBase
+
+COLUMNS = [
+    "Longitude (x)", "Latitude (y)", "Date/Time (LST)", "Temp (°C)",
+    "Precip. Amount (mm)", "Wind Dir (10s deg)", "Wind Spd (km/h)",
+    "Rel Hum (%)", "Stn Press (kPa)", "Dew Point Temp (°C)",
+]
+STATIONS = {1: (49.0, -66.7), 2: (49.1, -66.8), 3: (49.2, -66.9), 4: (49.3, -67.0)}
+
+
+def _csv(station_id, year, month):
+    latitude, longitude = STATIONS[station_id]
+    temps = pd.date_range(datetime(year, month, 1), periods=24, freq="h")
+    df = pd.DataFrame({c: float(station_id) for c in COLUMNS}, index=range(len(temps)))
+    df["Longitude (x)"], df["Latitude (y)"] = longitude, latitude
+    df["Date/Time (LST)"] = temps.strftime("%Y-%m-%d %H:%M")
+    return df.to_csv(index=False)
+
+
+class StandIn:
+    """Local stand-in for the ECCC bulk data service"""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.requests = []
+        self.in_flight = self.max_in_flight = 0
+
+    async def handle(self, request):
+        station_id = int(request.query["climate_id"])
+        self.requests.append(station_id)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            if self.failures:
+                self.failures -= 1
+                return web.Response(status=503)
+            if station_id == 2:
+                # Unknown station: headers only
+                return web.Response(text=",".join(COLUMNS) + "\n")
+            return web.Response(text=_csv(station_id, int(request.query["Year"]), int(request.query["Month"])))
+        finally:
+            self.in_flight -= 1
+
+
+async def _serve(stand_in, coroutine):
+    app = web.Application()
+    app.router.add_get("/bulk", stand_in.handle)
+    async with TestServer(app) as server:
+        return await coroutine(str(server.make_url("/bulk")))
+
+
+def test_fetch_range_concurrent_avec_reprise():
+    stand_in = StandIn(failures=2)
+
+    async def run(url):
+        async with WeatherFetcher(url, max_concurrency=2, backoff=0.01, cache_dir=None) as fetcher:
+            periods = fetcher.periods(datetime(2021, 1, 15), datetime(2021, 6, 30), Granularity.HOURLY)
+            return await fetcher.fetch_range(1, Granularity.HOURLY, periods)
+
+    data = asyncio.run(_serve(stand_in, run))
+    assert len(data) == 6 * 24
+    assert pd.to_datetime(data["Date/Time (LST)"]).is_monotonic_increasing
+    assert stand_in.max_in_flight <= 2
+    assert len(stand_in.requests) == 6 + 2
+
+
+def test_load_interpolation_trois_stations(tmp_path, monkeypatch):
+    monkeypatch.setattr(meteo, "CACHE", tmp_path)
+    stand_in = StandIn()
+
+    async def run(url):
+        weather = WeatherHelper(
+            PositionBase(latitude=49.0, longitude=-66.0), True,
+            datetime(2021, 1, 1), datetime(2021, 2, 28),
+            EnergyType.EOLIEN, Granularity.HOURLY,
+            fetcher=WeatherFetcher(url, backoff=0.01, cache_dir=tmp_path / "stations"),
+        )
+        weather._nearby_stations = pd.DataFrame(
+            {"id": list(STATIONS), "hlyRange": ["2000|2025"] * 4, "dlyRange": ["|"] * 4},
+            index=[f"Station {i}" for i in STATIONS],
+        )
+        return await weather.load()
+
+    data = asyncio.run(_serve(stand_in, run))
+    # Station 2 has no data: station 4 replaces it
+    assert sorted(set(stand_in.requests)) == [1, 2, 3, 4]
+    assert len(data) == 2 * 24
+    assert (data["latitude"] == 49.0).all()
+    assert list(tmp_path.iterdir())
+
+
+def test_fetch_range_annule_apres_echec():
+    async def handle(request):
+        if request.query["Month"] == "1":
+            # Station sans données en janvier : en-têtes seulement
+            return web.Response(text=",".join(COLUMNS) + "\n")
+        await asyncio.sleep(0.5)
+        return web.Response(text=_csv(1, 2021, int(request.query["Month"])))
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/bulk", handle)
+        async with TestServer(app) as server:
+            async with WeatherFetcher(str(server.make_url("/bulk")), cache_dir=None) as fetcher:
+                periods = fetcher.periods(datetime(2021, 1, 1), datetime(2021, 6, 30), Granularity.HOURLY)
+                try:
+                    await fetcher.fetch_range(1, Granularity.HOURLY, periods)
+                except UnknownStationId:
+                    pass
+                else:
+                    raise AssertionError("UnknownStationId attendue")
+                # Aucun téléchargement ne continue après l'échec
+                pending = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()
+                           and "fetch" in repr(t.get_coro())]
+                return pending
+
+    assert asyncio.run(run()) == []
+
+
+def test_cache_station_mois(tmp_path):
+    stand_in = StandIn()
+    fetcher = WeatherFetcher(backoff=0.01, cache_dir=tmp_path)
+
+    async def run(url):
+        fetcher.base_url = url
+        async with fetcher:
+            await fetcher.fetch_range(1, Granularity.HOURLY, [(2021, 1), (2021, 2)])
+            # Shifted range: only March is downloaded
+            data = await fetcher.fetch_range(1, Granularity.HOURLY, [(2021, 2), (2021, 3)])
+            # Unknown station remembered as an empty file
+            for _ in range(2):
+                try:
+                    await fetcher.fetch(2, Granularity.HOURLY, 2021, 1)
+                except UnknownStationId:
+                    pass
+        return data
+
+    data = asyncio.run(_serve(stand_in, run))
+    assert len(data) == 2 * 24
+    assert stand_in.requests == [1, 1, 1, 2]
+    assert (fetcher.hits, fetcher.misses) == (2, 4)
+    assert (tmp_path / "hourly" / "1" / "2021-03.csv").exists()
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+def _feature(climate_id, latitude, longitude, hourly=True):
+    return {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [longitude, latitude]},
+        "properties": {
+            "CLIMATE_IDENTIFIER": climate_id,
+            "STATION_NAME": f"STATION {climate_id}",
+            "PROV_STATE_TERR_CODE": "QC",
+            "HLY_FIRST_DATE": "1990-01-01 00:00:00" if hourly else None,
+            "HLY_LAST_DATE": "2024-12-31 23:00:00" if hourly else None,
+            "DLY_FIRST_DATE": "1950-01-01 00:00:00",
+            "DLY_LAST_DATE": "2000-12-31 00:00:00",
+        },
+    }
+
+
+def test_inventaire_stations_kdtree(tmp_path, monkeypatch):
+    monkeypatch.setattr(meteo_stations, "PAGE_SIZE", 2)
+    features = [
+        _feature("7011000", 49.05, -66.70),
+        _feature("701S001", 49.20, -66.90),
+        _feature("7012000", 49.06, -66.72, hourly=False),
+        _feature("7013000", 45.50, -73.60),
+        _feature("7014000", 46.80, -71.20),
+    ]
+    pages = []
+
+    async def handle(request):
+        offset, limit = int(request.query["offset"]), int(request.query["limit"])
+        pages.append(offset)
+        return web.json_response({"type": "FeatureCollection", "features": features[offset:offset + limit]})
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/stations", handle)
+        async with TestServer(app) as server:
+            inventory = StationInventory(tmp_path / "inventaire.parquet", str(server.make_url("/stations")))
+            await inventory.load()
+            return inventory
+
+    inventory = asyncio.run(run())
+    assert pages == [0, 2, 4]
+    assert len(inventory.stations) == 5
+
+    gaspesie, quebec = inventory.nearest(
+        [(49.049334, -66.750423), (46.81, -71.21)], Granularity.HOURLY, start_year=2021, end_year=2021
+    )
+    # 7012000 has no hourly data; 7014000 is out of the radius of the first point
+    assert gaspesie["id"].tolist() == ["7011000", "701S001"]
+    assert gaspesie["proximity"].is_monotonic_increasing
+    assert gaspesie["proximity"].iloc[0] < 5
+    assert quebec["id"].tolist() == ["7014000"]
+    assert inventory.nearest([(49.05, -66.7)], Granularity.DAILY, start_year=2021)[0].empty
+
+    # Reloaded from the local file, without the network
+    local = StationInventory(tmp_path / "inventaire.parquet", "http://127.0.0.1:9/unreachable")
+    asyncio.run(local.load())
+    assert local.stations["id"].tolist() == inventory.stations["id"].tolist()
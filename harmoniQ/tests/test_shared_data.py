@@ -0,0 +1,88 @@
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from harmoniq.core.shared_data import SharedDataPlane
+
+
+def _somme_partagee(cle):
+    df = SharedDataPlane().attach_frame(cle)
+    return None if df is None else float(df.to_numpy().sum())
+
+
+def test_shared_frame_entre_processus():
+    cle = ("test", "demande", np.random.randint(1 << 30))
+    df = pd.DataFrame(
+        np.random.rand(48, 3),
+        index=pd.date_range("2035-01-01", periods=48, freq="h"),
+        columns=["load_a", "load_b", "load_c"],
+    )
+    df._energy_not_power = True
+
+    plan = SharedDataPlane()
+    partage = plan.publish_frame(cle, df)
+    try:
+        pd.testing.assert_frame_equal(partage, df, check_freq=False)
+        assert partage._energy_not_power
+        assert not partage.to_numpy().flags.writeable
+
+        # Un autre processus s'attache au même segment
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(1) as pool:
+            assert pool.apply(_somme_partagee, (cle,)) == pytest.approx(df.to_numpy().sum())
+    finally:
+        plan.release()
+    assert SharedDataPlane().attach_frame(cle) is None
+
+
+def test_budget_libere_les_segments():
+    cles = [("test", "budget", np.random.randint(1 << 30), i) for i in range(3)]
+    valeurs = np.random.rand(10000)
+
+    plan = SharedDataPlane(max_bytes=int(2.5 * valeurs.nbytes))
+    try:
+        plan.publish_array(cles[0], valeurs)
+        plan.publish_array(cles[1], valeurs)
+        # Le premier segment devient le plus récemment utilisé
+        assert plan.attach_array(cles[0]) is not None
+        plan.publish_array(cles[2], valeurs)
+
+        # Le segment le moins récemment utilisé est fermé et supprimé
+        assert plan.evictions == 1
+        assert plan.nbytes <= plan.max_bytes
+        assert SharedDataPlane().attach_array(cles[1]) is None
+        assert SharedDataPlane().attach_array(cles[0]) is not None
+    finally:
+        plan.release()
+    assert plan.published == []
+    assert all(SharedDataPlane().attach_array(cle) is None for cle in cles)
+
+
+def test_budget_garde_les_segments_utilises():
+    cles = [("test", "vues", np.random.randint(1 << 30), i) for i in range(3)]
+    valeurs = np.arange(200, dtype="float64")
+    df = pd.DataFrame({"a": valeurs, "b": -valeurs}, index=pd.date_range("2035-01-01", periods=200, freq="h"))
+
+    plan = SharedDataPlane(max_bytes=3000)
+    try:
+        vue = plan.publish_array(cles[0], valeurs)[10:]
+        partage = plan.publish_frame(cles[1], df)
+        plan.publish_array(cles[2], valeurs)
+
+        # Les segments dont une vue est vivante ne sont ni fermés ni supprimés
+        assert plan.evictions == 0
+        assert vue.sum() == valeurs[10:].sum()
+        pd.testing.assert_frame_equal(partage, df, check_freq=False)
+        assert SharedDataPlane().attach_array(cles[0]) is not None
+
+        # Sans vue, le segment le moins récemment utilisé est libéré au prochain accès
+        del vue
+        plan.attach_array(cles[2])
+        assert plan.evictions == 1
+        assert SharedDataPlane().attach_array(cles[0]) is None
+        assert partage["b"].sum() == -valeurs.sum()
+    finally:
+        plan.release()
+    assert plan.published == []